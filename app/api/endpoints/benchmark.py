@@ -6,11 +6,10 @@ import json
 from typing import Dict, Any
 from ...models.database import get_db
 from ...models.benchmark import BenchmarkRun
-from ...services.container import ContainerManager
+from ...services.docker_inventory import docker_inventory
 from ...utils.logger import logger
 
 router = APIRouter()
-container_manager = ContainerManager()
 
 @router.post("/benchmark")
 async def create_benchmark(config: Dict[str, Any], db: Session = Depends(get_db)):
@@ -19,7 +18,7 @@ async def create_benchmark(config: Dict[str, Any], db: Session = Depends(get_db)
        if not nim_id:
            raise HTTPException(status_code=400, detail="NIM ID is required")
            
-       nim = next((n for n in container_manager.list_containers() if n['container_id'] == nim_id), None)
+       nim = next((n for n in await docker_inventory.list_containers() if n['container_id'] == nim_id), None)
        if not nim:
            raise HTTPException(status_code=404, detail="Selected NIM not found")
 
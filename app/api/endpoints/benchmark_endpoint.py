@@ -1,9 +1,15 @@
 # app/api/endpoints/benchmark_endpoint.py
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+from datetime import datetime
+from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 from app.services.benchmark import benchmark_service
+from app.services.benchmark_progress import progress_tracker
+from app.services.log_events import log_event_recorder
 
 router = APIRouter()
 
@@ -23,6 +29,61 @@ class BenchmarkConfig(BaseModel):
     stream: bool = Field(False, description="Enable streaming to capture first-token latency")
     expected_output: Optional[str] = Field(None, description="Expected completion text for simple accuracy scoring")
     port: Optional[int] = Field(8000, description="Port to use when no full endpoint is provided")
+    power_sample_interval_ms: int = Field(100, ge=20, description="GPU power sampling interval used for energy integration")
+    timeline_bucket_seconds: float = Field(1.0, gt=0, description="Bucket width for the request/GPU correlation timeline")
+    live_window_seconds: float = Field(30.0, gt=0, description="Sliding window for live percentile stats")
+    live_publish_interval: float = Field(1.0, gt=0, description="Seconds between live stats updates on /ws/benchmark")
+    workload_class: Optional[str] = Field(None, description="Label recorded with each request in the sample archive")
+    gpu_count: int = Field(1, ge=1, description="GPUs for the NIM container")
+    container_env: Optional[Dict[str, str]] = Field(None, description="Extra environment for the NIM container")
+    keep_warm: bool = Field(True, description="Return the NIM container to the warm pool after the run")
+    server_metrics: bool = Field(False, description="Scrape the server's Prometheus /metrics during the run")
+    server_metrics_url: Optional[str] = Field(None, description="Metrics URL (defaults to <endpoint>/metrics)")
+    server_metrics_interval: float = Field(1.0, ge=0.1, description="Seconds between /metrics scrapes")
+    server_metrics_series: Optional[List[str]] = Field(
+        None, description="Metric families to record on top of queue depth, KV cache and prefix cache usage"
+    )
+
+
+class ColdStartConfig(BaseModel):
+    name: str = Field(..., min_length=1, description="Name of the benchmark")
+    description: Optional[str] = Field(None, description="Optional description of the benchmark")
+    nim_id: str = Field(..., description="NIM image to start")
+    iterations: int = Field(5, ge=1, le=100, description="Measured container starts")
+    warmup_runs: int = Field(0, ge=0, le=10, description="Starts before the measured ones, left out of the statistics")
+    page_cache: Literal["warm", "cold"] = Field("warm", description="cold drops the model weights from the page cache before each start")
+    model_cache: Literal["as_is", "present", "absent"] = Field(
+        "as_is", description="present prefetches the weights once; absent evicts them before each start"
+    )
+    cooldown_seconds: float = Field(5.0, ge=0, description="Pause between stopping a container and the next start")
+    gpu_count: int = Field(1, ge=1, description="GPUs for the NIM container")
+    container_env: Optional[Dict[str, str]] = Field(None, description="Extra environment for the NIM container")
+
+
+class CompareOptions(BaseModel):
+    metrics: Optional[List[str]] = Field(None, description="Latency metrics to compare (ttft, e2e, tpot)")
+    quantiles: Optional[List[float]] = Field(None, description="Latency percentiles to compare (0-100)")
+    thresholds: Optional[Dict[str, float]] = Field(
+        None,
+        description="Max tolerated degradation in percent, keyed 'tps' or '<metric>_p<q>';"
+        " 'error_rate' in percentage points",
+    )
+    bootstrap_samples: int = Field(1000, ge=100, le=10000)
+    confidence: float = Field(0.95, gt=0.5, lt=1.0)
+
+    def options(self):
+        return {
+            "metrics": self.metrics,
+            "quantiles": self.quantiles,
+            "thresholds": self.thresholds,
+            "n_boot": self.bootstrap_samples,
+            "confidence": self.confidence,
+        }
+
+
+class CompareRequest(CompareOptions):
+    run_ids: List[int] = Field(..., min_length=1, description="Runs to compare; the first is the baseline by default")
+    baseline_id: Optional[int] = Field(None, description="Explicit baseline run")
 
 
 @router.post("/")
@@ -38,14 +99,271 @@ async def create_benchmark(config: BenchmarkConfig):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/cold-start")
+async def create_cold_start_benchmark(config: ColdStartConfig):
+    """Start and stop a NIM repeatedly; reports the time-to-first-inference distribution."""
+    try:
+        run = await benchmark_service.create_cold_start_benchmark(config.model_dump())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"run_id": run.get("id"), "status": run.get("status"), "metrics": run.get("metrics")}
+
+
+@router.get("/cold-start/trends")
+async def get_cold_start_trends(model: Optional[str] = None, limit: int = Query(200, ge=1, le=500)):
+    return await benchmark_service.get_cold_start_trends(model, limit)
+
+
 @router.get("/history")
-def get_benchmark_history():
-    return [run for run in benchmark_service.get_benchmark_history()]
+async def get_benchmark_history(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(50, ge=1, le=500),
+    model: Optional[str] = None,
+    provider: Optional[str] = None,
+    quantization: Optional[str] = None,
+    benchmark_type: Optional[str] = Query(None, description="throughput or cold_start"),
+    status: Optional[str] = None,
+    since: Optional[datetime] = Query(None, description="Only runs started at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only runs started before this time"),
+    sort: str = Query("-start_time", description="Sort key, prefix with - for descending"),
+    fields: Optional[str] = Query(None, description="Comma-separated projection; summary columns by default"),
+):
+    try:
+        return await benchmark_service.get_benchmark_history(
+            cursor=cursor,
+            limit=limit,
+            model=model,
+            provider=provider,
+            quantization=quantization,
+            benchmark_type=benchmark_type,
+            status=status,
+            since=since,
+            until=until,
+            sort=sort,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/compare")
+async def compare_benchmarks(request: CompareRequest):
+    try:
+        return await benchmark_service.compare_runs(request.run_ids, request.baseline_id, **request.options())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@router.get("/export")
+async def export_benchmarks(
+    run_ids: str = Query(..., description="Comma-separated run ids"),
+    tables: str = Query("requests,timeline", description="Comma-separated tables: requests, timeline"),
+    format: str = Query("csv", description="csv, ndjson or parquet"),
+):
+    try:
+        ids = [int(v) for v in run_ids.split(",") if v.strip()]
+        path = await benchmark_service.export_runs(ids, [t.strip() for t in tables.split(",") if t.strip()], format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # FileResponse honours Range requests, so interrupted downloads can resume
+    return FileResponse(path, media_type="application/zip", filename=f"benchmarks_{format}.zip")
+
+
+@router.get("/retention")
+def get_retention_status():
+    return benchmark_service.retention.status()
+
+
+@router.post("/retention/run")
+async def run_retention():
+    return await benchmark_service.retention.run_once()
+
+
+@router.get("/live")
+def get_live_benchmarks():
+    return list(progress_tracker.live.values())
+
+
+@router.post("/{run_id}/abort")
+def abort_benchmark(run_id: int):
+    if not benchmark_service.abort_benchmark(run_id):
+        raise HTTPException(status_code=404, detail="No active benchmark run with this id")
+    return {"status": "aborting", "run_id": run_id}
+
+
+@router.post("/{run_id}/resume")
+async def resume_benchmark(run_id: int):
+    try:
+        run = await benchmark_service.resume_benchmark(run_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if run is None:
+        raise HTTPException(status_code=404, detail="Benchmark run not found")
+    return {
+        "run_id": run.get("id"),
+        "status": run.get("status"),
+        "metrics": run.get("metrics"),
+        "container_id": run.get("container_id"),
+    }
 
 
 @router.get("/{run_id}")
-def get_benchmark(run_id: int):
-    run = benchmark_service.get_benchmark(run_id)
+async def get_benchmark(run_id: int):
+    run = await benchmark_service.get_benchmark(run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Benchmark run not found")
     return run
+
+
+@router.put("/{run_id}/baseline")
+async def set_baseline(run_id: int):
+    if not await benchmark_service.set_baseline(run_id):
+        raise HTTPException(status_code=404, detail="Benchmark run not found")
+    return {"run_id": run_id, "is_baseline": True}
+
+
+@router.delete("/{run_id}/baseline")
+async def clear_baseline(run_id: int):
+    if not await benchmark_service.set_baseline(run_id, False):
+        raise HTTPException(status_code=404, detail="Benchmark run not found")
+    return {"run_id": run_id, "is_baseline": False}
+
+
+@router.post("/{run_id}/compare-baseline")
+async def compare_to_baseline(run_id: int, options: Optional[CompareOptions] = None):
+    options = options or CompareOptions()
+    try:
+        result = await benchmark_service.compare_to_baseline(run_id, **options.options())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="No baseline set for this run's model and provider")
+    return result
+
+
+@router.get("/{run_id}/series")
+async def get_benchmark_series(run_id: int):
+    series = await benchmark_service.get_benchmark_series(run_id)
+    if series is None:
+        raise HTTPException(status_code=404, detail="Benchmark run not found")
+    return series
+
+
+async def _sample_archive(run_id: int):
+    archive = await benchmark_service.get_sample_archive(run_id)
+    if archive is None:
+        raise HTTPException(status_code=404, detail="No sample archive recorded for this run")
+    return archive
+
+
+def _parse_quantiles(q: str):
+    try:
+        quantiles = [float(v) for v in q.split(",") if v.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="q must be a comma-separated list of percentiles")
+    if not quantiles or any(v < 0 or v > 100 for v in quantiles):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+    return quantiles
+
+
+@router.get("/{run_id}/samples")
+async def describe_samples(run_id: int):
+    return (await _sample_archive(run_id)).describe()
+
+
+@router.get("/{run_id}/samples/percentiles")
+async def sample_percentiles(
+    run_id: int,
+    metric: str = Query("e2e", description="ttft, e2e, queue, tpot, decode, prompt_tokens or output_tokens"),
+    q: str = Query("50,90,95,99", description="Comma-separated percentiles (0-100)"),
+    status: Optional[str] = Query("ok", description="Request status filter; empty for all requests"),
+    endpoint: Optional[str] = None,
+    workload: Optional[str] = None,
+):
+    archive = await _sample_archive(run_id)
+    try:
+        return await asyncio.to_thread(
+            archive.percentiles, metric, _parse_quantiles(q), status=status or None, endpoint=endpoint, workload=workload
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{run_id}/samples/buckets")
+async def sample_buckets(
+    run_id: int,
+    bucket_seconds: float = Query(1.0, gt=0),
+    metric: str = Query("e2e"),
+    q: str = Query("50,95,99"),
+    status: Optional[str] = Query("ok"),
+    endpoint: Optional[str] = None,
+    workload: Optional[str] = None,
+):
+    archive = await _sample_archive(run_id)
+    try:
+        return await asyncio.to_thread(
+            archive.rebucket, bucket_seconds, metric, _parse_quantiles(q),
+            status=status or None, endpoint=endpoint, workload=workload,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{run_id}/export")
+async def export_benchmark(
+    run_id: int,
+    table: str = Query("requests", description="requests or timeline"),
+    format: str = Query("csv", description="csv, ndjson or parquet"),
+):
+    try:
+        path = await benchmark_service.export_run(run_id, table, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"No {table} data recorded for this run")
+    return FileResponse(path, media_type=EXPORT_MEDIA_TYPES[format], filename=f"benchmark_{run_id}_{path.name}")
+
+
+@router.get("/{run_id}/trace")
+async def get_benchmark_trace(run_id: int):
+    run = await benchmark_service.get_benchmark(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Benchmark run not found")
+    trace_file = (run.get("artifacts") or {}).get("trace")
+    if not trace_file or not Path(trace_file).exists():
+        raise HTTPException(status_code=404, detail="No trace recorded for this run")
+    # Older traces are compressed by the retention policy; keep the extension so clients can decode
+    suffix = "".join(Path(trace_file).suffixes[-2:]) if trace_file.endswith((".zst", ".gz")) else ".json"
+    media_type = "application/json" if suffix == ".json" else "application/octet-stream"
+    return FileResponse(trace_file, media_type=media_type, filename=f"benchmark_{run_id}_trace{suffix}")
+
+
+@router.get("/{run_id}/logs")
+async def get_benchmark_container_log(run_id: int):
+    run = await benchmark_service.get_benchmark(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Benchmark run not found")
+    log_file = (run.get("artifacts") or {}).get("container_log")
+    if not log_file or not Path(log_file).exists():
+        raise HTTPException(status_code=404, detail="No container log archived for this run")
+    suffix = "".join(Path(log_file).suffixes[-2:])
+    media_type = "text/plain" if suffix == ".log" else "application/octet-stream"
+    return FileResponse(log_file, media_type=media_type, filename=f"benchmark_{run_id}_container{suffix}")
+
+
+@router.get("/{run_id}/log-events")
+async def get_benchmark_log_events(run_id: int, name: Optional[str] = None, q: Optional[str] = None):
+    """Server startup settings and runtime stats parsed from the run's container log."""
+    run = await benchmark_service.get_benchmark(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Benchmark run not found")
+    return await log_event_recorder.events_for_run(run, name=name, q=q)
@@ -1,41 +1,153 @@
 # app/api/endpoints/logs.py
+import asyncio
+from datetime import datetime
 from fastapi import APIRouter, HTTPException, WebSocket
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 import docker
+from app.services.log_broadcaster import log_broadcaster, strip_timestamp
+from app.services.log_capture import log_capture
+from app.services.log_events import log_event_recorder
+from app.services.log_patterns import log_patterns
 from app.utils.logger import logger
 
 router = APIRouter()
-client = docker.from_env()
 
 class LogSaveRequest(BaseModel):
     container_id: str
     filename: str
+    # "none", "gzip" or "zstd"; defaults to LOG_CAPTURE_COMPRESSION
+    compression: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    timestamps: bool = False
 
-@router.websocket("/ws/logs/{container_id}")
-async def websocket_endpoint(websocket: WebSocket, container_id: str):
+class LogPatternRequest(BaseModel):
+    name: str
+    kind: str = "runtime"
+    regex: str
+    backend: Optional[str] = None
+    # Named groups kept as text; the others are read as numbers
+    text_fields: List[str] = []
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except Exception:
+        pass
+
+
+async def stream_container_logs(websocket: WebSocket, container_id: str, timestamps: bool = False):
+    """Send a container's log to a websocket from the shared follower; ``?tail=N`` sets the replay."""
     await websocket.accept()
+    tail = websocket.query_params.get("tail")
+
+    async def send_lines():
+        async with log_broadcaster.subscribe(container_id, int(tail) if tail and tail.isdigit() else None) as lines:
+            async for line in lines:
+                dropped = lines.take_dropped()
+                if dropped:
+                    await websocket.send_json({"dropped": dropped})
+                await websocket.send_json({"log": line if timestamps else strip_timestamp(line)})
+
+    # A viewer that leaves while the log is quiet is noticed at once, not at the next line
+    sender = asyncio.create_task(send_lines())
+    watcher = asyncio.create_task(_wait_for_disconnect(websocket))
     try:
-        container = client.containers.get(container_id)
-        for line in container.logs(stream=True, follow=True):
-            log_line = line.decode('utf-8').strip()
-            await websocket.send_json({"log": log_line})
+        done, _ = await asyncio.wait({sender, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if sender in done:
+            sender.result()
     except docker.errors.NotFound:
         await websocket.send_json({"error": "Container not found"})
-        await websocket.close()
     except Exception as e:
         logger.error(f"Log streaming error: {e}")
-        await websocket.send_json({"error": str(e)})
-        await websocket.close()
+        try:
+            await websocket.send_json({"error": str(e)})
+        except Exception:
+            pass
+    finally:
+        sender.cancel()
+        watcher.cancel()
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+
+@router.websocket("/ws/logs/{container_id}")
+async def websocket_endpoint(websocket: WebSocket, container_id: str):
+    await stream_container_logs(websocket, container_id)
+
+@router.get("/followers")
+def get_log_followers():
+    return log_broadcaster.status()
+
+
+@router.get("/events")
+async def get_log_events(
+    container_id: Optional[str] = None,
+    name: Optional[str] = None,
+    kind: Optional[str] = None,
+    q: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 500,
+):
+    return await log_event_recorder.query(
+        container_id,
+        name=name,
+        kind=kind,
+        q=q,
+        since=since.timestamp() if since else None,
+        until=until.timestamp() if until else None,
+        limit=min(limit, 5000),
+    )
+
+
+@router.get("/events/status")
+def get_log_event_status():
+    return log_event_recorder.status()
+
+
+@router.get("/patterns")
+def get_log_patterns():
+    return log_patterns.describe()
+
+
+@router.post("/patterns")
+async def add_log_pattern(request: LogPatternRequest):
+    try:
+        return await log_event_recorder.add_pattern(
+            request.name, request.kind, request.regex, request.backend, request.text_fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/patterns/{name}")
+async def delete_log_pattern(name: str):
+    if not await log_event_recorder.remove_pattern(name):
+        raise HTTPException(status_code=404, detail="No custom pattern with this name")
+    return {"status": "success"}
+
 
 @router.post("/save")
 async def save_logs(request: LogSaveRequest):
     try:
-        container = client.containers.get(request.container_id)
-        logs = container.logs().decode('utf-8')
-        with open(f"{request.filename}.log", "w") as f:
-            f.write(logs)
-        return {"status": "success"}
+        saved = await log_capture.save(
+            request.container_id,
+            request.filename,
+            compression=request.compression,
+            since=request.since,
+            until=request.until,
+            timestamps=request.timestamps,
+        )
+        return {"status": "success", **saved}
+    except docker.errors.NotFound:
+        raise HTTPException(status_code=404, detail="Container not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error saving logs: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
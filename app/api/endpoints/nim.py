@@ -1,26 +1,68 @@
 # File: app/api/endpoints/nim.py
 from fastapi import APIRouter, HTTPException, Request
 from json import JSONDecodeError
-from pydantic import BaseModel
-from app.services.container import ContainerManager
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from app.services.container import container_manager
+from app.services.container_pool import container_pool
+from app.services.docker_inventory import docker_inventory
+from app.services.placement import placement_scheduler
+from app.services.readiness import readiness_engine
 from app.utils.logger import logger
 from app.utils.ngc_key_helper import key_exists
 
 router = APIRouter()
-container_manager = ContainerManager()
 
 class NimPullRequest(BaseModel):
     image_name: str
 
+
+class CachePrefetchRequest(BaseModel):
+    image_name: str
+    profile: Optional[str] = Field(None, description="Profile id to download; the NIM picks one for the local GPUs if omitted")
+
+
+class CacheEvictRequest(BaseModel):
+    budget_gb: Optional[float] = Field(None, ge=0, description="Evict least recently used models down to this size")
+    models: Optional[List[str]] = Field(None, description="Cache entry keys to delete instead")
+
 @router.post("/pull", tags=["nim"])
 async def pull_nim(request: NimPullRequest):
+    """Queue a background pull; progress is on /ws/pulls and GET /pulls/{job_id}."""
+    if not key_exists():
+        raise HTTPException(status_code=400, detail="NGC API key not set")
+    return container_manager.pulls.submit(request.image_name).snapshot()
+
+
+@router.get("/pulls", tags=["nim"])
+def list_pulls():
+    return container_manager.pulls.list()
+
+
+@router.get("/pulls/{job_id}", tags=["nim"])
+def get_pull(job_id: str):
+    job = container_manager.pulls.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Pull job not found")
+    return job.snapshot()
+
+
+@router.delete("/pulls/{job_id}", tags=["nim"])
+async def cancel_pull(job_id: str):
+    if not container_manager.pulls.cancel(job_id):
+        raise HTTPException(status_code=404, detail="No active pull job with this id")
+    return {"status": "cancelling", "job_id": job_id}
+
+
+@router.post("/start", tags=["nim"])
+async def start_nim(request: NimPullRequest):
+    """Start a NIM container, pulling the image first if it is not local."""
     if not key_exists():
         raise HTTPException(status_code=400, detail="NGC API key not set")
     try:
-        result = await container_manager.start_container(request.image_name)
-        return result
+        return await container_manager.start_container(request.image_name)
     except Exception as e:
-        logger.error(f"Failed to pull NIM: {e}")
+        logger.error(f"Failed to start NIM: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/stop", tags=["nim"])
@@ -32,17 +74,84 @@ async def stop_nim(request: Request):
             payload = {}
 
         container_id = payload.get("container_id") if isinstance(payload, dict) else None
-        await container_manager.stop_container(container_id)
+        if not container_id or not await container_pool.evict(container_id):
+            await container_manager.stop_container(container_id)
         return {"status": "stopped"}
     except Exception as e:
         logger.error(f"Failed to stop NIM: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/inventory", tags=["nim"])
+def get_inventory_status():
+    return docker_inventory.status()
+
+
+@router.get("/placement", tags=["nim"])
+def get_placement():
+    return placement_scheduler.status()
+
+
+@router.get("/pool", tags=["nim"])
+def get_container_pool():
+    return container_pool.status()
+
+
+@router.delete("/pool/{container_id}", tags=["nim"])
+async def evict_pooled_container(container_id: str):
+    if not await container_pool.evict(container_id):
+        raise HTTPException(status_code=404, detail="Container is not in the warm pool")
+    return {"status": "evicted", "container_id": container_id}
+
+
+@router.get("/cache", tags=["nim"])
+async def get_cache():
+    return await container_manager.cache.status()
+
+
+@router.post("/cache/prefetch", tags=["nim"])
+async def prefetch_model(request: CachePrefetchRequest):
+    """Download a NIM's weights into the model cache ahead of a benchmark."""
+    if not key_exists():
+        raise HTTPException(status_code=400, detail="NGC API key not set")
+    return container_manager.cache.prefetch(request.image_name, request.profile).snapshot()
+
+
+@router.get("/cache/prefetch/{job_id}", tags=["nim"])
+def get_prefetch(job_id: str):
+    job = container_manager.cache.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Prefetch job not found")
+    return job.snapshot()
+
+
+@router.delete("/cache/prefetch/{job_id}", tags=["nim"])
+async def cancel_prefetch(job_id: str):
+    if not container_manager.cache.cancel(job_id):
+        raise HTTPException(status_code=404, detail="No active prefetch job with this id")
+    return {"status": "cancelling", "job_id": job_id}
+
+
+@router.post("/cache/evict", tags=["nim"])
+async def evict_cache(request: CacheEvictRequest):
+    if request.models is None and request.budget_gb is None:
+        raise HTTPException(status_code=400, detail="Give budget_gb or models")
+    budget = int(request.budget_gb * 1024 ** 3) if request.budget_gb is not None else None
+    return await container_manager.cache.evict(budget, request.models)
+
+
+@router.get("/{container_id}/startup", tags=["nim"])
+async def get_startup_timeline(container_id: str):
+    tracker = readiness_engine.get(container_id)
+    if tracker is None:
+        raise HTTPException(status_code=404, detail="No startup recorded for this container")
+    return tracker.timeline()
+
+
 @router.get("/list", tags=["nim"])
 async def list_nims():
     try:
-        containers = container_manager.list_containers()
+        containers = await docker_inventory.list_containers()
         return containers if containers is not None else []
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -52,8 +161,8 @@ async def list_nims():
 async def list_root_nims():
     logger.info("Root List NIMs endpoint hit")
     try:
-        containers = container_manager.list_containers()
-        logger.info(f"Found containers at root: {containers}")
+        containers = await docker_inventory.list_containers()
+        logger.debug(f"Found {len(containers)} containers at root")
         return containers
     except Exception as e:
         logger.error(f"Error listing containers at root: {e}")
@@ -15,6 +15,45 @@ class Settings:
     MAX_RETRIES = 5
     RETRY_DELAY = 2  # seconds
     NGC_API_KEY = None
+    # Threads for blocking docker SDK calls; followed log streams use their own threads
+    DOCKER_MAX_WORKERS = int(os.getenv("DOCKER_MAX_WORKERS", "8"))
+    # NIM containers get host ports from BASE_PORT upwards (see app/services/placement.py)
+    NIM_PORT_COUNT = int(os.getenv("NIM_PORT_COUNT", "100"))
+    # Comma-separated GPU indices NIM containers may use; empty uses every GPU nvidia-smi reports
+    NIM_GPU_DEVICES = os.getenv("NIM_GPU_DEVICES", "")
+    # Full rescan of the event-driven container/image inventory (see app/services/docker_inventory.py)
+    INVENTORY_RECONCILE_SECONDS = float(os.getenv("INVENTORY_RECONCILE_SECONDS", "300"))
+    # Image pre-pulls (see app/services/nim_pull.py); a bandwidth of 0 means no budget
+    NIM_PULL_MAX_CONCURRENT = int(os.getenv("NIM_PULL_MAX_CONCURRENT", "2"))
+    NIM_PULL_BANDWIDTH_MBPS = float(os.getenv("NIM_PULL_BANDWIDTH_MBPS", "0"))
+    # Host model cache mounted into NIM containers (see app/services/nim_cache.py); a budget of 0 never evicts
+    NIM_CACHE_DIR = os.path.expanduser(os.getenv("NIM_CACHE_DIR", "~/.cache/nim"))
+    NIM_CACHE_BUDGET_GB = float(os.getenv("NIM_CACHE_BUDGET_GB", "0"))
+    NIM_CACHE_INDEX_FILE = os.getenv("NIM_CACHE_INDEX_FILE", "nim_cache_index.json")
+    # Shared container log followers (see app/services/log_broadcaster.py)
+    LOG_BUFFER_LINES = int(os.getenv("LOG_BUFFER_LINES", "2000"))
+    LOG_REPLAY_LINES = int(os.getenv("LOG_REPLAY_LINES", "200"))
+    LOG_SUBSCRIBER_QUEUE = int(os.getenv("LOG_SUBSCRIBER_QUEUE", "1000"))
+    LOG_FOLLOWER_LINGER_SECONDS = float(os.getenv("LOG_FOLLOWER_LINGER_SECONDS", "30"))
+    # Saved container logs (see app/services/log_capture.py); zstd falls back to gzip without zstandard
+    LOG_CAPTURE_DIR = os.getenv("LOG_CAPTURE_DIR", "container_logs")
+    LOG_CAPTURE_COMPRESSION = os.getenv("LOG_CAPTURE_COMPRESSION", "zstd")
+    LOG_ARCHIVE_RUNS = os.getenv("LOG_ARCHIVE_RUNS", "1") == "1"
+
+    # Warm container pool (see app/services/container_pool.py)
+    CONTAINER_POOL_ENABLED = os.getenv("CONTAINER_POOL_ENABLED", "1") == "1"
+    CONTAINER_POOL_IDLE_TTL_SECONDS = float(os.getenv("CONTAINER_POOL_IDLE_TTL_SECONDS", "1800"))
+    # GPUs the pool may occupy; 0 uses every GPU NIM containers may be placed on
+    CONTAINER_POOL_GPU_BUDGET = int(os.getenv("CONTAINER_POOL_GPU_BUDGET", "0"))
+    CONTAINER_POOL_KEEP_ON_SHUTDOWN = os.getenv("CONTAINER_POOL_KEEP_ON_SHUTDOWN", "0") == "1"
+
+    # Retention of stored runs (see app/services/retention.py)
+    RETENTION_RAW_DAYS = float(os.getenv("RETENTION_RAW_DAYS", "14"))
+    RETENTION_COMPRESS_DAYS = float(os.getenv("RETENTION_COMPRESS_DAYS", "2"))
+    RETENTION_EXPORT_TTL_HOURS = float(os.getenv("RETENTION_EXPORT_TTL_HOURS", "24"))
+    RETENTION_DISK_BUDGET_GB = float(os.getenv("RETENTION_DISK_BUDGET_GB", "20"))
+    RETENTION_COARSE_BUCKET_SECONDS = float(os.getenv("RETENTION_COARSE_BUCKET_SECONDS", "10"))
+    RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
 
     def __init__(self):
         # Get NGC key lazily to avoid circular imports
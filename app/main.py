@@ -7,13 +7,19 @@ from pathlib import Path
 import asyncio
 
 from .api.routes import api_router
+from .api.endpoints.logs import stream_container_logs
 from .utils.metrics import collect_metrics, metrics_collector
 from .utils.connection import ConnectionManager
 from .utils.logger import logger
-from .services.benchmark_progress import ProgressTracker
+from .utils.telemetry_codec import TelemetrySubscription
+from .services.benchmark_progress import progress_tracker
 from .services.container import container_manager
-
-progress_tracker = ProgressTracker()
+from .services.container_pool import container_pool
+from .services.docker_inventory import docker_inventory
+from .services.log_broadcaster import log_broadcaster
+from .services.log_events import log_event_recorder
+from .services.benchmark import benchmark_service
+from .services.results_store import results_store
 
 app = FastAPI(strict_slashes=False)
 connection_manager = ConnectionManager()
@@ -36,6 +42,35 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+@app.on_event("startup")
+async def init_results_store():
+    # Creates the SQLite store and imports legacy JSON results on first start
+    await results_store.init(legacy_dir=benchmark_service.benchmark_dir)
+    # Custom log patterns added through /api/logs/patterns
+    await log_event_recorder.load_patterns()
+    # Runs interrupted by a crash or restart are saved as partial from their journals
+    await benchmark_service.recover_interrupted_runs()
+    # Ages old runs out of full fidelity in the background
+    benchmark_service.retention.start()
+    # GPUs and host ports held by NIM containers that outlived the last server process
+    try:
+        await container_manager.sync_placements()
+    except Exception as e:
+        logger.warning(f"Could not scan running NIM containers: {e}")
+    # Re-adopts warm NIM containers and stops them after their idle TTL
+    await container_pool.start()
+    # Keeps the NIM list in memory, current through docker events
+    await docker_inventory.start()
+
+@app.on_event("shutdown")
+async def stop_retention():
+    await benchmark_service.retention.stop()
+    await docker_inventory.stop()
+    await log_event_recorder.stop()
+    await log_broadcaster.stop()
+    await container_pool.stop()
+    container_manager.docker.shutdown()
+
 @app.middleware("http")
 async def add_logging(request: Request, call_next):
     response = await call_next(request)
@@ -47,23 +82,26 @@ async def add_logging(request: Request, call_next):
 @app.websocket("/ws/metrics")
 async def metrics_websocket(websocket: WebSocket):
     await connection_manager.connect(websocket)
+    subscription = TelemetrySubscription(interval_ms=250)
+    listener = asyncio.create_task(subscription.listen(websocket))
     try:
-        while True:
+        # The listener returns when the client disconnects
+        while not listener.done():
             metrics = metrics_collector.collect_metrics()
-            await websocket.send_json({
-                "type": "metrics_update",
-                "metrics": metrics
-            })
-            await asyncio.sleep(.25)
+            await subscription.send(websocket, metrics)
+            await asyncio.sleep(subscription.interval)
     except Exception as e:
         print(f"WebSocket error: {e}")
     finally:
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
         await connection_manager.disconnect(websocket)
 
 # WebSocket endpoint for benchmark progress
 @app.websocket("/ws/benchmark")
 async def benchmark_progress_ws(websocket: WebSocket):
     await websocket.accept()
+    sent_seq = {}
     try:
         while True:
             if websocket.client_state == WebSocketState.DISCONNECTED:
@@ -71,7 +109,7 @@ async def benchmark_progress_ws(websocket: WebSocket):
                 break
 
             if progress_tracker.progress:
-                for run_id, progress in progress_tracker.progress.items():
+                for run_id, progress in list(progress_tracker.progress.items()):
                     await websocket.send_json({
                         "type": "benchmark_progress",
                         "progress": {
@@ -82,6 +120,12 @@ async def benchmark_progress_ws(websocket: WebSocket):
                         }
                     })
 
+            # Rolling-window stats are pushed once per published snapshot
+            for run_id, snapshot in list(progress_tracker.live.items()):
+                if sent_seq.get(run_id) != snapshot["seq"]:
+                    sent_seq[run_id] = snapshot["seq"]
+                    await websocket.send_json({"type": "benchmark_live", "live": snapshot})
+
             await asyncio.sleep(.25)
 
     except WebSocketDisconnect:
@@ -96,21 +140,29 @@ async def benchmark_progress_ws(websocket: WebSocket):
         except Exception as e:
             logger.error(f"Error closing benchmark WebSocket: {e}")
 
-# WebSocket endpoint for container logs
-@app.websocket("/ws/logs/{container_id}")
-async def container_logs_ws(websocket: WebSocket, container_id: str):
+# WebSocket endpoint for image pull progress
+@app.websocket("/ws/pulls")
+async def pull_progress_ws(websocket: WebSocket):
     await websocket.accept()
+    sent_seq = {}
     try:
-        container = container_manager.client.containers.get(container_id)
-        for line in container.logs(stream=True, follow=True, timestamps=True):
-            if websocket.client_state == WebSocketState.DISCONNECTED:
-                break
-            log_line = line.decode('utf-8').strip()
-            await websocket.send_json({"log": log_line})
+        while websocket.client_state != WebSocketState.DISCONNECTED:
+            # Each job is sent when it changed, at most twice a second
+            for job in list(container_manager.pulls.jobs.values()):
+                if sent_seq.get(job.id) != job.seq:
+                    sent_seq[job.id] = job.seq
+                    await websocket.send_json({"type": "pull_progress", "job": job.snapshot()})
+            await asyncio.sleep(.5)
+    except WebSocketDisconnect:
+        logger.info("Pull progress WebSocket client disconnected")
     except Exception as e:
-        logger.error(f"Container log streaming error: {e}")
-    finally:
-        await websocket.close()
+        logger.error(f"Pull progress WebSocket error: {e}")
+
+# WebSocket endpoint for container logs
+@app.websocket("/ws/logs/{container_id}")
+async def container_logs_ws(websocket: WebSocket, container_id: str):
+    # One shared docker log follower per container, however many viewers
+    await stream_container_logs(websocket, container_id, timestamps=True)
 
 # Serve SPA (Single Page Application)
 @app.get("/{full_path:path}")
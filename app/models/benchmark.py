@@ -1,16 +1,27 @@
 # app/models/benchmark.py
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, Text, Index
 from .database import Base
 
 class BenchmarkRun(Base):
     __tablename__ = "benchmark_runs"
+    __table_args__ = (
+        Index("ix_benchmark_runs_model_start", "model_name", "start_time"),
+        Index("ix_benchmark_runs_provider_start", "provider", "start_time"),
+        # AUTOINCREMENT guarantees ids are never reused, even after deletes
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    name = Column(String)
     model_name = Column(String, index=True)
+    provider = Column(String, index=True)
+    quantization = Column(String, index=True)
+    # "throughput" for request workloads, "cold_start" for repeated container starts
+    benchmark_type = Column(String, default="throughput", index=True)
     config = Column(Text)
-    status = Column(String, default="starting")
-    start_time = Column(DateTime, default=datetime.utcnow)
+    status = Column(String, default="starting", index=True)
+    start_time = Column(DateTime, default=datetime.utcnow, index=True)
     end_time = Column(DateTime, nullable=True)
     total_requests = Column(Integer, default=0)
     successful_requests = Column(Integer, default=0)
@@ -20,6 +31,14 @@ class BenchmarkRun(Base):
     p95_latency = Column(Float, default=0.0)
     time_to_first_token = Column(Float, default=0.0)
     inter_token_latency = Column(Float, default=0.0)
+    # Reference run for regression checks, at most one per model/provider
+    is_baseline = Column(Boolean, default=False, index=True)
+    # Retention stage: raw -> compressed (artifacts) -> compacted (histograms only) -> pruned (no trace or container log)
+    retention_tier = Column(String, default="raw", index=True)
+    # Run document without heavy series, and the series themselves
+    data = Column(Text, nullable=True)
+    series = Column(Text, nullable=True)
+    source_file = Column(String, unique=True, nullable=True)
 
 class MetricPoint(Base):
     __tablename__ = "metric_points"
@@ -33,3 +52,37 @@ class MetricPoint(Base):
     gpu_utilization = Column(Float, default=0.0)
     gpu_memory = Column(Float, default=0.0)
     gpu_temperature = Column(Float, default=0.0)
+
+class StoreMeta(Base):
+    __tablename__ = "store_meta"
+
+    key = Column(String, primary_key=True)
+    value = Column(Text)
+
+class LogEvent(Base):
+    __tablename__ = "log_events"
+    __table_args__ = (
+        # Also serves per-container time range reads; a replayed line is stored once
+        Index("ux_log_events_container_time", "container_id", "timestamp", "name", unique=True),
+        Index("ix_log_events_name_time", "name", "timestamp"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    container_id = Column(String, nullable=False)
+    # Epoch seconds of the log line
+    timestamp = Column(Float, nullable=False)
+    name = Column(String, nullable=False)
+    kind = Column(String, index=True)
+    backend = Column(String)
+    fields = Column(Text)
+    line = Column(Text)
+
+class LogPatternDefinition(Base):
+    __tablename__ = "log_patterns"
+
+    name = Column(String, primary_key=True)
+    kind = Column(String)
+    regex = Column(Text)
+    backend = Column(String)
+    text_fields = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
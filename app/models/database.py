@@ -0,0 +1,47 @@
+# app/models/database.py
+from pathlib import Path
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+DATABASE_PATH = Path("benchmarks") / "results.db"
+DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+
+Base = declarative_base()
+engine = create_async_engine(DATABASE_URL)
+async_session = async_sessionmaker(engine, expire_on_commit=False)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets history reads proceed while a run is being written
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def _add_missing_columns(sync_conn):
+    """Add columns introduced after a table was created (create_all only creates tables)."""
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=sync_conn.dialect)
+                sync_conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+
+
+async def init_db():
+    # Import models so they register with Base before create_all
+    from . import benchmark  # noqa: F401
+
+    DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+
+
+async def get_db():
+    async with async_session() as session:
+        yield session
@@ -1,36 +1,96 @@
 # app/services/benchmark.py
 import json
+import shutil
+import time
 import asyncio
 import aiohttp
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
+from ..config import settings
 from ..utils.logger import logger
 from ..services.container import container_manager
+from .readiness import readiness_engine
+from .container_pool import container_pool
 from ..utils.metrics import metrics_collector
+from ..utils.gpu_sampler import GpuSampler
+from .telemetry_timeline import TelemetryTimeline
+from .live_stats import LiveRunStats
+from .benchmark_progress import progress_tracker
+from .results_store import results_store
+from .sample_archive import SampleArchive, write_archive
+from .run_comparison import compare_archives, overall_verdict
+from .result_export import FORMATS, TABLES, ResultExporter
+from .retention import RetentionEngine
+from .run_journal import RunJournal
+from .cold_start import ColdStartRunner, cold_start_trends
+from .log_capture import LogCapture
+from .log_events import log_event_recorder
+from .server_metrics import ServerMetricsScraper
+
+# Above this many requests the Chrome trace is skipped; it is built in memory
+MAX_TRACE_REQUESTS = 250_000
+# Runs whose journal can be continued
+RESUMABLE_STATUSES = ("partial", "failed")
 
 class BenchmarkService:
     def __init__(self, benchmark_dir: str = "benchmarks"):
         self.benchmark_dir = Path(benchmark_dir)
         self.benchmark_dir.mkdir(exist_ok=True)
-        self.current_benchmark_metrics = {}
+        self._aborted_runs = set()
+        self.exporter = ResultExporter(self.benchmark_dir / "exports")
+        self.retention = RetentionEngine(self.benchmark_dir)
+        self.cold_start = ColdStartRunner()
+        self.log_archive = LogCapture(self.benchmark_dir / "container_logs")
 
     async def wait_for_nim_ready(self, nim_id: str, timeout: int = 60) -> bool:
-        start_time = datetime.now()
-        while (datetime.now() - start_time).seconds < timeout:
+        status = await readiness_engine.wait(nim_id, timeout)
+        if status is None:
+            # Container not started by this process; trust the last saved NIM state
             nim_info = container_manager.load_nim()
             if not nim_info or nim_info["container_id"] != nim_id:
                 logger.warning(f"NIM container {nim_id} not found or inactive.")
                 return False
-            if nim_info.get("status") == "ready":
-                logger.info(f"NIM container {nim_id} is ready.")
-                return True
-            logger.debug(f"Waiting for NIM {nim_id} to be ready... ({timeout - (datetime.now() - start_time).seconds}s remaining)")
-            await asyncio.sleep(1)
-        logger.error(f"Timeout waiting for NIM container {nim_id} to be ready.")
+            status = nim_info.get("status")
+        if status == "ready":
+            logger.info(f"NIM container {nim_id} is ready.")
+            return True
+        logger.error(f"NIM container {nim_id} did not become ready: {status}")
         return False
 
-    async def execute_nim_benchmark(self, config: Dict[str, Any], container_info: Dict[str, Any]) -> Dict[str, Any]:
+    def run_directory(self, run_id: int) -> Path:
+        return self.benchmark_dir / "runs" / f"run_{run_id}"
+
+    def _write_request_artifacts(self, timeline: TelemetryTimeline, run_stem: str) -> Dict[str, Any]:
+        """Write the Chrome trace and per-request sample archive from the recorded requests."""
+        artifacts = {}
+        if timeline.count <= MAX_TRACE_REQUESTS:
+            # Persist the joined request/GPU trace for Chrome trace / Perfetto viewers
+            trace_dir = self.benchmark_dir / "traces"
+            trace_dir.mkdir(exist_ok=True)
+            trace_file = trace_dir / f"trace_{run_stem}.json"
+            with open(trace_file, "w") as f:
+                json.dump(timeline.to_chrome_trace(), f)
+            artifacts["trace"] = str(trace_file)
+        else:
+            logger.info(f"Skipping Chrome trace for {timeline.count} requests (limit {MAX_TRACE_REQUESTS})")
+
+        # Raw per-request columns for after-the-fact analysis
+        samples_dir = self.benchmark_dir / "samples" / f"run_{run_stem}"
+        write_archive(samples_dir, timeline.events(), timeline.origin, timeline.count)
+        artifacts["samples"] = str(samples_dir)
+        return artifacts
+
+    async def execute_nim_benchmark(
+        self,
+        config: Dict[str, Any],
+        container_info: Dict[str, Any],
+        run_stem: Optional[str] = None,
+        run_id: Optional[int] = None,
+        journal: Optional[RunJournal] = None,
+        resume: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Run the workload; ``resume`` (see ``_workload_cursor``) continues an interrupted run."""
         try:
             provider_name = config.get("provider", container_info.get("provider", "nim"))
             port = container_info.get('port', 8000)
@@ -40,213 +100,298 @@ class BenchmarkService:
             endpoint_override = config.get("endpoint") or container_info.get("endpoint")
             endpoint_base = endpoint_override or f"http://localhost:{port}"
             quantization = config.get("quantization", "default")
+            completions_url = f"{endpoint_base}/v1/completions"
+            workload = config.get("workload_class") or "default"
+            # Whitespace estimate, replaced by the server's usage count when reported
+            prompt_estimate = len(config['prompt'].split())
+            run_stem = run_stem or f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
             logger.info(
                 f"Starting benchmark against {model_info['full_name']} on {provider_name}"
                 f" at {endpoint_base} with quantization={quantization}"
             )
 
+            # Only constant-size aggregates live in memory; per-request records go to the
+            # journal (or the in-memory timeline when no journal is given)
             success_count = 0
             total_tokens = 0
-            total_latency = 0
-            peak_tps = 0.0
-            latencies = []
-            start_time = datetime.now()
-            gpu_metrics_history = []
-
-            # Aggregate latency measurements
-            time_to_first_token_samples: List[float] = []
-            inter_token_latency_samples: List[float] = []
-            completion_time_samples: List[float] = []
-            prefill_latency_samples: List[float] = []
-            tool_call_latency_samples: List[float] = []
-            accuracy_samples: List[float] = []
+            latest_gpu_metrics: Dict[str, Any] = {}
+            tool_call_latency_sum, tool_call_count = 0.0, 0
+            accuracy_sum, accuracy_count = 0.0, 0
 
             # Start metrics collection task
             async def collect_metrics():
+                nonlocal latest_gpu_metrics
                 while True:
                     try:
-                        metrics = metrics_collector.collect_metrics()
-                        gpu_metrics_history.append(metrics)
-                        await asyncio.sleep(1)  # Collect every second
+                        latest_gpu_metrics = metrics_collector.collect_metrics() or {}
                     except Exception as e:
                         logger.error(f"Metrics collection error: {e}")
+                    await asyncio.sleep(1)  # Collect every second
 
             metrics_task = asyncio.create_task(collect_metrics())
+            # Only the run's own GPUs, so runs placed side by side do not share energy
+            gpu_sampler = GpuSampler(
+                interval_ms=config.get('power_sample_interval_ms') or 100,
+                devices=container_info.get('gpus') or None,
+            )
+            await gpu_sampler.start()
+            # A resumed segment continues the journal's clock right after the last recorded
+            # request, so segments stitch into one timeline with the downtime collapsed
+            origin = TelemetryTimeline.clock() - resume["offset"] if resume else None
+            timeline = TelemetryTimeline(gpu_sampler, origin=origin, sink=journal)
+            live = LiveRunStats(
+                run_id,
+                config['total_requests'],
+                window_seconds=config.get('live_window_seconds') or 30.0,
+            )
+            if resume:
+                live.completed = resume["completed"]
+                live.errors = resume["errors"]
 
-            try:
-                async with aiohttp.ClientSession() as session:
-                    tasks = []
-                    semaphore = asyncio.Semaphore(config['concurrency_level'])
-
-                    async def make_request():
-                        nonlocal success_count, total_tokens, total_latency, peak_tps
-                        async with semaphore:
-                            try:
-                                req_start = datetime.now()
-                                first_token_time: Optional[datetime] = None
-                                last_token_time: Optional[datetime] = None
-                                token_timestamps: List[datetime] = []
-                                tool_call_latency: Optional[float] = None
-
-                                payload = {
-                                    "model": model_info['full_name'],
-                                    "prompt": config['prompt'],
-                                    "max_tokens": config.get('max_tokens', 50),
-                                    "stream": config.get('stream', False)
-                                }
-
-                                async with session.post(
-                                    f"{endpoint_base}/v1/completions",
-                                    json=payload
-                                ) as response:
-                                    if response.status != 200:
-                                        logger.error(f"Request failed with status {response.status}")
-                                        return
-
-                                    completion_text = ""
-                                    if config.get('stream', False):
-                                        chunks = []
-                                        async for line in response.content:
-                                            if line.startswith(b'data: '):
-                                                now = datetime.now()
-                                                if not first_token_time:
-                                                    first_token_time = now
-                                                token_timestamps.append(now)
-                                                try:
-                                                    chunk = json.loads(line[6:])
-                                                    choice = chunk.get('choices', [{}])[0]
-                                                    if choice.get('text'):
-                                                        chunks.append(choice['text'])
-                                                    if choice.get('tool_calls'):
-                                                        tool_call_latency = (now - req_start).total_seconds()
-                                                except json.JSONDecodeError:
-                                                    continue
-                                        completion_text = ''.join(chunks)
-                                        tokens = len(completion_text.split())
-                                    else:
-                                        data = await response.json()
-                                        now = datetime.now()
-                                        first_token_time = now
-                                        token_timestamps.append(now)
-                                        choice = data.get("choices", [{}])[0]
-                                        completion_text = choice.get("text", "")
-                                        tokens = len(completion_text.split())
-                                        if choice.get('tool_calls'):
-                                            tool_call_latency = (now - req_start).total_seconds()
-
-                                    latency = (datetime.now() - req_start).total_seconds()
-                                    success_count += 1
-                                    total_tokens += tokens
-                                    total_latency += latency
-                                    latencies.append(latency)
-
-                                    completion_time_samples.append(latency)
-                                    if first_token_time:
-                                        ttft = (first_token_time - req_start).total_seconds()
-                                        time_to_first_token_samples.append(ttft)
-                                        prefill_latency_samples.append(ttft)
-                                    if len(token_timestamps) > 1:
-                                        deltas = [
-                                            (token_timestamps[i] - token_timestamps[i - 1]).total_seconds()
-                                            for i in range(1, len(token_timestamps))
-                                        ]
-                                        inter_token_latency_samples.extend(deltas)
-                                        last_token_time = token_timestamps[-1]
-                                    else:
-                                        last_token_time = token_timestamps[0] if token_timestamps else None
-
-                                    if tool_call_latency is not None:
-                                        tool_call_latency_samples.append(tool_call_latency)
-
-                                    if config.get("expected_output"):
-                                        accuracy_samples.append(
-                                            1.0 if completion_text.strip() == config["expected_output"].strip() else 0.0
-                                        )
-
-                                    # Calculate current and peak TPS
-                                    elapsed = (datetime.now() - start_time).total_seconds()
-                                    current_tps = total_tokens / elapsed if elapsed > 0 else 0
-                                    peak_tps = max(peak_tps, current_tps)
-
-                                    # Update real-time metrics
-                                    self.current_benchmark_metrics = {
-                                        "tokens_per_second": current_tps,
-                                        "peak_tps": peak_tps,
-                                        "latency": sum(latencies) / len(latencies) if latencies else 0,
-                                        "timestamp": datetime.now().isoformat(),
-                                        "completed_requests": success_count,
-                                        "total_requests": config['total_requests'],
-                                        "provider": provider_name,
-                                        "quantization": quantization
-                                    }
-
-                            except Exception as e:
-                                logger.error(f"Request error: {str(e)}")
-
-                    # Create and run concurrent requests
-                    tasks = [make_request() for _ in range(config['total_requests'])]
-                    await asyncio.gather(*tasks)
-
-                if not latencies:
-                    raise Exception("No successful requests completed")
+            # Publish rolling-window stats at a fixed cadence, independent of request rate
+            async def publish_live():
+                while True:
+                    await progress_tracker.publish_live(run_id, live.snapshot())
+                    await asyncio.sleep(config.get('live_publish_interval') or 1.0)
 
-                # Process GPU metrics
-                if gpu_metrics_history:
-                    avg_metrics = gpu_metrics_history[-1] or {}
-                    raw_gpu_metrics = avg_metrics.get('gpu_metrics') or []
+            publish_task = asyncio.create_task(publish_live()) if run_id is not None else None
+
+            # Container-level resource accounting for the NIM under test
+            stats_monitor = None
+            if container_info.get('container_id'):
+                try:
+                    stats_monitor = await container_manager.monitor_stats(container_info['container_id'])
+                except Exception as e:
+                    logger.warning(f"Container stats unavailable: {e}")
+
+            # Queue depth and KV cache usage as the server reports them, to explain latency spikes
+            server_scraper = None
+            if config.get('server_metrics'):
+                server_scraper = ServerMetricsScraper(
+                    config.get('server_metrics_url') or f"{endpoint_base}/metrics",
+                    interval=config.get('server_metrics_interval') or 1.0,
+                    extra_series=config.get('server_metrics_series'),
+                )
+                server_scraper.start()
+                timeline.server_metrics = server_scraper
 
-                    gpu_metrics = [{
-                        'gpu_utilization': gpu.get('gpu_utilization', 0),
-                        'gpu_memory_used': gpu.get('gpu_memory_used', 0),
-                        'gpu_memory_total': gpu.get('gpu_memory_total', 0),
-                        'gpu_temp': gpu.get('gpu_temp', 0),
-                        'power_draw': gpu.get('power_draw', 0)
-                    } for gpu in raw_gpu_metrics] if isinstance(raw_gpu_metrics, list) else []
+            # A request is sent once its headers are on the wire; the time before that, waiting
+            # for a pooled connection or connecting, is its queue time
+            async def on_headers_sent(_session, trace_ctx, _params):
+                if trace_ctx.trace_request_ctx is not None:
+                    trace_ctx.trace_request_ctx["sent"] = timeline.clock()
 
-                    avg_power = avg_metrics.get('power_draw', 0) or 0
-                else:
-                    gpu_metrics = []
-                    avg_power = 0
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_request_headers_sent.append(on_headers_sent)
 
-                tokens_per_watt = (total_tokens / total_latency) / avg_power if avg_power > 0 else 0
+            try:
+                async with aiohttp.ClientSession(trace_configs=[trace_config]) as session:
+
+                    def record_error(index: int, scheduled: float, sent: float):
+                        timeline.record_request(
+                            scheduled, sent, None, timeline.clock(), 0, "error",
+                            prompt_estimate, completions_url, workload, index,
+                        )
+                        live.request_finished(None, ok=False)
+
+                    async def make_request(index: int, scheduled: float):
+                        nonlocal success_count, total_tokens
+                        nonlocal tool_call_latency_sum, tool_call_count, accuracy_sum, accuracy_count
+                        trace: Dict[str, float] = {}
+                        live.request_started()
+                        try:
+                            first_token_time: Optional[float] = None
+                            last_token_time: Optional[float] = None
+                            chunk_count = 0
+                            tool_call_latency: Optional[float] = None
+                            prompt_tokens = prompt_estimate
+
+                            payload = {
+                                "model": model_info['full_name'],
+                                "prompt": config['prompt'],
+                                "max_tokens": config.get('max_tokens', 50),
+                                "stream": config.get('stream', False)
+                            }
+
+                            async with session.post(completions_url, json=payload, trace_request_ctx=trace) as response:
+                                req_start = trace.get("sent", scheduled)
+                                if response.status != 200:
+                                    logger.error(f"Request failed with status {response.status}")
+                                    record_error(index, scheduled, req_start)
+                                    return
+
+                                completion_text = ""
+                                if config.get('stream', False):
+                                    chunks = []
+                                    async for line in response.content:
+                                        if line.startswith(b'data: '):
+                                            now = timeline.clock()
+                                            if not first_token_time:
+                                                first_token_time = now
+                                            last_token_time = now
+                                            chunk_count += 1
+                                            try:
+                                                chunk = json.loads(line[6:])
+                                                usage = chunk.get('usage') or {}
+                                                prompt_tokens = usage.get('prompt_tokens', prompt_tokens)
+                                                choice = (chunk.get('choices') or [{}])[0]
+                                                if choice.get('text'):
+                                                    chunks.append(choice['text'])
+                                                if choice.get('tool_calls'):
+                                                    tool_call_latency = now - req_start
+                                            except json.JSONDecodeError:
+                                                continue
+                                    completion_text = ''.join(chunks)
+                                    tokens = len(completion_text.split())
+                                else:
+                                    data = await response.json()
+                                    now = timeline.clock()
+                                    first_token_time = last_token_time = now
+                                    chunk_count = 1
+                                    prompt_tokens = (data.get("usage") or {}).get("prompt_tokens", prompt_tokens)
+                                    choice = data.get("choices", [{}])[0]
+                                    completion_text = choice.get("text", "")
+                                    tokens = len(completion_text.split())
+                                    if choice.get('tool_calls'):
+                                        tool_call_latency = now - req_start
+
+                                req_end = timeline.clock()
+                                latency = req_end - req_start
+                                success_count += 1
+                                total_tokens += tokens
+
+                                if tool_call_latency is not None:
+                                    tool_call_latency_sum += tool_call_latency
+                                    tool_call_count += 1
+
+                                timeline.record_request(
+                                    scheduled, req_start, first_token_time, req_end, tokens, "ok",
+                                    prompt_tokens, completions_url, workload, index, chunk_count,
+                                )
+                                live.request_finished(
+                                    latency,
+                                    ttft=first_token_time - req_start if first_token_time else None,
+                                    itl=(last_token_time - first_token_time) / (chunk_count - 1)
+                                    if chunk_count > 1 else None,
+                                    tokens=tokens,
+                                )
+
+                                if config.get("expected_output"):
+                                    accuracy_sum += (
+                                        1.0 if completion_text.strip() == config["expected_output"].strip() else 0.0
+                                    )
+                                    accuracy_count += 1
+
+                        except Exception as e:
+                            logger.error(f"Request error: {str(e)}")
+                            record_error(index, scheduled, trace.get("sent", scheduled))
+
+                    # A fixed pool of workers pulls request indices, so pending requests are
+                    # never materialized up front and aborts stop new work immediately
+                    indices = resume["pending"] if resume else range(config['total_requests'])
+                    pending = iter(indices)
+
+                    async def worker():
+                        while run_id not in self._aborted_runs:
+                            index = next(pending, None)
+                            if index is None:
+                                return
+                            await make_request(index, timeline.clock())
+
+                    workers = [worker() for _ in range(min(config['concurrency_level'], len(indices)))]
+                    window_start = time.monotonic()
+                    await asyncio.gather(*workers)
+                    window_end = time.monotonic()
+
+                # A resumed run may have had nothing left to issue
+                if not success_count and indices:
+                    raise Exception("No successful requests completed")
+
+                # Process GPU metrics
+                raw_gpu_metrics = latest_gpu_metrics.get('gpu_metrics') or []
+                gpu_metrics = [{
+                    'gpu_utilization': gpu.get('gpu_utilization', 0),
+                    'gpu_memory_used': gpu.get('gpu_memory_used', 0),
+                    'gpu_memory_total': gpu.get('gpu_memory_total', 0),
+                    'gpu_temp': gpu.get('gpu_temp', 0),
+                    'power_draw': gpu.get('power_draw', 0)
+                } for gpu in raw_gpu_metrics] if isinstance(raw_gpu_metrics, list) else []
+
+                # Integrate power over the exact request window
+                await gpu_sampler.stop()
+                energy = gpu_sampler.energy_report(window_start, window_end, total_tokens, success_count)
+                total_joules = energy["total_energy_joules"]
+                # tokens/s per watt is dimensionally tokens per joule
+                tokens_per_watt = total_tokens / total_joules if total_joules > 0 else 0
+
+                container_resources = None
+                if stats_monitor:
+                    await stats_monitor.stop()
+                    container_resources = stats_monitor.summary(window_start, window_end)
+
+                server_metrics = None
+                if server_scraper:
+                    await server_scraper.stop()
+                    server_metrics = server_scraper.summary(window_start, window_end)
+
+                artifacts = await asyncio.to_thread(self._write_request_artifacts, timeline, run_stem)
+                # Request-level metrics come from the memory-mapped archive, not in-memory lists
+                request_summary = SampleArchive(artifacts["samples"]).summary()
+                timeline_buckets = await asyncio.to_thread(
+                    timeline.buckets, config.get('timeline_bucket_seconds') or 1.0
+                )
 
                 # Calculate final metrics
                 metrics = {
-                    "tokens_per_second": total_tokens / total_latency if total_latency > 0 else 0,
-                    "peak_tps": peak_tps,
-                    "latency": sum(latencies) / len(latencies),
-                    "p95_latency": sorted(latencies)[int(len(latencies) * 0.95)] if latencies else 0,
-                    "time_to_first_token": sum(time_to_first_token_samples) / len(time_to_first_token_samples)
-                    if time_to_first_token_samples else 0,
-                    "inter_token_latency": sum(inter_token_latency_samples) / len(inter_token_latency_samples)
-                    if inter_token_latency_samples else 0,
-                    "prefill_latency": sum(prefill_latency_samples) / len(prefill_latency_samples)
-                    if prefill_latency_samples else 0,
-                    "total_completion_time": sum(completion_time_samples) / len(completion_time_samples)
-                    if completion_time_samples else 0,
-                    "tool_call_latency": sum(tool_call_latency_samples) / len(tool_call_latency_samples)
-                    if tool_call_latency_samples else 0,
-                    "tool_call_accuracy": sum(accuracy_samples) / len(accuracy_samples) if accuracy_samples else None,
+                    **request_summary,
+                    "tool_call_latency": tool_call_latency_sum / tool_call_count if tool_call_count else 0,
+                    "tool_call_accuracy": accuracy_sum / accuracy_count if accuracy_count else None,
                     "gpu_metrics": gpu_metrics,
-                    "total_tokens": total_tokens,
                     "tokens_per_watt": tokens_per_watt,
-                    "successful_requests": success_count,
-                    "failed_requests": config['total_requests'] - success_count,
+                    "energy_joules": total_joules,
+                    "joules_per_token": energy["joules_per_token"],
+                    "joules_per_request": energy["joules_per_request"],
+                    "avg_power_watts": energy["avg_power_watts"],
+                    "peak_power_watts": energy["peak_power_watts"],
+                    "energy": energy,
+                    "container_resources": container_resources,
+                    "server_metrics": server_metrics,
+                    # Startup phase timeline of the NIM container, when this run started it
+                    "startup": container_info.get("startup"),
+                    "container_pool": container_info.get("pool"),
+                    # GPU indices and endpoint the NIM container was placed on
+                    "placement": {"gpus": container_info.get("gpus"), "endpoint": endpoint_base},
+                    "timeline": timeline_buckets,
+                    "artifacts": artifacts,
+                    "aborted": run_id in self._aborted_runs,
                     "model_name": model_info['full_name'],
                     "provider": provider_name,
                     "quantization": quantization,
-                    "historical": [{
-                        "timestamp": datetime.now().isoformat(),
-                        "tokens_per_second": total_tokens / total_latency if total_latency > 0 else 0,
-                        "latency": l
-                    } for l in latencies]
                 }
+                # Requests never issued because of an abort count as failed
+                metrics["failed_requests"] = config['total_requests'] - metrics["successful_requests"]
 
-                logger.info(f"Benchmark complete: {success_count}/{config['total_requests']} requests successful")
+                logger.info(
+                    f"Benchmark complete: {metrics['successful_requests']}/{config['total_requests']} requests successful"
+                )
                 return metrics
 
             finally:
+                if journal is not None:
+                    journal.close()
+                if publish_task:
+                    publish_task.cancel()
+                    await progress_tracker.publish_live(
+                        run_id, live.snapshot(status="aborted" if run_id in self._aborted_runs else "completed")
+                    )
+                    progress_tracker.finish(run_id)
+                    self._aborted_runs.discard(run_id)
+                await gpu_sampler.stop()
+                if stats_monitor:
+                    await stats_monitor.stop()
+                if server_scraper:
+                    await server_scraper.stop()
                 metrics_task.cancel()
                 try:
                     await metrics_task
@@ -257,97 +402,473 @@ class BenchmarkService:
             logger.error(f"Benchmark execution error: {str(e)}")
             raise
 
-    async def create_benchmark(self, config: Dict[str, Any]) -> Dict[str, Any]:
-        container_info = None
-        external_provider = config.get("provider") and not config.get("nim_id")
+    def abort_benchmark(self, run_id: int) -> bool:
+        """Stop issuing new requests for an active run; in-flight requests still complete."""
+        if run_id not in progress_tracker.progress:
+            return False
+        self._aborted_runs.add(run_id)
+        logger.info(f"Abort requested for benchmark {run_id}")
+        return True
+
+    async def _start_endpoint(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Acquire a ready NIM container from the warm pool, or describe the external endpoint."""
+        if config.get("provider") and not config.get("nim_id"):
+            return {
+                "container_id": None,
+                "image_name": config.get("provider", "external"),
+                "port": config.get("port", 8000),
+                "status": "ready",
+                "is_container": False,
+                "health": {"healthy": True, "status": "external", "checks": []},
+                "model_info": {"full_name": config.get("model_name", config.get("provider", "external"))},
+                "endpoint": config.get("endpoint"),
+                "provider": config.get("provider", "external")
+            }
+
+        container_info = await container_pool.acquire(
+            config['nim_id'],
+            config.get('gpu_count', 1),
+            config.get('container_env'),
+        )
+        if not container_info:
+            raise Exception("Failed to start NIM container")
+
+        if not await self.wait_for_nim_ready(container_info['container_id']):
+            raise RuntimeError("NIM container did not become ready")
+        # Index the server's startup settings and periodic stats for the run timeline
+        log_event_recorder.watch(container_info['container_id'])
+        return container_info
+
+    async def _release_endpoint(self, config: Dict[str, Any], container_info: Optional[Dict[str, Any]]):
+        """Hand a run's container back to the warm pool (or stop it when ``keep_warm`` is off)."""
+        if not container_info or not container_info.get('container_id'):
+            return
         try:
-            if not external_provider:
-                container_info = await container_manager.start_container(
-                    config['nim_id'],
-                    config.get('gpu_count', 1)
-                )
-                if not container_info:
-                    raise Exception("Failed to start NIM container")
+            if not await container_pool.release(
+                container_info['container_id'], discard=not config.get('keep_warm', True)
+            ):
+                await container_manager.stop_container(container_info['container_id'])
+        except Exception as e:
+            logger.error(f"Error stopping container: {str(e)}")
 
-                if not await self.wait_for_nim_ready(container_info['container_id']):
-                    raise RuntimeError("NIM container did not become ready")
-            else:
-                container_info = {
-                    "container_id": None,
-                    "image_name": config.get("provider", "external"),
-                    "port": config.get("port", 8000),
-                    "status": "ready",
-                    "is_container": False,
-                    "health": {"healthy": True, "status": "external", "checks": []},
-                    "model_info": {"full_name": config.get("model_name", config.get("provider", "external"))},
-                    "endpoint": config.get("endpoint"),
-                    "provider": config.get("provider", "external")
-                }
+    async def _archive_container_log(
+        self, container_info: Optional[Dict[str, Any]], since: datetime, run_stem: str
+    ) -> Optional[str]:
+        """Save the NIM container's log over the run next to its other artifacts.
+
+        Pooled containers serve several runs, so only lines since the run started
+        are kept. A failed capture is logged and never fails the run.
+        """
+        if not settings.LOG_ARCHIVE_RUNS or not container_info or not container_info.get("container_id"):
+            return None
+        try:
+            saved = await self.log_archive.save(container_info["container_id"], f"run_{run_stem}", since=since)
+            return saved["path"]
+        except Exception as e:
+            logger.warning(f"Could not archive the container log of run {run_stem}: {e}")
+            return None
 
-            metrics = await self.execute_nim_benchmark(config, container_info)
+    async def _save_run(
+        self,
+        run_id: int,
+        run_stem: str,
+        start_time: str,
+        config: Dict[str, Any],
+        metrics: Dict[str, Any],
+        container_info: Optional[Dict[str, Any]],
+        status: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        artifacts = metrics.pop("artifacts", {})
+        benchmark_file = self.benchmark_dir / f"benchmark_{run_stem}.json"
+
+        run_data = {
+            "id": run_id,
+            "name": config['name'],
+            "benchmark_type": config.get("benchmark_type", "throughput"),
+            "model_name": metrics['model_name'],
+            "status": status or ("aborted" if metrics.get("aborted") else "completed"),
+            "start_time": start_time,
+            "end_time": datetime.now().isoformat(),
+            "config": config,
+            "metrics": metrics,
+            "artifacts": artifacts
+        }
+
+        if container_info and container_info.get('container_id'):
+            run_data["container_id"] = container_info['container_id']
+
+        with open(benchmark_file, "w") as f:
+            json.dump(run_data, f, indent=2)
+        await results_store.save_run(run_data, benchmark_file)
+        # The sample archive now holds every request; the journal is no longer needed
+        shutil.rmtree(self.run_directory(run_id), ignore_errors=True)
+
+        logger.info(f"Benchmark results saved to {benchmark_file}")
+        return run_data
+
+    async def create_benchmark(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        container_info = None
+        start_time = datetime.now()
+        run_id = await results_store.allocate_run(config, start_time)
+        try:
+            container_info = await self._start_endpoint(config)
 
             # Create safe filename from benchmark name
             safe_name = "".join(c for c in config['name'] if c.isalnum() or c in ('-', '_')).strip()
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            benchmark_file = self.benchmark_dir / f"benchmark_{safe_name}_{timestamp}.json"
-
-            run_data = {
-                "id": len(self.get_benchmark_history()) + 1,
-                "name": config['name'],
-                "model_name": metrics['model_name'],
-                "status": "completed",
-                "start_time": datetime.now().isoformat(),
-                "end_time": datetime.now().isoformat(),
+            run_stem = f"{safe_name}_{timestamp}"
+
+            # Requests are journaled as they finish so a crash leaves a recoverable partial run
+            journal = RunJournal(self.run_directory(run_id))
+            journal.open({
+                "run_id": run_id,
+                "run_stem": run_stem,
+                "status": "running",
+                "start_time": start_time.isoformat(),
                 "config": config,
-                "metrics": metrics
-            }
-
-            if container_info and container_info.get('container_id'):
-                run_data["container_id"] = container_info['container_id']
-
-            with open(benchmark_file, "w") as f:
-                json.dump(run_data, f, indent=2)
+                "container_info": container_info,
+                "segments": [{"started_at": start_time.isoformat(), "offset": 0.0, "recorded_before": 0}],
+                "gaps": [],
+            })
 
-            logger.info(f"Benchmark results saved to {benchmark_file}")
-            return run_data
+            metrics = await self.execute_nim_benchmark(config, container_info, run_stem, run_id, journal)
+            metrics["artifacts"]["container_log"] = await self._archive_container_log(container_info, start_time, run_stem)
+            return await self._save_run(run_id, run_stem, start_time.isoformat(), config, metrics, container_info)
 
         except Exception as e:
             logger.error(f"Benchmark creation error: {str(e)}")
+            if not await self.finalize_partial_run(run_id):
+                await results_store.set_status(run_id, "failed")
             raise
         finally:
-            if container_info and container_info.get('container_id'):
-                try:
-                    await container_manager.stop_container(container_info['container_id'])
-                except Exception as e:
-                    logger.error(f"Error stopping container: {str(e)}")
+            await self._release_endpoint(config, container_info)
+
+    async def create_cold_start_benchmark(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Start and stop a NIM ``iterations`` times and store the startup time distribution."""
+        config = {**config, "benchmark_type": "cold_start"}
+        start_time = datetime.now()
+        run_id = await results_store.allocate_run(config, start_time)
+        total = config.get("warmup_runs", 0) + config["iterations"]
+
+        async def on_iteration(completed: int):
+            await progress_tracker.update_progress(run_id, completed, 0.0, total)
 
-    def get_benchmark_history(self) -> List[Dict[str, Any]]:
         try:
-            history = []
-            for file_path in self.benchmark_dir.glob("benchmark_*.json"):
-                try:
-                    with open(file_path, "r") as f:
-                        history.append(json.load(f))
-                except json.JSONDecodeError:
-                    logger.error(f"Error reading benchmark file: {file_path}")
-                    continue
-            return sorted(history, key=lambda x: x["id"], reverse=True)
+            await progress_tracker.update_progress(run_id, 0, 0.0, total)
+            metrics = await self.cold_start.run(
+                config, run_id, should_stop=lambda: run_id in self._aborted_runs, on_iteration=on_iteration
+            )
         except Exception as e:
-            logger.error(f"Error reading benchmark history: {e}")
-            return []
-
-    def get_benchmark(self, run_id: int) -> Optional[Dict[str, Any]]:
+            logger.error(f"Cold-start benchmark error: {str(e)}")
+            await results_store.set_status(run_id, "failed")
+            raise
+        finally:
+            progress_tracker.finish(run_id)
+            self._aborted_runs.discard(run_id)
+
+        safe_name = "".join(c for c in config['name'] if c.isalnum() or c in ('-', '_')).strip()
+        run_stem = f"{safe_name}_{start_time.strftime('%Y%m%d_%H%M%S')}"
+        # Failed starts are results too; the run only fails when no start succeeded
+        status = "failed" if metrics["iterations"] and not metrics["successful_starts"] else None
+        return await self._save_run(run_id, run_stem, start_time.isoformat(), config, metrics, None, status)
+
+    async def get_cold_start_trends(self, model: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
+        """Cold-start distributions per image version of each model, across stored runs."""
+        page = await results_store.list_runs(
+            model=model,
+            benchmark_type="cold_start",
+            limit=limit,
+            fields=["id", "status", "start_time", "metrics"],
+        )
+        return cold_start_trends([run for run in page["items"] if run["status"] in ("completed", "aborted")])
+
+    @staticmethod
+    def _workload_cursor(journal: RunJournal, total: int) -> Dict[str, Any]:
+        """Which request indices a journal already holds, and where its clock stopped."""
+        issued = bytearray(total)
+        completed = errors = 0
+        offset = 0.0
+        for record in journal.iter_records():
+            index = record.get("index", -1)
+            if 0 <= index < total:
+                issued[index] = 1
+            if record.get("status") == "ok":
+                completed += 1
+            else:
+                errors += 1
+            offset = max(offset, record.get("end") or 0.0)
+        return {
+            # Requests in flight at the interruption were never recorded, so they are issued again
+            "pending": [i for i in range(total) if not issued[i]],
+            "offset": offset,
+            "completed": completed,
+            "errors": errors,
+        }
+
+    async def _probe_endpoint(self, config: Dict[str, Any], container_info: Dict[str, Any]):
+        """Send one tiny completion so a resume does not journal a burst of errors."""
+        endpoint = (
+            config.get("endpoint") or container_info.get("endpoint")
+            or f"http://localhost:{container_info.get('port', 8000)}"
+        )
+        payload = {
+            "model": (container_info.get("model_info") or {}).get("full_name") or config.get("model_name", "unknown"),
+            "prompt": config["prompt"],
+            "max_tokens": 1,
+        }
         try:
-            for file_path in self.benchmark_dir.glob("benchmark_*.json"):
-                with open(file_path, "r") as f:
-                    run = json.load(f)
-                    if run.get("id") == run_id:
-                        return run
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+                async with session.post(f"{endpoint}/v1/completions", json=payload) as response:
+                    if response.status == 200:
+                        return
+                    reason = f"status {response.status}"
+        except Exception as e:
+            reason = str(e)
+        raise RuntimeError(f"Endpoint {endpoint} is not serving requests ({reason})")
+
+    async def resume_benchmark(self, run_id: int) -> Optional[Dict[str, Any]]:
+        """Continue an interrupted run from its journal; None if the run does not exist.
+
+        Requests already recorded are not issued again. The container comes from
+        the warm pool, which reuses it when it survived the interruption. The new segment
+        is appended to the same journal and the run is saved as one result, with the
+        interruption listed under ``metrics["gaps"]``.
+        """
+        run = await results_store.get_run(run_id)
+        if run is None:
             return None
+        if run_id in progress_tracker.progress:
+            raise ValueError(f"Benchmark {run_id} is already running")
+        if run["status"] not in RESUMABLE_STATUSES:
+            raise ValueError(f"Benchmark {run_id} is {run['status']} and cannot be resumed")
+        journal = RunJournal(self.run_directory(run_id))
+        if not journal.exists():
+            raise ValueError(f"Benchmark {run_id} has no journal to resume from")
+        journal.load()
+        state = journal.state
+        config = state["config"]
+        cursor = await asyncio.to_thread(self._workload_cursor, journal, config["total_requests"])
+
+        container_info = state.get("container_info") or {}
+        started = False
+        try:
+            if container_info.get("container_id"):
+                # A container that survived the interruption was adopted by the warm pool at startup
+                container_info = await self._start_endpoint(config)
+            if cursor["pending"]:
+                await self._probe_endpoint(config, container_info)
+
+            resumed_at = datetime.now()
+            interrupted_at = state.get("last_flush_at")
+            gap = {
+                "offset": cursor["offset"],
+                "interrupted_at": interrupted_at,
+                "resumed_at": resumed_at.isoformat(),
+                "downtime_seconds": (resumed_at - datetime.fromisoformat(interrupted_at)).total_seconds()
+                if interrupted_at else None,
+            }
+            segments = state.get("segments") or [
+                {"started_at": state.get("start_time"), "offset": 0.0, "recorded_before": 0}
+            ]
+            segments.append(
+                {"started_at": resumed_at.isoformat(), "offset": cursor["offset"], "recorded_before": journal.count}
+            )
+            gaps = (state.get("gaps") or []) + [gap]
+
+            journal.open()
+            journal.update_state(status="running", container_info=container_info, segments=segments, gaps=gaps)
+            await results_store.set_status(run_id, "running")
+            started = True
+            logger.info(
+                f"Resuming benchmark {run_id}: {journal.count} requests recorded, {len(cursor['pending'])} to issue"
+            )
+
+            metrics = await self.execute_nim_benchmark(
+                config, container_info, state["run_stem"], run_id, journal, resume=cursor
+            )
+            metrics["segments"] = segments
+            metrics["gaps"] = gaps
+            # Exports cached for the partial result are stale now
+            self.exporter.invalidate(run_id)
+            return await self._save_run(run_id, state["run_stem"], state["start_time"], config, metrics, container_info)
+
+        except Exception as e:
+            logger.error(f"Benchmark resume error: {str(e)}")
+            # Before the new segment starts, the run's stored result is still current
+            if started and not await self.finalize_partial_run(run_id):
+                await results_store.set_status(run_id, "failed")
+            raise
+        finally:
+            await self._release_endpoint(config, container_info)
+
+    async def finalize_partial_run(self, run_id: int) -> bool:
+        """Save whatever a run's journal holds as a ``partial`` run; False if nothing usable."""
+        journal = RunJournal(self.run_directory(run_id))
+        if not journal.exists():
+            return False
+        journal.load()
+        state = journal.state
+        if not journal.count or not state.get("run_stem"):
+            return False
+
+        config = state.get("config") or {}
+        container_info = state.get("container_info") or {}
+        # Journal times are relative to the run start, so the timeline origin is zero
+        timeline = TelemetryTimeline(origin=0.0, sink=journal)
+        artifacts = await asyncio.to_thread(self._write_request_artifacts, timeline, state["run_stem"])
+        summary = SampleArchive(artifacts["samples"]).summary()
+        if not summary["successful_requests"]:
+            return False
+
+        metrics = {
+            **summary,
+            "timeline": await asyncio.to_thread(timeline.buckets, config.get('timeline_bucket_seconds') or 1.0),
+            "model_name": (container_info.get("model_info") or {}).get("full_name") or config.get("model_name", "unknown"),
+            "provider": config.get("provider") or container_info.get("provider") or "nim",
+            "quantization": config.get("quantization", "default"),
+            "partial": {
+                "recorded_requests": journal.count,
+                "total_requests": config.get("total_requests"),
+                "last_flush_at": state.get("last_flush_at"),
+            },
+        }
+        if state.get("gaps"):
+            metrics["segments"] = state.get("segments")
+            metrics["gaps"] = state["gaps"]
+        run_data = {
+            "id": run_id,
+            "name": config.get("name"),
+            "model_name": metrics["model_name"],
+            "status": "partial",
+            "start_time": state.get("start_time"),
+            "end_time": state.get("last_flush_at") or datetime.now().isoformat(),
+            "config": config,
+            "metrics": metrics,
+            "artifacts": artifacts,
+        }
+        if container_info.get("container_id"):
+            run_data["container_id"] = container_info["container_id"]
+
+        benchmark_file = self.benchmark_dir / f"benchmark_{state['run_stem']}.json"
+        with open(benchmark_file, "w") as f:
+            json.dump(run_data, f, indent=2)
+        await results_store.save_run(run_data, benchmark_file)
+        # Exports cached for an earlier partial result of this run are stale now
+        self.exporter.invalidate(run_id)
+        journal.update_state(status="partial")
+        logger.warning(f"Benchmark {run_id} saved as partial with {journal.count} recorded requests")
+        return True
+
+    async def recover_interrupted_runs(self) -> int:
+        """Finalize runs left ``running`` by a crash or restart; call once at startup."""
+        recovered = 0
+        page = await results_store.list_runs(status="running", fields=["id"], limit=500)
+        for item in page["items"]:
+            try:
+                if await self.finalize_partial_run(item["id"]):
+                    recovered += 1
+                    continue
+            except Exception as e:
+                logger.error(f"Failed to recover benchmark {item['id']}: {e}")
+            await results_store.set_status(item["id"], "failed")
+        return recovered
+
+    async def get_benchmark_history(self, **query) -> Dict[str, Any]:
+        return await results_store.list_runs(**query)
+
+    async def get_benchmark(self, run_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            return await results_store.get_run(run_id)
         except Exception as e:
             logger.error(f"Error retrieving benchmark {run_id}: {e}")
             return None
 
+    async def get_sample_archive(self, run_id: int) -> Optional[SampleArchive]:
+        run = await self.get_benchmark(run_id)
+        samples_dir = ((run or {}).get("artifacts") or {}).get("samples")
+        if not samples_dir or not (Path(samples_dir) / "meta.json").exists():
+            return None
+        return SampleArchive(samples_dir)
+
+    async def compare_runs(
+        self,
+        run_ids: List[int],
+        baseline_id: Optional[int] = None,
+        **options,
+    ) -> Dict[str, Any]:
+        """Compare each run against a baseline (the first run unless ``baseline_id`` is given)."""
+        if baseline_id is None:
+            if len(run_ids) < 2:
+                raise ValueError("At least two runs are required for a comparison")
+            baseline_id, run_ids = run_ids[0], run_ids[1:]
+        candidates = [rid for rid in run_ids if rid != baseline_id]
+        if not candidates:
+            raise ValueError("No candidate runs to compare against the baseline")
+
+        archives = {}
+        for rid in [baseline_id] + candidates:
+            archive = await self.get_sample_archive(rid)
+            if archive is None:
+                raise ValueError(f"Run {rid} has no per-request sample archive")
+            archives[rid] = archive
+
+        # Bootstrap resampling is CPU-bound; keep it off the event loop
+        comparisons = []
+        for rid in candidates:
+            result = await asyncio.to_thread(compare_archives, archives[baseline_id], archives[rid], **options)
+            comparisons.append({"run_id": rid, **result})
+        return {
+            "baseline_id": baseline_id,
+            "comparisons": comparisons,
+            "verdict": overall_verdict([c["verdict"] for c in comparisons]),
+        }
+
+    async def compare_to_baseline(self, run_id: int, **options) -> Optional[Dict[str, Any]]:
+        baseline_id = await results_store.find_baseline(run_id)
+        if baseline_id is None:
+            return None
+        return await self.compare_runs([run_id], baseline_id=baseline_id, **options)
+
+    async def set_baseline(self, run_id: int, enabled: bool = True) -> bool:
+        return await results_store.set_baseline(run_id, enabled)
+
+    async def export_run(self, run_id: int, table: str, fmt: str) -> Optional[Path]:
+        """Materialize one table of a run in ``fmt``; None when the run has no such data."""
+        if table not in TABLES:
+            raise ValueError(f"Unsupported export table: {table}")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if table == "requests":
+            archive = await self.get_sample_archive(run_id)
+            if archive is None:
+                return None
+            return await asyncio.to_thread(self.exporter.export_requests, run_id, archive, fmt)
+        series = await self.get_benchmark_series(run_id)
+        if series is None:
+            return None
+        return await asyncio.to_thread(self.exporter.export_timeline, run_id, series.get("timeline") or [], fmt)
+
+    async def export_runs(self, run_ids: List[int], tables: List[str], fmt: str) -> Path:
+        """Bundle exports of several runs into one zip archive."""
+        files: Dict[int, List[Path]] = {}
+        for run_id in run_ids:
+            for table in tables:
+                path = await self.export_run(run_id, table, fmt)
+                if path is None:
+                    logger.warning(f"Skipping {table} export for benchmark {run_id}: no data")
+                    continue
+                files.setdefault(run_id, []).append(path)
+        if not files:
+            raise ValueError("None of the requested runs have exportable data")
+        return await asyncio.to_thread(self.exporter.bundle, files, fmt)
+
+    async def get_benchmark_series(self, run_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            return await results_store.get_series(run_id)
+        except Exception as e:
+            logger.error(f"Error retrieving series for benchmark {run_id}: {e}")
+            return None
+
 benchmark_service = BenchmarkService()
 
 __all__ = ['benchmark_service']
\ No newline at end of file
@@ -2,7 +2,9 @@
 from dataclasses import dataclass
 from datetime import datetime
 import asyncio
-from typing import Dict
+from typing import Any, Dict
+
+MAX_FINISHED_RUNS = 20
 
 @dataclass
 class BenchmarkProgress:
@@ -11,7 +13,7 @@ class BenchmarkProgress:
     total: int
     current_tps: float
     start_time: datetime
-    
+
     @property
     def estimated_time_remaining(self) -> float:
         elapsed = (datetime.utcnow() - self.start_time).total_seconds()
@@ -22,13 +24,15 @@ class BenchmarkProgress:
 class ProgressTracker:
     def __init__(self):
         self.progress: Dict[int, BenchmarkProgress] = {}
-    
-    async def update_progress(self, run_id: int, completed: int, current_tps: float):
+        # Latest rolling-window snapshot per run, published at a fixed cadence
+        self.live: Dict[int, Dict[str, Any]] = {}
+
+    async def update_progress(self, run_id: int, completed: int, current_tps: float, total: int = 100):
         if run_id not in self.progress:
             self.progress[run_id] = BenchmarkProgress(
                 run_id=run_id,
                 completed=completed,
-                total=100,  # Get from config
+                total=total,
                 current_tps=current_tps,
                 start_time=datetime.utcnow()
             )
@@ -36,4 +40,14 @@ class ProgressTracker:
             self.progress[run_id].completed = completed
             self.progress[run_id].current_tps = current_tps
 
+    async def publish_live(self, run_id: int, snapshot: Dict[str, Any]):
+        self.live[run_id] = snapshot
+        await self.update_progress(run_id, snapshot["completed"], snapshot["tokens_per_second"], snapshot["total"])
+
+    def finish(self, run_id: int):
+        self.progress.pop(run_id, None)
+        finished = [rid for rid, snap in self.live.items() if snap.get("status") != "running"]
+        for rid in finished[:-MAX_FINISHED_RUNS]:
+            self.live.pop(rid, None)
+
 progress_tracker = ProgressTracker()
@@ -0,0 +1,219 @@
+# app/services/cold_start.py
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from ..utils.logger import logger
+from .container import container_manager
+from .container_pool import container_pool
+from .readiness import PHASES
+
+# Labels containers started by a cold-start run, so they are never mistaken for pooled ones
+COLD_START_LABEL = "com.nvidia.nim.cold_start_run"
+PAGE_CACHE_MODES = ("warm", "cold")
+# "as_is" leaves the model cache alone; "present" prefetches once, "absent" evicts before every start
+MODEL_CACHE_MODES = ("as_is", "present", "absent")
+
+
+def distribution(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    array = np.asarray(values, dtype=float)
+    p50, p95 = np.percentile(array, [50, 95])
+    return {
+        "count": int(array.size),
+        "min": float(array.min()),
+        "mean": float(array.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "max": float(array.max()),
+        "stdev": float(array.std(ddof=1)) if array.size > 1 else 0.0,
+    }
+
+
+def summarize_starts(iterations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Distribution of time to first inference and of each startup phase, warm-up starts excluded."""
+    measured = [it for it in iterations if not it["warmup"]]
+    ready = [it for it in measured if it["status"] == "ready"]
+    return {
+        "iterations": len(measured),
+        "successful_starts": len(ready),
+        "failed_starts": len(measured) - len(ready),
+        "time_to_first_inference": distribution([it["time_to_first_inference"] for it in ready]),
+        "phases": {
+            phase: distribution([it["phases"][phase] for it in ready if phase in it["phases"]])
+            for phase in PHASES
+        },
+        "cache_hits": sum(1 for it in measured if it["cache_hit"] is True),
+        "cache_misses": sum(1 for it in measured if it["cache_hit"] is False),
+    }
+
+
+def image_version(image_name: str) -> str:
+    name = image_name.split("@")[0]
+    return name.rsplit(":", 1)[1] if ":" in name.split("/")[-1] else "latest"
+
+
+class ColdStartRunner:
+    """Starts and stops a NIM repeatedly and records how long each start takes to serve.
+
+    Every start goes around the warm pool. Before each one the model's weights
+    can be dropped from the page cache (``page_cache="cold"``) and the model
+    cache can be emptied (``model_cache="absent"``) or filled once up front
+    (``model_cache="present"``). Each start records the readiness phase
+    timeline and whether the model cache was hit.
+    """
+
+    async def prepare(self, config: Dict[str, Any]):
+        if config.get("model_cache") != "present":
+            return
+        cache = container_manager.cache
+        await cache.scan()
+        if cache.models_for(config["nim_id"]):
+            return
+        logger.info(f"Prefetching {config['nim_id']} so every start finds its weights cached")
+        job = cache.prefetch(config["nim_id"])
+        await job.task
+        if job.status != "completed":
+            raise RuntimeError(f"Prefetch of {config['nim_id']} {job.status}: {job.error}")
+
+    async def _set_conditions(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        cache = container_manager.cache
+        conditions: Dict[str, Any] = {}
+        if config.get("model_cache") == "absent":
+            await cache.scan()
+            report = await cache.evict(keys=cache.models_for(config["nim_id"]))
+            conditions["model_cache_evicted_bytes"] = report["freed_bytes"]
+            if report["skipped_in_use"]:
+                logger.warning(f"Model cache of {config['nim_id']} is used by a running NIM and stays cached")
+        if config.get("page_cache") == "cold":
+            conditions["page_cache_dropped_bytes"] = await cache.drop_page_cache(config["nim_id"])
+        return conditions
+
+    async def run_iteration(self, config: Dict[str, Any], run_id: int, index: int, warmup: bool) -> Dict[str, Any]:
+        record: Dict[str, Any] = {
+            "iteration": index,
+            "warmup": warmup,
+            "status": "failed",
+            "error": None,
+            "time_to_first_inference": None,
+            "phases": {},
+            "cache_hit": None,
+            "downloaded_bytes": None,
+            "container_id": None,
+            "gpus": None,
+        }
+        info = None
+        try:
+            record.update(await self._set_conditions(config))
+            # Idle warm containers, e.g. left by a throughput run, would otherwise hold the GPUs
+            placement = await container_pool.reserve_outside(config.get("gpu_count", 1))
+            info = await container_manager.start_container(
+                config["nim_id"],
+                config.get("gpu_count", 1),
+                env=config.get("container_env"),
+                labels={COLD_START_LABEL: str(run_id)},
+                placement=placement,
+            )
+            startup = info.get("startup") or {}
+            cache = info.get("cache") or {}
+            record.update({
+                "status": "ready",
+                "time_to_first_inference": startup.get("total_seconds"),
+                "phases": {p["phase"]: p["duration"] for p in startup.get("phases", [])},
+                "missing_phases": startup.get("missing_phases"),
+                "cache_hit": cache.get("hit"),
+                "downloaded_bytes": cache.get("downloaded_bytes"),
+                "container_id": info["container_id"],
+                "gpus": info.get("gpus"),
+            })
+        except Exception as e:
+            # start_container already removed a container that did not become ready
+            record["error"] = str(e)
+        finally:
+            if info:
+                try:
+                    await container_manager.stop_container(info["container_id"])
+                except Exception as e:
+                    logger.warning(f"Failed to stop cold-start container {info['container_id'][:12]}: {e}")
+        logger.info(
+            f"Cold start {index + 1}{' (warm-up)' if warmup else ''} of {config['nim_id']}: {record['status']}"
+            + (f" after {record['time_to_first_inference']:.1f}s" if record["time_to_first_inference"] else "")
+        )
+        return record
+
+    async def run(
+        self,
+        config: Dict[str, Any],
+        run_id: int,
+        should_stop: Callable[[], bool] = lambda: False,
+        on_iteration: Optional[Callable[[int], Any]] = None,
+    ) -> Dict[str, Any]:
+        """Run the warm-up and measured starts; returns the run metrics."""
+        await self.prepare(config)
+        iterations: List[Dict[str, Any]] = []
+        warmup_runs = config.get("warmup_runs", 0)
+        total = warmup_runs + config["iterations"]
+        for index in range(total):
+            if should_stop():
+                break
+            if index:
+                # Give the driver time to release GPU memory of the previous container
+                await asyncio.sleep(config.get("cooldown_seconds", 5.0))
+            iterations.append(await self.run_iteration(config, run_id, index, warmup=index < warmup_runs))
+            if on_iteration:
+                await on_iteration(len(iterations))
+
+        model_info = container_manager.parse_model_info(config["nim_id"])
+        summary = summarize_starts(iterations)
+        return {
+            **summary,
+            "conditions": {
+                "page_cache": config.get("page_cache", "warm"),
+                "model_cache": config.get("model_cache", "as_is"),
+                "warmup_runs": warmup_runs,
+                "gpu_count": config.get("gpu_count", 1),
+            },
+            "starts": iterations,
+            "aborted": len(iterations) < total,
+            "image_name": config["nim_id"],
+            "image_version": image_version(config["nim_id"]),
+            "model_name": model_info["full_name"],
+            "provider": "nim",
+            "successful_requests": summary["successful_starts"],
+        }
+
+
+def cold_start_trends(runs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Pool the starts of cold-start runs per model, image version and start conditions, oldest version first."""
+    groups: Dict[tuple, Dict[str, Any]] = {}
+    for run in sorted(runs, key=lambda r: r.get("start_time") or ""):
+        metrics = run.get("metrics") or {}
+        conditions = metrics.get("conditions") or {}
+        key = (
+            metrics.get("model_name"),
+            metrics.get("image_version"),
+            conditions.get("page_cache"),
+            conditions.get("model_cache"),
+        )
+        group = groups.setdefault(key, {
+            "model_name": key[0],
+            "image_version": key[1],
+            "page_cache": key[2],
+            "model_cache": key[3],
+            "run_ids": [],
+            "first_run_at": run.get("start_time"),
+            "last_run_at": None,
+            "starts": [],
+        })
+        group["run_ids"].append(run["id"])
+        group["last_run_at"] = run.get("start_time")
+        group["starts"].extend(it for it in metrics.get("starts") or [] if not it.get("warmup"))
+
+    trends = []
+    for group in groups.values():
+        summary = summarize_starts(group.pop("starts"))
+        trends.append({**group, **summary})
+    return trends
+
+
+__all__ = ['ColdStartRunner', 'summarize_starts', 'cold_start_trends', 'COLD_START_LABEL', 'PAGE_CACHE_MODES', 'MODEL_CACHE_MODES']
@@ -1,19 +1,29 @@
 # app/services/container.py
 import os
-import asyncio
 import json
 import docker
-import aiohttp
-from datetime import datetime
+from contextlib import aclosing
 from docker.errors import APIError
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Any
 from ..config import settings
 from ..utils.logger import logger
 from ..utils.ngc_key_helper import retrieve_key
+from .container_stats import ContainerStatsMonitor
+from .docker_async import AsyncDocker
+from .nim_cache import CONTAINER_CACHE_PATH, NimCache
+from .nim_pull import PullManager
+from .placement import CONTAINER_PORT, Placement, PlacementError, placement_scheduler
+from .readiness import StartupTracker, readiness_engine
 
 class ContainerManager:
-    def __init__(self):
-        self.client = docker.from_env()
+    def __init__(self, client=None):
+        # Any object with the docker SDK client interface works, e.g. a fake in tests
+        self.client = client or docker.from_env()
+        # Every docker SDK call runs off the event loop through this pool
+        self.docker = AsyncDocker(max_workers=settings.DOCKER_MAX_WORKERS)
+        # Image pulls run as jobs with progress; a start joins a pull already in flight
+        self.pulls = PullManager(self.client, self.docker)
+        self.cache = NimCache(self.client, self.docker, self.pulls)
         self._active_nim = None
 
     def parse_model_info(self, image_name: str) -> Dict[str, str]:
@@ -35,128 +45,162 @@ class ContainerManager:
                 'full_name': 'unknown/unknown'
             }
 
-    async def wait_for_container_ready(self, container, model_info: Dict[str, str], timeout: int = 1200) -> str:
-        """Wait for the NIM container to be fully initialized by monitoring logs and sending a test request."""
-        start_time = datetime.now()
-        readiness_marker = "Uvicorn running on http://0.0.0.0:8000"
-        log_stream = container.logs(stream=True, follow=True)
-        server_started = False
-
+    async def wait_for_container_ready(
+        self,
+        container,
+        model_info: Dict[str, str],
+        timeout: int = 1200,
+        tracker: Optional[StartupTracker] = None,
+        port: Optional[int] = None,
+    ) -> str:
+        """Wait for the NIM container to serve an inference; logs and health endpoints are watched concurrently."""
+        tracker = readiness_engine.register(container.id, tracker)
+        port = port or self._get_container_port(container) or settings.BASE_PORT
+        readiness_engine.watch(tracker, self.follow_logs(container), f"http://localhost:{port}", model_info['full_name'])
+        status = await tracker.wait(timeout)
+        if status != "ready":
+            logger.error(f"Container {container.id} not ready ({status}): {tracker.error}")
+        return status
+
+    async def follow_logs(self, container, **kwargs) -> AsyncIterator[bytes]:
+        """Follow a container's log lines (a container object or id) as an async iterator."""
+        if isinstance(container, str):
+            container = await self.docker.call(self.client.containers.get, container)
+        async with aclosing(self.docker.stream(lambda: container.logs(stream=True, follow=True, **kwargs))) as lines:
+            async for line in lines:
+                yield line
+
+    async def list_containers(self) -> List[Dict[str, Any]]:
+        """Scan the daemon for NIM containers and images; the API reads the cached inventory instead."""
+        return await self.docker.call(self._list_containers)
+
+    def _list_containers(self) -> List[Dict[str, Any]]:
         try:
-            # Monitor logs for readiness marker
-            for log_line in log_stream:
-                log_line = log_line.decode("utf-8").strip()
-                logger.info(f"Container Log: {log_line}")
-
-                if readiness_marker in log_line:
-                    logger.info(f"Container {container.id} server started, sending test request to verify readiness...")
-                    server_started = True
-                    break
-
-                if any(err in log_line.lower() for err in ["error:", "exception:", "failed"]):
-                    logger.error(f"Error in container logs: {log_line}")
-                    return "error"
-
-                elapsed_time = (datetime.now() - start_time).seconds
-                if elapsed_time > timeout:
-                    logger.error(f"Timeout waiting for server to start after {elapsed_time} seconds")
-                    return "timeout"
-
-            if not server_started:
-                return "error"
-
-            # Send a test request to verify the model is alive
-            port = 8000
-            max_retries = 5
-            retry_delay = 10
-            for attempt in range(max_retries):
-                try:
-                    async with aiohttp.ClientSession() as session:
-                        payload = {
-                            "model": model_info['full_name'],
-                            "messages": [{"role": "user", "content": "Are you alive?"}],
-                            "max_tokens": 64
-                        }
-                        headers = {
-                            "accept": "application/json",
-                            "Content-Type": "application/json"
-                        }
-                        async with session.post(f"http://localhost:{port}/v1/chat/completions", json=payload, headers=headers) as resp:
-                            if resp.status == 200:
-                                response_data = await resp.json()
-                                logger.info(f"Container {container.id} responded successfully: {response_data}")
-                                return "ready"
-                            else:
-                                logger.error(f"Unexpected response status: {resp.status}")
-                except Exception as e:
-                    logger.warning(f"Attempt {attempt + 1}/{max_retries}: Error sending test request to container: {e}")
-                await asyncio.sleep(retry_delay)
-
-            logger.error(f"Container did not respond after {max_retries} attempts")
-            return "timeout"
-
+            containers, images = self.scan_inventory()
+            return self.merge_inventory(containers.values(), images.values())
         except Exception as e:
-            logger.error(f"Error monitoring container startup: {e}")
-            return "error"
+            logger.error(f"Error listing containers: {e}")
+            return []
 
-    def list_containers(self) -> List[Dict[str, Any]]:
-        """List all NIM-related containers and images."""
+    def scan_inventory(self):
+        """All NIM containers by id and all images by id, in as few daemon calls as possible.
+
+        The high-level ``list`` calls inspect every object; the summaries are one
+        call each, and only NIM containers are inspected for ports, GPUs and health.
+        """
+        images = {raw["Id"]: self.describe_image(raw) for raw in self.client.api.images()}
+        containers = {}
+        for summary in self.client.api.containers(all=True):
+            tags = (images.get(summary.get("ImageID")) or {}).get("tags") or []
+            if not self._is_nim(summary.get("Labels") or {}, tags, summary.get("Image")):
+                continue
+            try:
+                container = self.client.containers.get(summary["Id"])
+            except docker.errors.NotFound:
+                continue
+            containers[container.id] = self.describe_container(container, images)
+        return containers, images
+
+    @staticmethod
+    def _is_nim(labels: Dict[str, str], tags: List[str], reference: Optional[str]) -> bool:
+        return labels.get("com.nvidia.nim") == "true" or any(
+            "nim" in tag.lower() for tag in tags + [reference or ""]
+        )
+
+    @staticmethod
+    def describe_image(raw: Dict[str, Any]) -> Dict[str, Any]:
+        """Image entry from an image summary or an inspect result."""
+        return {
+            "id": raw["Id"],
+            "tags": [t for t in raw.get("RepoTags") or [] if t != "<none>:<none>"],
+            "labels": raw.get("Labels") or (raw.get("Config") or {}).get("Labels") or {},
+        }
+
+    def describe_container(self, container, images: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Listing entry for a NIM container, None for other containers; reads only ``attrs``."""
+        # container.image would cost one more daemon round trip per container
+        image_id = container.attrs.get("Image")
+        tags = (images.get(image_id) or {}).get("tags") or []
+        reference = (container.attrs.get("Config") or {}).get("Image")
+        if not self._is_nim(container.labels, tags, reference):
+            return None
+        port = self._get_container_port(container)
+        container_info = {
+            "container_id": container.id,
+            "image_name": tags[0] if tags else reference or image_id,
+            "port": port,
+            "endpoint": f"http://localhost:{port}" if port else None,
+            "gpus": self._get_container_gpus(container),
+            "status": "running" if container.status == "running" else "stopped",
+            "is_container": True,
+            "health": self._check_container_health(container),
+            "labels": container.labels,
+            "tags": tags
+        }
+        logger.debug(f"Found NIM container: {container_info}")
+        return container_info
+
+    @staticmethod
+    def merge_inventory(containers: Iterable[Dict[str, Any]], images: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """NIM containers plus NIM images without a container, running containers first."""
+        nim_containers = list(containers)
+        seen_images = {c["image_name"] for c in nim_containers}
+        for image in images:
+            for tag in image["tags"]:
+                if "nim" in tag.lower() and tag not in seen_images:
+                    nim_containers.append({
+                        "container_id": None,
+                        "image_name": tag,
+                        "port": None,
+                        "endpoint": None,
+                        "gpus": [],
+                        "status": "not_running",
+                        "is_container": False,
+                        "health": {"healthy": False, "status": "no_container", "checks": []},
+                        "labels": image["labels"],
+                        "tags": [tag]
+                    })
+                    seen_images.add(tag)
+
+        return sorted(nim_containers, key=lambda x: (
+            0 if x.get("status") == "running" else
+            1 if x.get("status") == "stopped" else
+            2
+        ))
+
+    async def reattach_container(self, container_id: str) -> Optional[Dict[str, Any]]:
+        """Adopt a container that is still running, e.g. after a server restart; None if it is gone."""
+        container_info = await self.docker.call(self._inspect_running, container_id)
+        if container_info:
+            placement_scheduler.adopt(container_id, container_info["gpus"], container_info["port"])
+            self._active_nim = container_info
+            self.save_nim(container_info)
+        return container_info
+
+    def _inspect_running(self, container_id: str) -> Optional[Dict[str, Any]]:
         try:
-            all_containers = self.client.containers.list(all=True)
-            all_images = self.client.images.list()
-            
-            nim_containers = []
-            seen_images = set()
-            
-            for container in all_containers:
-                image_name = container.image.tags[0] if container.image.tags else container.image.id
-                
-                is_nim = (
-                    container.labels.get("com.nvidia.nim") == "true" or
-                    any("nim" in tag.lower() for tag in container.image.tags) if container.image.tags else False
-                )
-                
-                if is_nim:
-                    seen_images.add(image_name)
-                    container_info = {
-                        "container_id": container.id,
-                        "image_name": image_name,
-                        "port": 8000,  # Hardcoding port to 8000
-                        "status": "running" if container.status == "running" else "stopped",
-                        "is_container": True,
-                        "health": self._check_container_health(container),
-                        "labels": container.labels,
-                        "tags": container.image.tags
-                    }
-                    logger.debug(f"Found NIM container: {container_info}")
-                    nim_containers.append(container_info)
-            
-            for image in all_images:
-                for tag in image.tags:
-                    if "nim" in tag.lower() and tag not in seen_images:
-                        image_info = {
-                            "container_id": None,
-                            "image_name": tag,
-                            "port": None,
-                            "status": "not_running",
-                            "is_container": False,
-                            "health": {"healthy": False, "status": "no_container", "checks": []},
-                            "labels": image.labels,
-                            "tags": [tag]
-                        }
-                        logger.debug(f"Found NIM image: {image_info}")
-                        nim_containers.append(image_info)
-                        seen_images.add(tag)
-
-            return sorted(nim_containers, key=lambda x: (
-                0 if x.get("status") == "running" else
-                1 if x.get("status") == "stopped" else
-                2
-            ))
+            container = self.client.containers.get(container_id)
+        except docker.errors.NotFound:
+            return None
+        except APIError as e:
+            logger.warning(f"Could not inspect container {container_id}: {e}")
+            return None
+        if container.status != "running":
+            return None
 
-        except Exception as e:
-            logger.error(f"Error listing containers: {e}")
-            return []
+        image_name = container.image.tags[0] if container.image.tags else container.image.id
+        port = self._get_container_port(container)
+        return {
+            "container_id": container.id,
+            "image_name": image_name,
+            "port": port,
+            "endpoint": f"http://localhost:{port}" if port else None,
+            "gpus": self._get_container_gpus(container),
+            "status": "ready",
+            "is_container": True,
+            "health": self._check_container_health(container),
+            "model_info": self.parse_model_info(image_name)
+        }
 
     def _check_container_health(self, container) -> Dict[str, Any]:
         """Check the health of a container based on Docker's health status."""
@@ -177,18 +221,63 @@ class ContainerManager:
             return {"healthy": False, "status": "unknown", "checks": []}
 
     def _get_container_port(self, container) -> Optional[int]:
-        """Retrieve the mapped port for the container."""
+        """Host port published for the NIM server port of the container."""
         try:
-            if container.status != "running":
+            if container.status not in ("created", "running"):
                 return None
-                
-            return 8000  # Hardcoded port to 8000
+            # NetworkSettings is only filled in once the container runs; the binding is known from creation
+            bindings = (
+                (container.attrs.get("NetworkSettings") or {}).get("Ports") or {}
+            ).get(CONTAINER_PORT) or (
+                (container.attrs.get("HostConfig") or {}).get("PortBindings") or {}
+            ).get(CONTAINER_PORT)
+            for binding in bindings or []:
+                if binding.get("HostPort"):
+                    return int(binding["HostPort"])
+            return None
         except Exception as e:
             logger.error(f"Error getting container port mapping: {e}")
             return None
 
-    async def start_container(self, image_name: str, gpu_count: int = 1) -> Optional[Dict[str, Any]]:
-        """Start a NIM container with GPU support."""
+    def _get_container_gpus(self, container) -> List[int]:
+        """GPU indices the container was started on; empty when it asked for a GPU count instead."""
+        requests = (container.attrs.get("HostConfig") or {}).get("DeviceRequests") or []
+        return [int(d) for r in requests for d in (r.get("DeviceIDs") or []) if str(d).isdigit()]
+
+    async def _reserve_placement(self, gpu_count: int) -> Placement:
+        try:
+            return placement_scheduler.reserve(gpu_count)
+        except PlacementError:
+            # Containers may have exited on their own; drop their placements and retry once
+            await self.sync_placements()
+            return placement_scheduler.reserve(gpu_count)
+
+    async def sync_placements(self):
+        """Rebuild GPU and port placements from the NIM containers that are running."""
+        def scan() -> List[Dict[str, Any]]:
+            return [
+                {"container_id": c.id, "gpus": self._get_container_gpus(c), "port": self._get_container_port(c)}
+                for c in self.client.containers.list(filters={"label": "com.nvidia.nim=true"})
+            ]
+        running = await self.docker.call(scan)
+        placement_scheduler.retain([c["container_id"] for c in running])
+        for item in running:
+            placement_scheduler.adopt(item["container_id"], item["gpus"], item["port"])
+
+    async def start_container(
+        self,
+        image_name: str,
+        gpu_count: int = 1,
+        env: Optional[Dict[str, str]] = None,
+        labels: Optional[Dict[str, str]] = None,
+        placement: Optional[Placement] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Start a NIM container on its own GPUs and host port; ``env`` and ``labels`` are added to the defaults.
+
+        ``placement`` is a reservation from the placement scheduler; one is made when
+        it is omitted. It is released again if the container fails to start.
+        """
+        container = None
         try:
             ngc_key = retrieve_key()
             if not ngc_key:
@@ -197,26 +286,34 @@ class ContainerManager:
             if ngc_key not in os.environ.get("NGC_API_KEY", ""):
                 os.environ["NGC_API_KEY"] = ngc_key
 
-            local_nim_cache = os.path.expanduser("~/.cache/nim")
-            os.makedirs(local_nim_cache, exist_ok=True)
+            local_nim_cache = self.cache.ensure_dir()
 
             model_info = self.parse_model_info(image_name)
-            
-            container = self.client.containers.run(
+            tracker = StartupTracker()
+            placement = placement or await self._reserve_placement(gpu_count)
+            await self.pulls.ensure_image(image_name)
+            tracker.mark("image_ready")
+            cache_before = await self.cache.usage(image_name)
+
+            container = await self.docker.call(
+                self.client.containers.run,
                 image_name,
                 detach=True,
                 remove=True,
                 environment={
+                    **(env or {}),
                     "NGC_API_KEY": ngc_key,
                 },
-                labels={"com.nvidia.nim": "true"},
-                ports={'8000/tcp': 8000},  # Bind container port 8000 to host port 8000
+                labels={**(labels or {}), "com.nvidia.nim": "true"},
+                ports={CONTAINER_PORT: placement.port},
                 device_requests=[
-                    docker.types.DeviceRequest(count=gpu_count, capabilities=[["gpu"]])
+                    docker.types.DeviceRequest(
+                        device_ids=[str(d) for d in placement.device_ids], capabilities=[["gpu"]]
+                    )
                 ],
                 volumes={
                     local_nim_cache: {
-                        'bind': '/opt/nim/.cache',
+                        'bind': CONTAINER_CACHE_PATH,
                         'mode': 'rw'
                     }
                 },
@@ -224,19 +321,31 @@ class ContainerManager:
                 shm_size='16G'
             )
 
-            logger.info(f"Container created, waiting for initialization...")
+            placement_scheduler.bind(placement, container.id)
+            tracker.mark("container_created")
+            logger.info(f"Container created on GPUs {placement.device_ids}, port {placement.port}; waiting for initialization...")
             
             # Wait for container readiness
-            container_status = await self.wait_for_container_ready(container, model_info)
+            container_status = await self.wait_for_container_ready(
+                container, model_info, tracker=tracker, port=placement.port
+            )
+            try:
+                tracker.cache = await self.cache.record_start(image_name, cache_before)
+            except Exception as cache_error:
+                logger.warning(f"Could not classify the model cache for {image_name}: {cache_error}")
             
             container_info = {
                 "container_id": container.id,
                 "image_name": image_name,
-                "port": 8000,  # Hardcoded port to 8000
+                "port": placement.port,
+                "endpoint": placement.endpoint,
+                "gpus": placement.device_ids,
                 "status": container_status,
                 "is_container": True,
                 "health": self._check_container_health(container),
-                "model_info": model_info
+                "model_info": model_info,
+                "startup": tracker.timeline(),
+                "cache": tracker.cache
             }
 
             # Only set active NIM if container is ready
@@ -246,40 +355,73 @@ class ContainerManager:
                 logger.info(f"Started NIM container: {container_info}")
                 return container_info
             else:
+                # Don't leave a half-started container holding GPUs and the port
+                try:
+                    await self.stop_container(container.id)
+                except Exception as stop_error:
+                    logger.warning(f"Failed to remove container {container.id}: {stop_error}")
                 raise RuntimeError(f"Container failed to start properly: {container_status}")
 
         except Exception as e:
             logger.error(f"Failed to start container: {e}")
+            if container is None:
+                placement_scheduler.release(placement)
             raise
 
+    async def list_labelled(self, label: str) -> List[Dict[str, Any]]:
+        """Running containers carrying ``label``, as id plus labels."""
+        def scan() -> List[Dict[str, Any]]:
+            return [
+                {"container_id": c.id, "labels": c.labels}
+                for c in self.client.containers.list(filters={"label": label, "status": "running"})
+            ]
+        return await self.docker.call(scan)
+
     async def stop_container(self, container_id: Optional[str] = None):
         """Stop and remove a container."""
-        try:
-            if not container_id:
-                active_nim = self._active_nim or self.load_nim()
-                container_id = (active_nim or {}).get("container_id")
+        if not container_id:
+            active_nim = self._active_nim or self.load_nim()
+            container_id = (active_nim or {}).get("container_id")
 
-            if not container_id:
-                raise RuntimeError("No running NIM container found to stop.")
+        if not container_id:
+            raise RuntimeError("No running NIM container found to stop.")
 
+        def stop_and_remove():
             container = self.client.containers.get(container_id)
             container.stop(timeout=2)
             container.remove(force=True)
-            logger.info(f"Stopped and removed container: {container_id}")
 
-            if self._active_nim and self._active_nim.get('container_id') == container_id:
-                self._active_nim = None
-
-            if os.path.exists(settings.NIM_FILE):
-                try:
-                    os.remove(settings.NIM_FILE)
-                except OSError as file_error:
-                    logger.warning(f"Failed to remove NIM file {settings.NIM_FILE}: {file_error}")
+        try:
+            await self.docker.call(stop_and_remove)
+        except docker.errors.NotFound:
+            logger.info(f"Container {container_id} already gone")
         except APIError as e:
             if "removal of container" in str(e) and "is already in progress" in str(e):
                 logger.info(f"Container {container_id} already being removed")
             else:
                 raise
+        finally:
+            # Free its GPUs and port even when the daemon refused; a failed stop is reported to the caller
+            placement_scheduler.release_container(container_id)
+        logger.info(f"Stopped and removed container: {container_id}")
+
+        if self._active_nim and self._active_nim.get('container_id') == container_id:
+            self._active_nim = None
+
+        # Other NIMs may still be running; only forget the saved one if it was this container
+        saved = self.load_nim() if os.path.exists(settings.NIM_FILE) else None
+        if saved is not None and saved.get("container_id") in (container_id, None):
+            try:
+                os.remove(settings.NIM_FILE)
+            except OSError as file_error:
+                logger.warning(f"Failed to remove NIM file {settings.NIM_FILE}: {file_error}")
+
+    async def monitor_stats(self, container_id: str, interval: float = 1.0) -> ContainerStatsMonitor:
+        """Subscribe to the Docker stats stream of a container in a background worker."""
+        container = await self.docker.call(self.client.containers.get, container_id)
+        monitor = ContainerStatsMonitor(container, interval=interval)
+        monitor.start()
+        return monitor
 
     def save_nim(self, nim_info: Dict):
         """Save NIM information to a file."""
@@ -0,0 +1,291 @@
+# app/services/container_pool.py
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import aiohttp
+from ..config import settings
+from ..utils.logger import logger
+from .container import container_manager
+from .placement import Placement, PlacementError, placement_scheduler
+
+# Labels carrying the pool key and what it was made from, so warm containers can be
+# re-adopted after a restart. The key is a digest: env values may hold secrets and
+# labels are readable by anyone who can inspect the container.
+POOL_LABEL = "com.nvidia.nim.pool_key"
+POOL_IMAGE_LABEL = "com.nvidia.nim.pool_image"
+POOL_GPUS_LABEL = "com.nvidia.nim.pool_gpu_count"
+POOL_ENV_LABEL = "com.nvidia.nim.pool_env"
+REAP_INTERVAL_SECONDS = 60
+HEALTH_TIMEOUT_SECONDS = 5
+
+
+def pool_key(image_name: str, gpu_count: int, env: Optional[Dict[str, str]] = None) -> str:
+    payload = json.dumps([image_name, gpu_count, sorted((env or {}).items())])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def pool_labels(key: str, image_name: str, gpu_count: int, env: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Docker labels of a pooled container; env is recorded by name only."""
+    return {
+        POOL_LABEL: key,
+        POOL_IMAGE_LABEL: image_name,
+        POOL_GPUS_LABEL: str(gpu_count),
+        POOL_ENV_LABEL: ",".join(sorted(env or {})),
+    }
+
+
+@dataclass
+class PooledContainer:
+    key: str
+    image_name: str
+    gpu_count: int
+    info: Dict[str, Any]
+    busy: bool = False
+    uses: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    env_names: List[str] = field(default_factory=list)
+
+    @property
+    def container_id(self) -> str:
+        return self.info["container_id"]
+
+
+class ContainerPool:
+    """Keeps NIM containers running between benchmarks.
+
+    Containers are keyed by (image, gpu_count, env). A released container stays
+    up until it has been idle for ``CONTAINER_POOL_IDLE_TTL_SECONDS``. When a
+    start would exceed the GPU budget, idle containers are evicted least
+    recently used first; the same happens when the placement scheduler has too
+    few free GPUs. A container is health-checked before it is reused.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, PooledContainer] = {}
+        self._reserved_gpus = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._gpu_budget: Optional[int] = None
+
+    @property
+    def gpu_budget(self) -> int:
+        if self._gpu_budget is None:
+            self._gpu_budget = settings.CONTAINER_POOL_GPU_BUDGET or len(placement_scheduler.gpu_devices()) or 1
+        return self._gpu_budget
+
+    def _gpus_in_use(self) -> int:
+        return sum(e.gpu_count for e in self.entries.values()) + self._reserved_gpus
+
+    async def start(self):
+        await self.adopt()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._reap_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if not settings.CONTAINER_POOL_KEEP_ON_SHUTDOWN:
+            async with self._lock:
+                for entry in list(self.entries.values()):
+                    await self._remove(entry, "server shutdown")
+
+    async def adopt(self) -> int:
+        """Take over warm containers left running by a previous server process."""
+        adopted = 0
+        try:
+            running = await container_manager.list_labelled(POOL_LABEL)
+        except Exception as e:
+            logger.warning(f"Could not scan for pooled containers: {e}")
+            return 0
+        async with self._lock:
+            for item in running:
+                if item["container_id"] in self.entries:
+                    continue
+                info = await container_manager.reattach_container(item["container_id"])
+                if not info:
+                    continue
+                labels = item["labels"]
+                if POOL_IMAGE_LABEL not in labels or POOL_GPUS_LABEL not in labels:
+                    logger.warning(f"Not adopting {item['container_id'][:12]}: it has no pool image or GPU labels")
+                    continue
+                self.entries[info["container_id"]] = PooledContainer(
+                    labels[POOL_LABEL], labels[POOL_IMAGE_LABEL], int(labels[POOL_GPUS_LABEL]), info,
+                    env_names=[name for name in labels.get(POOL_ENV_LABEL, "").split(",") if name],
+                )
+                adopted += 1
+        if adopted:
+            logger.info(f"Adopted {adopted} warm containers into the pool")
+        return adopted
+
+    async def acquire(
+        self, image_name: str, gpu_count: int = 1, env: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Return a ready container for the key, reusing an idle one when it passes a health check."""
+        key = pool_key(image_name, gpu_count, env)
+        async with self._lock:
+            if settings.CONTAINER_POOL_ENABLED:
+                idle = [e for e in self.entries.values() if e.key == key and not e.busy]
+                for entry in sorted(idle, key=lambda e: e.last_used, reverse=True):
+                    if await self._healthy(entry):
+                        idle_seconds = time.monotonic() - entry.last_used
+                        entry.busy = True
+                        entry.uses += 1
+                        logger.info(f"Reusing warm container {entry.container_id[:12]} (idle {idle_seconds:.0f}s)")
+                        # The startup timeline belongs to the original start, not this run
+                        return {
+                            **entry.info,
+                            "startup": None,
+                            "pool": {"reused": True, "uses": entry.uses, "idle_seconds": idle_seconds},
+                        }
+                    await self._remove(entry, "failed health check")
+            await self._make_room(gpu_count)
+            placement = placement_scheduler.reserve(gpu_count)
+            self._reserved_gpus += gpu_count
+
+        # Starting can take many minutes, so it happens outside the lock with the GPUs reserved
+        try:
+            info = await container_manager.start_container(
+                image_name, gpu_count, env=env, labels=pool_labels(key, image_name, gpu_count, env),
+                placement=placement,
+            )
+        finally:
+            async with self._lock:
+                self._reserved_gpus -= gpu_count
+        entry = PooledContainer(key, image_name, gpu_count, info, busy=True, uses=1, env_names=sorted(env or {}))
+        async with self._lock:
+            self.entries[entry.container_id] = entry
+        return {**info, "pool": {"reused": False, "uses": 1, "idle_seconds": 0.0}}
+
+    async def release(self, container_id: str, discard: bool = False) -> bool:
+        """Return a container to the pool, or stop it when ``discard`` or pooling is off."""
+        async with self._lock:
+            entry = self.entries.get(container_id)
+            if entry is None:
+                return False
+            if discard or not settings.CONTAINER_POOL_ENABLED:
+                await self._remove(entry, "released without reuse")
+            else:
+                entry.busy = False
+                entry.last_used = time.monotonic()
+            return True
+
+    async def reserve_outside(self, gpu_count: int) -> Placement:
+        """Reserve GPUs for a container started around the pool, evicting idle pooled ones to fit.
+
+        Such containers (e.g. cold-start runs) do not count against the pool's GPU
+        budget, only against the GPUs the placement scheduler has free. Raises
+        ``PlacementError`` when busy containers hold too many GPUs.
+        """
+        async with self._lock:
+            try:
+                await self._make_room(gpu_count, within_budget=False)
+            except RuntimeError as e:
+                raise PlacementError(str(e)) from e
+            return placement_scheduler.reserve(gpu_count)
+
+    async def _make_room(self, gpu_count: int, within_budget: bool = True):
+        # Caller holds the lock
+        if within_budget and gpu_count > self.gpu_budget:
+            raise RuntimeError(f"{gpu_count} GPUs requested but the pool budget is {self.gpu_budget}")
+        def fits() -> bool:
+            if within_budget and self._gpus_in_use() + gpu_count > self.gpu_budget:
+                return False
+            return placement_scheduler.can_place(gpu_count)
+
+        for entry in sorted(self.entries.values(), key=lambda e: e.last_used):
+            if fits():
+                break
+            if not entry.busy:
+                await self._remove(entry, "LRU eviction for GPU budget" if within_budget else "LRU eviction for GPUs")
+        if not fits():
+            await container_manager.sync_placements()
+        if not fits():
+            raise RuntimeError(
+                f"GPU budget exhausted: {self._gpus_in_use()} of {self.gpu_budget} pool GPUs in use,"
+                f" {len(placement_scheduler.free_devices())} GPUs free on the host"
+            )
+
+    async def _healthy(self, entry: PooledContainer) -> bool:
+        if not await container_manager.reattach_container(entry.container_id):
+            return False
+        base_url = entry.info.get("endpoint") or f"http://localhost:{entry.info.get('port')}"
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=HEALTH_TIMEOUT_SECONDS)) as session:
+                for path in ("/v1/health/ready", "/v1/models"):
+                    async with session.get(base_url + path) as response:
+                        if response.status == 200:
+                            return True
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Warm container {entry.container_id[:12]} health check failed: {e}")
+        return False
+
+    async def _remove(self, entry: PooledContainer, reason: str):
+        # Caller holds the lock
+        self.entries.pop(entry.container_id, None)
+        logger.info(f"Stopping pooled container {entry.container_id[:12]}: {reason}")
+        try:
+            await container_manager.stop_container(entry.container_id)
+        except Exception as e:
+            logger.warning(f"Failed to stop pooled container {entry.container_id[:12]}: {e}")
+
+    async def evict(self, container_id: str) -> bool:
+        return await self.release(container_id, discard=True)
+
+    async def reap(self) -> int:
+        """Stop containers idle for longer than the TTL."""
+        cutoff = time.monotonic() - settings.CONTAINER_POOL_IDLE_TTL_SECONDS
+        async with self._lock:
+            expired = [e for e in self.entries.values() if not e.busy and e.last_used < cutoff]
+            for entry in expired:
+                await self._remove(entry, "idle TTL expired")
+        return len(expired)
+
+    async def _reap_loop(self):
+        while True:
+            await asyncio.sleep(REAP_INTERVAL_SECONDS)
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"Container pool reaper failed: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        containers: List[Dict[str, Any]] = [
+            {
+                "container_id": e.container_id,
+                "image_name": e.image_name,
+                "gpu_count": e.gpu_count,
+                # Env values may hold secrets; only the names are shown
+                "env": e.env_names,
+                "port": e.info.get("port"),
+                "gpus": e.info.get("gpus"),
+                "busy": e.busy,
+                "uses": e.uses,
+                "idle_seconds": None if e.busy else now - e.last_used,
+                "created_at": e.created_at,
+            }
+            for e in self.entries.values()
+        ]
+        return {
+            "enabled": settings.CONTAINER_POOL_ENABLED,
+            "idle_ttl_seconds": settings.CONTAINER_POOL_IDLE_TTL_SECONDS,
+            "gpu_budget": self.gpu_budget,
+            "gpus_in_use": self._gpus_in_use(),
+            "containers": containers,
+        }
+
+
+# Create singleton instance
+container_pool = ContainerPool()
+
+__all__ = ['container_pool', 'pool_key', 'pool_labels']
@@ -0,0 +1,140 @@
+# app/services/container_stats.py
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from ..utils.logger import logger
+
+
+def _blkio_bytes(stats: Dict[str, Any]) -> Dict[str, int]:
+    totals = {"read": 0, "write": 0}
+    for entry in (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []:
+        op = str(entry.get("op", "")).lower()
+        if op in totals:
+            totals[op] += int(entry.get("value", 0))
+    return totals
+
+
+def parse_stats_sample(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten one Docker stats document into the fields we track."""
+    cpu_stats = stats.get("cpu_stats") or {}
+    precpu_stats = stats.get("precpu_stats") or {}
+    cpu_usage = cpu_stats.get("cpu_usage") or {}
+    precpu_usage = precpu_stats.get("cpu_usage") or {}
+
+    cpu_delta = cpu_usage.get("total_usage", 0) - precpu_usage.get("total_usage", 0)
+    system_delta = cpu_stats.get("system_cpu_usage", 0) - precpu_stats.get("system_cpu_usage", 0)
+    online_cpus = cpu_stats.get("online_cpus") or len(cpu_usage.get("percpu_usage") or []) or 1
+    cpu_percent = (cpu_delta / system_delta) * online_cpus * 100.0 if system_delta > 0 and cpu_delta >= 0 else 0.0
+
+    throttling = cpu_stats.get("throttling_data") or {}
+    memory_stats = stats.get("memory_stats") or {}
+    memory_detail = memory_stats.get("stats") or {}
+    networks = stats.get("networks") or {}
+    blkio = _blkio_bytes(stats)
+
+    return {
+        "cpu_percent": cpu_percent,
+        "online_cpus": online_cpus,
+        "throttled_periods": throttling.get("throttled_periods", 0),
+        "total_periods": throttling.get("periods", 0),
+        "throttled_time_ns": throttling.get("throttled_time", 0),
+        "memory_usage": memory_stats.get("usage", 0),
+        "memory_limit": memory_stats.get("limit", 0),
+        # cgroup v1 reports rss/cache, cgroup v2 reports anon/file
+        "memory_rss": memory_detail.get("rss", memory_detail.get("anon", 0)),
+        "memory_cache": memory_detail.get("cache", memory_detail.get("file", 0)),
+        "network_rx_bytes": sum(n.get("rx_bytes", 0) for n in networks.values()),
+        "network_tx_bytes": sum(n.get("tx_bytes", 0) for n in networks.values()),
+        "block_read_bytes": blkio["read"],
+        "block_write_bytes": blkio["write"],
+    }
+
+
+class ContainerStatsMonitor:
+    """Background worker that follows the Docker stats stream of one container.
+
+    Samples are stamped with time.monotonic() so they line up with the
+    benchmark timeline.
+    """
+
+    def __init__(self, container, interval: float = 1.0):
+        self.container = container
+        self.interval = interval
+        self.samples: List[Dict[str, Any]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name=f"stats-{self.container.id[:12]}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        last_sample = 0.0
+        try:
+            for stats in self.container.stats(stream=True, decode=True):
+                if self._stop.is_set():
+                    break
+                now = time.monotonic()
+                if now - last_sample < self.interval:
+                    continue
+                last_sample = now
+                sample = parse_stats_sample(stats)
+                sample["t"] = now
+                self.samples.append(sample)
+        except Exception as e:
+            if not self._stop.is_set():
+                logger.warning(f"Stats stream for container {self.container.id[:12]} ended: {e}")
+
+    async def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread:
+            # The stream yields roughly once per second, so the worker exits promptly;
+            # the join still runs off the event loop
+            thread, self._thread = self._thread, None
+            await asyncio.to_thread(thread.join, timeout)
+
+    def summary(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+        """Summarize samples within [start, end] (monotonic seconds)."""
+        samples = [
+            s for s in self.samples
+            if (start is None or s["t"] >= start) and (end is None or s["t"] <= end)
+        ]
+        if not samples:
+            return {"samples": [], "sample_count": 0}
+
+        first, last = samples[0], samples[-1]
+        origin = start if start is not None else first["t"]
+        cpu = [s["cpu_percent"] for s in samples]
+        throttled_periods = last["throttled_periods"] - first["throttled_periods"]
+        total_periods = last["total_periods"] - first["total_periods"]
+
+        return {
+            "sample_count": len(samples),
+            "avg_cpu_percent": sum(cpu) / len(cpu),
+            "peak_cpu_percent": max(cpu),
+            "online_cpus": last["online_cpus"],
+            "throttled_time_seconds": (last["throttled_time_ns"] - first["throttled_time_ns"]) / 1e9,
+            "throttled_period_ratio": throttled_periods / total_periods if total_periods > 0 else 0,
+            "peak_memory_usage": max(s["memory_usage"] for s in samples),
+            "peak_memory_rss": max(s["memory_rss"] for s in samples),
+            "peak_memory_cache": max(s["memory_cache"] for s in samples),
+            "memory_limit": last["memory_limit"],
+            "network_rx_bytes": last["network_rx_bytes"] - first["network_rx_bytes"],
+            "network_tx_bytes": last["network_tx_bytes"] - first["network_tx_bytes"],
+            "block_read_bytes": last["block_read_bytes"] - first["block_read_bytes"],
+            "block_write_bytes": last["block_write_bytes"] - first["block_write_bytes"],
+            "samples": [{
+                "t": s["t"] - origin,
+                "cpu_percent": s["cpu_percent"],
+                "throttled_time_ns": s["throttled_time_ns"],
+                "memory_rss": s["memory_rss"],
+                "memory_cache": s["memory_cache"],
+                "network_rx_bytes": s["network_rx_bytes"],
+                "network_tx_bytes": s["network_tx_bytes"],
+                "block_read_bytes": s["block_read_bytes"],
+                "block_write_bytes": s["block_write_bytes"],
+            } for s in samples],
+        }
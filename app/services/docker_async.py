@@ -0,0 +1,104 @@
+# app/services/docker_async.py
+import asyncio
+import concurrent.futures
+import functools
+import threading
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+from ..utils.logger import logger
+
+# Sentinel marking the end of a pumped stream
+_END = object()
+
+
+class _StreamError:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class AsyncDocker:
+    """Keeps the blocking docker SDK off the event loop.
+
+    Short calls (run, list, stop, inspect) go through a bounded thread pool, so a
+    slow daemon can tie up at most ``max_workers`` threads. Long-lived streams
+    (followed logs) get a dedicated thread each, feeding an async iterator, so
+    they never starve the pool.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="docker")
+
+    async def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def stream(self, open_stream: Callable[[], Iterable[Any]], queue_size: int = 1024) -> AsyncIterator[Any]:
+        """Iterate a blocking stream opened by ``open_stream`` without blocking the loop.
+
+        The queue is bounded, so a slow consumer pauses the reader thread instead
+        of buffering without limit. Leaving the ``async for`` closes the stream.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(queue_size)
+        stop = threading.Event()
+        source: dict = {}
+
+        def put(item: Any) -> bool:
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    future.result(0.5)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if stop.is_set():
+                        future.cancel()
+                        return False
+
+        def pump():
+            end: Any = _END
+            try:
+                source["stream"] = open_stream()
+                for item in source["stream"]:
+                    if stop.is_set() or not put(item):
+                        break
+            except Exception as e:
+                end = _StreamError(e)
+            try:
+                if stop.is_set():
+                    # The consumer left while the stream was still being opened
+                    self._close(source.get("stream"))
+                else:
+                    put(end)
+            except RuntimeError:
+                # Event loop already closed
+                pass
+
+        thread = threading.Thread(target=pump, name="docker-stream", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    return
+                if isinstance(item, _StreamError):
+                    raise item.error
+                yield item
+        finally:
+            stop.set()
+            self._close(source.get("stream"))
+
+    @staticmethod
+    def _close(stream: Optional[Any]):
+        # docker's CancellableStream closes its socket, which unblocks the reader thread
+        close = getattr(stream, "close", None)
+        if close is None:
+            return
+        try:
+            close()
+        except Exception as e:
+            logger.debug(f"Error closing docker stream: {e}")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = ['AsyncDocker']
@@ -0,0 +1,201 @@
+# app/services/docker_inventory.py
+import asyncio
+import time
+from contextlib import aclosing
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import docker
+from ..config import settings
+from ..utils.logger import logger
+from .container import container_manager
+from .placement import placement_scheduler
+
+EVENT_FILTERS = {"type": ["container", "image"]}
+# Container actions after which the inspected state can differ
+CONTAINER_ACTIONS = {
+    "create", "start", "restart", "die", "stop", "kill", "oom", "pause", "unpause",
+    "rename", "update", "health_status",
+}
+IMAGE_ACTIONS = {"pull", "tag", "untag", "delete", "import", "load"}
+RECONNECT_MAX_SECONDS = 30.0
+
+
+def _comparable(entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # Health check logs change on every probe without an event; only the health status counts as drift
+    if entry and "health" in entry:
+        return {**entry, "health": entry["health"].get("status")}
+    return entry
+
+
+class DockerInventory:
+    """In-memory NIM container and image inventory for the list endpoints.
+
+    One full scan fills it, then the docker events stream keeps it current: an
+    event re-inspects only the container or image it names. A periodic full
+    scan reconciles anything the stream missed. Listings are served from a
+    cached snapshot that is rebuilt only after a change.
+    """
+
+    def __init__(self):
+        self.containers: Dict[str, Dict[str, Any]] = {}
+        self.images: Dict[str, Dict[str, Any]] = {}
+        self._snapshot: Optional[List[Dict[str, Any]]] = None
+        self._synced = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.synced_at: Optional[str] = None
+        self.events_applied = 0
+        self.last_event_at: Optional[str] = None
+        self.drift_corrections = 0
+        self.connected = False
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    async def start(self):
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.create_task(self._follow_events()),
+            asyncio.create_task(self._reconcile_loop()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self.connected = False
+
+    async def list_containers(self) -> List[Dict[str, Any]]:
+        """NIM containers and images, in the order of ``ContainerManager.list_containers``."""
+        if not self.running or not self._synced.is_set():
+            # Not started, or docker was unreachable so far
+            return await container_manager.list_containers()
+        if self._snapshot is None:
+            self._snapshot = container_manager.merge_inventory(self.containers.values(), self.images.values())
+        return list(self._snapshot)
+
+    async def reconcile(self) -> int:
+        """Replace the inventory with a full scan; returns how many entries had drifted."""
+        containers, images = await container_manager.docker.call(container_manager.scan_inventory)
+        drift = sum(
+            1 for current, fresh in ((self.containers, containers), (self.images, images))
+            for key in current.keys() | fresh.keys()
+            if _comparable(current.get(key)) != _comparable(fresh.get(key))
+        )
+        if drift and self._synced.is_set():
+            self.drift_corrections += drift
+            logger.info(f"Docker inventory reconciled {drift} entries the event stream missed")
+        self.containers, self.images = containers, images
+        self._snapshot = None
+        self.synced_at = datetime.now().isoformat()
+        self._synced.set()
+        return drift
+
+    async def _reconcile_loop(self):
+        while True:
+            await asyncio.sleep(settings.INVENTORY_RECONCILE_SECONDS)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Docker inventory reconciliation failed: {e}")
+
+    async def _follow_events(self):
+        delay = 1.0
+        while True:
+            # Events since just before the scan are replayed, so nothing between the two is lost
+            since = int(time.time()) - 1
+            try:
+                await self.reconcile()
+                events = container_manager.docker.stream(
+                    lambda: container_manager.client.events(since=since, decode=True, filters=EVENT_FILTERS)
+                )
+                self.connected = True
+                delay = 1.0
+                async with aclosing(events) as stream:
+                    async for event in stream:
+                        await self._apply(event)
+                logger.warning("Docker event stream ended; reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Docker event stream failed: {e}")
+            self.connected = False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+    async def _apply(self, event: Dict[str, Any]):
+        kind = event.get("Type")
+        # Health events carry the new state in the action, e.g. "health_status: healthy"
+        action = (event.get("Action") or event.get("status") or "").split(":")[0]
+        ref = (event.get("Actor") or {}).get("ID") or event.get("id")
+        if not ref:
+            return
+        try:
+            if kind == "container" and action == "destroy":
+                self.containers.pop(ref, None)
+                placement_scheduler.release_container(ref)
+            elif kind == "container" and action in CONTAINER_ACTIONS:
+                await self._refresh_container(ref)
+            elif kind == "image" and action in IMAGE_ACTIONS:
+                await self._refresh_image(ref)
+            else:
+                return
+        except Exception as e:
+            # The next reconciliation repairs whatever this event should have changed
+            logger.warning(f"Could not apply docker {kind} {action} event for {ref[:12]}: {e}")
+            return
+        self._snapshot = None
+        self.events_applied += 1
+        self.last_event_at = datetime.now().isoformat()
+
+    async def _refresh_container(self, container_id: str):
+        try:
+            container = await container_manager.docker.call(container_manager.client.containers.get, container_id)
+        except docker.errors.NotFound:
+            self.containers.pop(container_id, None)
+            return
+        entry = container_manager.describe_container(container, self.images)
+        if entry:
+            self.containers[container.id] = entry
+
+    async def _refresh_image(self, ref: str):
+        try:
+            raw = await container_manager.docker.call(container_manager.client.api.inspect_image, ref)
+        except docker.errors.NotFound:
+            # Deleted; image events name either the id or the reference
+            self.images.pop(ref, None)
+            for image in self.images.values():
+                if ref in image["tags"]:
+                    image["tags"] = [t for t in image["tags"] if t != ref]
+            return
+        image = container_manager.describe_image(raw)
+        # A pulled tag moves off the image that carried it before
+        for other in self.images.values():
+            if other["id"] != image["id"]:
+                other["tags"] = [t for t in other["tags"] if t not in image["tags"]]
+        self.images[image["id"]] = image
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "connected": self.connected,
+            "containers": len(self.containers),
+            "images": len(self.images),
+            "synced_at": self.synced_at,
+            "last_event_at": self.last_event_at,
+            "events_applied": self.events_applied,
+            "drift_corrections": self.drift_corrections,
+            "reconcile_interval_seconds": settings.INVENTORY_RECONCILE_SECONDS,
+        }
+
+
+# Create singleton instance
+docker_inventory = DockerInventory()
+
+__all__ = ['docker_inventory']
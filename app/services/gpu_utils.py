@@ -8,7 +8,8 @@ def count_nvidia_gpus() -> int:
             capture_output=True,
             text=True,
         )
-        return int(result.stdout.strip())
+        # One line per GPU, each repeating the count
+        return int(result.stdout.strip().splitlines()[0])
     except Exception as e:
         print(f"Error counting NVIDIA GPUs: {e}")
         return 0  # Fallback to 0 GPUs if there's an error
\ No newline at end of file
@@ -0,0 +1,183 @@
+# app/services/live_stats.py
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+
+class LogHistogram:
+    """Fixed log-spaced histogram: O(1) insert, percentiles within ~2.5% relative error."""
+
+    MIN_VALUE = 1e-4
+    MAX_VALUE = 1e4
+    GROWTH = 1.05
+    BUCKETS = int(math.ceil(math.log(MAX_VALUE / MIN_VALUE) / math.log(GROWTH))) + 2
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.total = 0
+
+    @classmethod
+    def bucket_index(cls, value: float) -> int:
+        if value <= cls.MIN_VALUE:
+            return 0
+        if value >= cls.MAX_VALUE:
+            return cls.BUCKETS - 1
+        return int(math.log(value / cls.MIN_VALUE) / math.log(cls.GROWTH)) + 1
+
+    @classmethod
+    def bucket_value(cls, index: int) -> float:
+        """Representative value (geometric midpoint) of a bucket."""
+        if index <= 0:
+            return cls.MIN_VALUE
+        if index >= cls.BUCKETS - 1:
+            return cls.MAX_VALUE
+        return cls.MIN_VALUE * cls.GROWTH ** (index - 0.5)
+
+    def add(self, value: float):
+        self.counts[self.bucket_index(value)] += 1
+        self.total += 1
+
+    def merge(self, other: "LogHistogram"):
+        for i, count in enumerate(other.counts):
+            if count:
+                self.counts[i] += count
+        self.total += other.total
+
+    def clear(self):
+        self.counts = [0] * self.BUCKETS
+        self.total = 0
+
+    def percentiles(self, quantiles: List[float]) -> List[Optional[float]]:
+        if not self.total:
+            return [None] * len(quantiles)
+        targets = sorted((q, i) for i, q in enumerate(quantiles))
+        results: List[Optional[float]] = [None] * len(quantiles)
+        cumulative = 0
+        t = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            while t < len(targets) and cumulative >= targets[t][0] * self.total:
+                results[targets[t][1]] = self.bucket_value(index)
+                t += 1
+            if t == len(targets):
+                break
+        return results
+
+
+class _Slice:
+    def __init__(self):
+        self.start = 0.0
+        self.ttft = LogHistogram()
+        self.itl = LogHistogram()
+        self.e2e = LogHistogram()
+        self.completed = 0
+        self.errors = 0
+        self.tokens = 0
+
+    def reset(self, start: float):
+        self.start = start
+        self.ttft.clear()
+        self.itl.clear()
+        self.e2e.clear()
+        self.completed = 0
+        self.errors = 0
+        self.tokens = 0
+
+
+class LiveRunStats:
+    """Sliding-window latency percentiles and throughput for an active run.
+
+    The window is a ring of fixed-width time slices; recording a request only
+    touches the current slice, and snapshots merge the slices at publish time.
+    """
+
+    QUANTILES = [0.5, 0.95, 0.99]
+
+    def __init__(self, run_id: int, total_requests: int, window_seconds: float = 30.0, slice_seconds: float = 1.0):
+        self.run_id = run_id
+        self.total_requests = total_requests
+        self.slice_seconds = slice_seconds
+        self.slices = [_Slice() for _ in range(max(int(window_seconds / slice_seconds), 1))]
+        self.started = time.monotonic()
+        self.completed = 0
+        self.errors = 0
+        self.tokens = 0
+        self.in_flight = 0
+        self.seq = 0
+
+    def _slice(self, now: float) -> _Slice:
+        tick = int((now - self.started) // self.slice_seconds)
+        current = self.slices[tick % len(self.slices)]
+        slice_start = self.started + tick * self.slice_seconds
+        if current.start != slice_start:
+            current.reset(slice_start)
+        return current
+
+    def request_started(self):
+        self.in_flight += 1
+
+    def request_finished(
+        self,
+        e2e: Optional[float],
+        ttft: Optional[float] = None,
+        itl: Optional[float] = None,
+        tokens: int = 0,
+        ok: bool = True,
+    ):
+        now = time.monotonic()
+        current = self._slice(now)
+        self.in_flight = max(self.in_flight - 1, 0)
+        if not ok:
+            self.errors += 1
+            current.errors += 1
+            return
+        self.completed += 1
+        self.tokens += tokens
+        current.completed += 1
+        current.tokens += tokens
+        if e2e is not None:
+            current.e2e.add(e2e)
+        if ttft is not None:
+            current.ttft.add(ttft)
+        if itl is not None:
+            current.itl.add(itl)
+
+    def _percentiles(self, histogram: LogHistogram) -> Dict[str, Optional[float]]:
+        p50, p95, p99 = histogram.percentiles(self.QUANTILES)
+        return {"p50": p50, "p95": p95, "p99": p99, "count": histogram.total}
+
+    def snapshot(self, status: str = "running") -> Dict[str, Any]:
+        now = time.monotonic()
+        window_start = now - len(self.slices) * self.slice_seconds
+        ttft, itl, e2e = LogHistogram(), LogHistogram(), LogHistogram()
+        completed = errors = tokens = 0
+        for s in self.slices:
+            if s.start >= window_start and (s.completed or s.errors):
+                ttft.merge(s.ttft)
+                itl.merge(s.itl)
+                e2e.merge(s.e2e)
+                completed += s.completed
+                errors += s.errors
+                tokens += s.tokens
+
+        elapsed = now - self.started
+        window = min(elapsed, len(self.slices) * self.slice_seconds)
+        finished = completed + errors
+        self.seq += 1
+        return {
+            "run_id": self.run_id,
+            "seq": self.seq,
+            "status": status,
+            "elapsed": elapsed,
+            "completed": self.completed,
+            "errors": self.errors,
+            "total": self.total_requests,
+            "in_flight": self.in_flight,
+            "window_seconds": window,
+            "tokens_per_second": tokens / window if window > 0 else 0,
+            "requests_per_second": completed / window if window > 0 else 0,
+            "error_rate": errors / finished if finished else 0,
+            "ttft": self._percentiles(ttft),
+            "itl": self._percentiles(itl),
+            "e2e_latency": self._percentiles(e2e),
+        }
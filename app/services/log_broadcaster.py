@@ -0,0 +1,215 @@
+# app/services/log_broadcaster.py
+import asyncio
+import time
+from collections import deque
+from contextlib import aclosing, asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set
+from ..config import settings
+from ..utils.logger import logger
+from .container import container_manager
+
+# Marks the end of a container's log stream in subscriber queues
+_END = None
+# Docker timestamps have nanosecond precision and a fixed width, so they sort as strings
+TIMESTAMP_LENGTH = 30
+
+
+def parse_timestamp(line: str) -> Optional[float]:
+    """Epoch seconds of a log line's docker timestamp, e.g. ``2024-05-01T10:00:00.123456789Z``."""
+    stamp = line.partition(" ")[0]
+    try:
+        seconds = datetime.strptime(stamp[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+    fraction = stamp[20:].rstrip("Z")
+    return seconds + (float("0." + fraction) if fraction.isdigit() else 0.0)
+
+
+def strip_timestamp(line: str) -> str:
+    """Drop the RFC 3339 timestamp docker prefixes when following with ``timestamps=True``."""
+    stamp, _, text = line.partition(" ")
+    return text if stamp[:4].isdigit() and stamp.endswith("Z") else line
+
+
+class LogSubscription:
+    """One viewer's queue of log lines.
+
+    The queue is bounded. When a viewer falls behind, its oldest queued lines
+    are dropped and counted, so one slow client never holds up the follower or
+    the other viewers.
+    """
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def push(self, line: Optional[str]):
+        while True:
+            try:
+                self.queue.put_nowait(line)
+                return
+            except asyncio.QueueFull:
+                self.queue.get_nowait()
+                self.dropped += 1
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        line = await self.queue.get()
+        if line is _END:
+            raise StopAsyncIteration
+        return line
+
+
+class ContainerLogFollower:
+    """Follows one container's log and keeps its last lines in a ring buffer."""
+
+    def __init__(self, container_id: str, buffer_lines: int):
+        self.container_id = container_id
+        self.buffer: Deque[str] = deque(maxlen=buffer_lines)
+        self.subscribers: Set[LogSubscription] = set()
+        self.lines_read = 0
+        self.ended = False
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self._linger: Optional[asyncio.Task] = None
+        self._on_exit: Callable[["ContainerLogFollower"], None] = lambda follower: None
+
+    def start(self, on_exit: Callable[["ContainerLogFollower"], None]):
+        self._on_exit = on_exit
+        self.task = asyncio.create_task(self._follow())
+
+    async def _backfill(self) -> float:
+        """Fill the ring buffer with the log so far; returns where following should resume."""
+        resume_at = time.time()
+        container = await container_manager.docker.call(container_manager.client.containers.get, self.container_id)
+        # One bounded read, so a viewer's replay is exact instead of racing the live stream
+        history = await container_manager.docker.call(container.logs, tail=self.buffer.maxlen, timestamps=True)
+        for line in history.decode("utf-8", errors="replace").splitlines():
+            self.buffer.append(line)
+            self.lines_read += 1
+        if self.buffer:
+            resume_at = parse_timestamp(self.buffer[-1]) or resume_at
+        return resume_at
+
+    async def _follow(self):
+        try:
+            since = await self._backfill()
+            last = self.buffer[-1] if self.buffer else None
+            self.ready.set()
+            lines = container_manager.follow_logs(self.container_id, since=since, timestamps=True)
+            async with aclosing(lines) as stream:
+                async for raw in stream:
+                    line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                    if last is not None:
+                        # ``since`` is inclusive; skip what the backfill already holds
+                        if line[:TIMESTAMP_LENGTH] < last[:TIMESTAMP_LENGTH] or line == last:
+                            continue
+                        last = None
+                    self.buffer.append(line)
+                    self.lines_read += 1
+                    for subscription in self.subscribers:
+                        subscription.push(line)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Log follower for {self.container_id[:12]} failed: {e}")
+        finally:
+            self.ended = True
+            self.ready.set()
+            for subscription in self.subscribers:
+                subscription.push(_END)
+            self._on_exit(self)
+
+    def subscribe(self, replay: int, queue_size: int) -> LogSubscription:
+        if self._linger:
+            self._linger.cancel()
+            self._linger = None
+        subscription = LogSubscription(queue_size)
+        for line in list(self.buffer)[-replay:] if replay else []:
+            subscription.push(line)
+        if self.ended:
+            subscription.push(_END)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription, linger: float):
+        self.subscribers.discard(subscription)
+        if not self.subscribers and self.task and not self.task.done():
+            # Viewers often reconnect right away (page reloads); keep following a little while
+            self._linger = asyncio.create_task(self._stop_after(linger))
+
+    async def _stop_after(self, delay: float):
+        await asyncio.sleep(delay)
+        if not self.subscribers and self.task:
+            # Unregister first, so a viewer arriving now starts a fresh follower
+            self._on_exit(self)
+            self.task.cancel()
+
+
+class LogBroadcaster:
+    """One docker log follower per container, fanned out to any number of viewers.
+
+    New viewers get the last lines from the follower's ring buffer, then live
+    lines. A follower stops once the container's log ends, or
+    ``LOG_FOLLOWER_LINGER_SECONDS`` after its last viewer left.
+    """
+
+    def __init__(self):
+        self.followers: Dict[str, ContainerLogFollower] = {}
+
+    async def _resolve(self, container_id: str) -> str:
+        # Viewers may name a container by short id or name; followers are keyed by full id
+        container = await container_manager.docker.call(container_manager.client.containers.get, container_id)
+        return container.id
+
+    @asynccontextmanager
+    async def subscribe(self, container_id: str, replay: Optional[int] = None) -> AsyncIterator[LogSubscription]:
+        """Subscribe to a container's log; raises ``docker.errors.NotFound`` for unknown containers."""
+        full_id = await self._resolve(container_id)
+        follower = self.followers.get(full_id)
+        if follower is None:
+            follower = ContainerLogFollower(full_id, settings.LOG_BUFFER_LINES)
+            self.followers[full_id] = follower
+            follower.start(self._forget)
+        await follower.ready.wait()
+        replay = settings.LOG_REPLAY_LINES if replay is None else replay
+        subscription = follower.subscribe(min(replay, settings.LOG_BUFFER_LINES), settings.LOG_SUBSCRIBER_QUEUE)
+        try:
+            yield subscription
+        finally:
+            follower.unsubscribe(subscription, settings.LOG_FOLLOWER_LINGER_SECONDS)
+
+    def _forget(self, follower: ContainerLogFollower):
+        if self.followers.get(follower.container_id) is follower:
+            del self.followers[follower.container_id]
+
+    async def stop(self):
+        for follower in list(self.followers.values()):
+            if follower.task:
+                follower.task.cancel()
+        self.followers.clear()
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "container_id": f.container_id,
+                "subscribers": len(f.subscribers),
+                "buffered_lines": len(f.buffer),
+                "lines_read": f.lines_read,
+                "dropped": sum(s.dropped for s in f.subscribers),
+            }
+            for f in self.followers.values()
+        ]
+
+
+# Create singleton instance
+log_broadcaster = LogBroadcaster()
+
+__all__ = ['log_broadcaster', 'LogSubscription', 'strip_timestamp']
@@ -0,0 +1,154 @@
+# app/services/log_capture.py
+import asyncio
+import gzip
+import math
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Union
+from ..config import settings
+from ..utils.logger import logger
+from .container import container_manager
+
+try:
+    import zstandard
+except ImportError:  # Fall back to gzip when zstd bindings are unavailable
+    zstandard = None
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+SUFFIXES = {"none": ".log", "gzip": ".log.gz", "zstd": ".log.zst"}
+# Docker frames are small; writes are batched to this size before hitting the compressor
+WRITE_BUFFER_BYTES = 1 << 20
+
+TimeBound = Union[datetime, float, int, None]
+
+
+def resolve_compression(compression: Optional[str]) -> str:
+    compression = compression or settings.LOG_CAPTURE_COMPRESSION
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression!r}; expected one of {', '.join(COMPRESSIONS)}")
+    if compression == "zstd" and zstandard is None:
+        return "gzip"
+    return compression
+
+
+def _epoch(value: TimeBound) -> Optional[float]:
+    if isinstance(value, datetime):
+        # Naive datetimes are local time, like the timestamps the UI shows
+        return value.timestamp()
+    return float(value) if value is not None else None
+
+
+def _open_writer(path: Path, compression: str) -> BinaryIO:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"), closefd=True)
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    return open(path, "wb")
+
+
+class LogCapture:
+    """Streams a container's log to disk, optionally compressed, without holding it in memory.
+
+    Docker's log stream is read frame by frame in a worker thread and written
+    through a gzip or zstd writer in 1 MiB batches, so a multi-gigabyte debug log
+    costs neither server memory nor event-loop time. ``since`` and ``until``
+    restrict the capture to a time range.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+
+    def path_for(self, name: str, compression: str) -> Path:
+        # Only a file name is accepted, so a request cannot write outside the capture directory
+        stem = Path(name).name
+        for suffix in SUFFIXES.values():
+            if stem.endswith(suffix):
+                stem = stem[: -len(suffix)]
+        if not stem or stem in (".", ".."):
+            raise ValueError(f"Invalid log file name {name!r}")
+        return self.directory / f"{stem}{SUFFIXES[compression]}"
+
+    async def save(
+        self,
+        container_id: str,
+        name: str,
+        compression: Optional[str] = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        timestamps: bool = False,
+    ) -> Dict[str, Any]:
+        """Capture into the capture directory under ``name``; see ``capture``."""
+        compression = resolve_compression(compression)
+        return await self.capture(container_id, self.path_for(name, compression), compression, since, until, timestamps)
+
+    async def capture(
+        self,
+        container_id: str,
+        path: Union[str, Path],
+        compression: Optional[str] = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        timestamps: bool = False,
+    ) -> Dict[str, Any]:
+        """Write the container's log between ``since`` and ``until`` to ``path``.
+
+        Raises ``docker.errors.NotFound`` for unknown containers. A failed
+        capture leaves no partial file behind.
+        """
+        compression = resolve_compression(compression)
+        path = Path(path)
+        kwargs: Dict[str, Any] = {"stream": True, "follow": False, "timestamps": timestamps}
+        since, until = _epoch(since), _epoch(until)
+        if since is not None and since > 0:
+            kwargs["since"] = since
+        if until is not None and until > 0:
+            # The docker SDK only takes whole seconds here; round up so the last second is kept
+            kwargs["until"] = math.ceil(until)
+        container = await container_manager.docker.call(container_manager.client.containers.get, container_id)
+
+        def write() -> Dict[str, int]:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            written = 0
+            stream = container.logs(**kwargs)
+            try:
+                with _open_writer(path, compression) as out:
+                    batch = bytearray()
+                    for frame in stream:
+                        batch += frame
+                        if len(batch) >= WRITE_BUFFER_BYTES:
+                            out.write(batch)
+                            written += len(batch)
+                            batch.clear()
+                    out.write(batch)
+                    written += len(batch)
+            except BaseException:
+                path.unlink(missing_ok=True)
+                raise
+            finally:
+                close = getattr(stream, "close", None)
+                if close:
+                    close()
+            return {"log_bytes": written, "file_bytes": path.stat().st_size}
+
+        started = datetime.now()
+        # A dedicated thread rather than the docker pool: a large capture can take minutes
+        sizes = await asyncio.to_thread(write)
+        elapsed = (datetime.now() - started).total_seconds()
+        logger.info(
+            f"Saved log of {container.id[:12]} to {path}: {sizes['log_bytes'] / 1e6:.1f} MB"
+            f" -> {sizes['file_bytes'] / 1e6:.1f} MB in {elapsed:.1f}s"
+        )
+        return {
+            "path": str(path),
+            "container_id": container.id,
+            "compression": compression,
+            "since": since,
+            "until": until,
+            **sizes,
+        }
+
+
+# Create singleton instance
+log_capture = LogCapture(settings.LOG_CAPTURE_DIR)
+
+__all__ = ['log_capture', 'LogCapture', 'COMPRESSIONS', 'SUFFIXES']
@@ -0,0 +1,236 @@
+# app/services/log_events.py
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from ..config import settings
+from ..models.database import async_session
+from ..models.benchmark import LogEvent, LogPatternDefinition
+from ..utils.logger import logger
+from .log_broadcaster import log_broadcaster, parse_timestamp, strip_timestamp
+from .log_patterns import LogPattern, log_patterns, server_config
+from .readiness import readiness_engine
+
+FLUSH_INTERVAL_SECONDS = 2.0
+FLUSH_BATCH = 500
+# Log lines are stored with their events for search; very long ones are cut
+MAX_LINE_LENGTH = 2000
+
+
+def _epoch(value: Any) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str) and value:
+        return datetime.fromisoformat(value).timestamp()
+    return None
+
+
+def _row_to_event(row: LogEvent) -> Dict[str, Any]:
+    return {
+        "container_id": row.container_id,
+        "timestamp": row.timestamp,
+        "time": datetime.fromtimestamp(row.timestamp).isoformat(),
+        "name": row.name,
+        "kind": row.kind,
+        "backend": row.backend,
+        "fields": json.loads(row.fields) if row.fields else {},
+        "line": row.line,
+    }
+
+
+class LogEventRecorder:
+    """Parses NIM container logs into structured events and indexes them in SQLite.
+
+    Startup events (profile, KV cache, batch limits, weight load and CUDA graph
+    times) come from the readiness watcher of the container's start. Runtime
+    events such as periodic throughput lines come from the shared log follower
+    for as long as the container runs. Events are keyed by container and log
+    timestamp, so a run's events are those of its container within its window.
+    """
+
+    def __init__(self):
+        self.watchers: Dict[str, asyncio.Task] = {}
+        self._pending: List[Dict[str, Any]] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self.events_recorded = 0
+
+    async def load_patterns(self):
+        """Register the custom patterns stored in the database."""
+        async with async_session() as session:
+            rows = (await session.execute(select(LogPatternDefinition))).scalars().all()
+        for row in rows:
+            try:
+                text_fields = json.loads(row.text_fields or "[]")
+                log_patterns.register(self._pattern(row.name, row.kind, row.regex, row.backend, text_fields))
+            except ValueError as e:
+                logger.warning(f"Skipping stored log pattern: {e}")
+
+    @staticmethod
+    def _pattern(name: str, kind: str, regex: str, backend: Optional[str], text_fields: List[str]) -> LogPattern:
+        return LogPattern(name, kind, regex, backend=backend or "any", text_fields=tuple(text_fields), builtin=False)
+
+    async def add_pattern(
+        self, name: str, kind: str, regex: str, backend: Optional[str] = None, text_fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Validate, register and store a custom pattern; raises ``ValueError`` for a bad one."""
+        pattern = self._pattern(name, kind, regex, backend, text_fields or [])
+        async with async_session() as session:
+            await session.merge(LogPatternDefinition(
+                name=name,
+                kind=kind,
+                regex=regex,
+                backend=pattern.backend,
+                text_fields=json.dumps(list(pattern.text_fields)),
+            ))
+            await session.commit()
+        log_patterns.register(pattern)
+        return pattern.describe()
+
+    async def remove_pattern(self, name: str) -> bool:
+        async with async_session() as session:
+            result = await session.execute(delete(LogPatternDefinition).where(LogPatternDefinition.name == name))
+            await session.commit()
+        return log_patterns.unregister(name) or bool(result.rowcount)
+
+    def watch(self, container_id: str):
+        """Record a container's events until its log ends; a container already watched is left alone."""
+        task = self.watchers.get(container_id)
+        if task and not task.done():
+            return
+        self.watchers[container_id] = asyncio.create_task(self._watch(container_id))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    def _queue(self, container_id: str, timestamp: float, event: Dict[str, Any], line: str):
+        self._pending.append({
+            "container_id": container_id,
+            "timestamp": timestamp,
+            "name": event["name"],
+            "kind": event["kind"],
+            "backend": event["backend"],
+            "fields": json.dumps(event["fields"]),
+            "line": line[:MAX_LINE_LENGTH],
+        })
+
+    async def _watch(self, container_id: str):
+        tracker = readiness_engine.get(container_id)
+        if tracker is not None:
+            started = _epoch(tracker.started_at)
+            for event in tracker.log_events:
+                self._queue(container_id, started + event["at"], event, event.get("line", ""))
+        try:
+            # The replayed lines cover the start of a container this process did not start
+            async with log_broadcaster.subscribe(container_id, settings.LOG_SUBSCRIBER_QUEUE) as lines:
+                async for line in lines:
+                    text = strip_timestamp(line)
+                    for event in log_patterns.parse(text):
+                        if event["kind"] == "runtime" or tracker is None:
+                            self._queue(container_id, parse_timestamp(line) or time.time(), event, text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Log event recording for {container_id[:12]} stopped: {e}")
+        finally:
+            if self.watchers.get(container_id) is asyncio.current_task():
+                del self.watchers[container_id]
+
+    async def flush(self):
+        while self._pending:
+            batch, self._pending = self._pending[:FLUSH_BATCH], self._pending[FLUSH_BATCH:]
+            async with async_session() as session:
+                await session.execute(insert(LogEvent).values(batch).on_conflict_do_nothing())
+                await session.commit()
+            self.events_recorded += len(batch)
+
+    async def _flush_loop(self):
+        while self.watchers or self._pending:
+            await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to store log events: {e}")
+
+    async def stop(self):
+        for task in list(self.watchers.values()):
+            task.cancel()
+        self.watchers.clear()
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to store log events: {e}")
+
+    async def query(
+        self,
+        container_id: Optional[str] = None,
+        name: Optional[str] = None,
+        kind: Optional[str] = None,
+        q: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """Stored events, oldest first; ``q`` searches the log lines."""
+        await self.flush()
+        query = select(LogEvent)
+        if container_id:
+            query = query.where(LogEvent.container_id == container_id)
+        if name:
+            query = query.where(LogEvent.name == name)
+        if kind:
+            query = query.where(LogEvent.kind == kind)
+        if q:
+            query = query.where(LogEvent.line.contains(q))
+        if since is not None:
+            query = query.where(LogEvent.timestamp >= since)
+        if until is not None:
+            query = query.where(LogEvent.timestamp <= until)
+        query = query.order_by(LogEvent.timestamp).limit(limit)
+        async with async_session() as session:
+            rows = (await session.execute(query)).scalars().all()
+        return [_row_to_event(row) for row in rows]
+
+    async def events_for_run(
+        self, run: Dict[str, Any], name: Optional[str] = None, q: Optional[str] = None, limit: int = 5000
+    ) -> Dict[str, Any]:
+        """A run's container events: its startup, and runtime events within the run.
+
+        ``offset_seconds`` places each event on the run timeline, whose origin is
+        the run's start.
+        """
+        container_id = run.get("container_id")
+        if not container_id:
+            return {"container_id": None, "server_config": {}, "events": []}
+        start = _epoch(run.get("start_time")) or 0.0
+        end = _epoch(run.get("end_time")) or time.time()
+        startup = await self.query(container_id, kind="startup", until=end, limit=limit)
+        runtime = [
+            event for event in await self.query(container_id, name=name, q=q, since=start, until=end, limit=limit)
+            if event["kind"] != "startup"
+        ]
+        events = [e for e in startup if (not name or e["name"] == name) and (not q or q in (e["line"] or ""))] + runtime
+        for event in events:
+            event["offset_seconds"] = event["timestamp"] - start
+        return {
+            "container_id": container_id,
+            "server_config": server_config(startup),
+            "events": sorted(events, key=lambda e: e["timestamp"]),
+        }
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "watching": list(self.watchers),
+            "pending": len(self._pending),
+            "events_recorded": self.events_recorded,
+        }
+
+
+# Create singleton instance
+log_event_recorder = LogEventRecorder()
+
+__all__ = ['log_event_recorder']
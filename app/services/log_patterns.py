@@ -0,0 +1,202 @@
+# app/services/log_patterns.py
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# "startup" events describe how the server configured itself, "runtime" ones are periodic
+# stats, and "error" ones end a start that has not reached server_up
+KINDS = ("startup", "runtime", "error")
+
+
+@dataclass
+class LogPattern:
+    name: str
+    kind: str
+    regex: str
+    backend: str = "any"
+    # Named groups kept as text; every other group is read as a number
+    text_fields: Tuple[str, ...] = ()
+    builtin: bool = True
+
+    def __post_init__(self):
+        if self.kind not in KINDS:
+            raise ValueError(f"Unknown pattern kind {self.kind!r}; expected one of {', '.join(KINDS)}")
+        try:
+            self.compiled = re.compile(self.regex)
+        except re.error as e:
+            raise ValueError(f"Invalid pattern {self.name!r}: {e}") from e
+
+    def match(self, line: str) -> Optional[Dict[str, Any]]:
+        found = self.compiled.search(line)
+        if found is None:
+            return None
+        fields = {}
+        for key, value in found.groupdict().items():
+            if value is None:
+                continue
+            fields[key] = value if key in self.text_fields else _number(value)
+        return fields
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "regex": self.regex,
+            "backend": self.backend,
+            "text_fields": list(self.text_fields),
+            "builtin": self.builtin,
+        }
+
+
+def _number(value: str) -> Any:
+    # vLLM prints large counts with thousands separators, e.g. "430,960 tokens"
+    value = value.replace(",", "")
+    try:
+        return float(value) if "." in value else int(value)
+    except ValueError:
+        return value
+
+
+_NUM = r"[\d,]+(?:\.\d+)?"
+
+# Log lines of the NIM launcher and of the vLLM and TensorRT-LLM backends it runs
+BUILTIN_PATTERNS = [
+    LogPattern(
+        "selected_profile", "startup",
+        r"Selected profile: (?P<profile_id>[0-9a-f]{16,})(?: \((?P<profile>[^)]+)\))?",
+        backend="nim", text_fields=("profile_id", "profile"),
+    ),
+    LogPattern(
+        "weights_loaded", "startup",
+        rf"(?i)(?:model loading|loading weights) took (?:(?P<weights_gib>{_NUM}) gi?b and )?(?P<seconds>{_NUM}) s",
+        backend="vllm",
+    ),
+    LogPattern(
+        "weights_loaded", "startup",
+        rf"Loading model weights took (?P<weights_gib>{_NUM}) GB",
+        backend="vllm",
+    ),
+    LogPattern(
+        "weights_loaded", "startup",
+        rf"Loaded engine size: (?P<engine_mib>{_NUM}) MiB",
+        backend="tensorrt_llm",
+    ),
+    # Markers of other backends that log no size or duration
+    LogPattern("weights_loaded", "startup", r"(?i)weights loaded|loaded model weights|engine loaded"),
+    LogPattern(
+        "engine_loaded", "startup",
+        rf"Engine load time (?P<milliseconds>{_NUM}) ms",
+        backend="tensorrt_llm",
+    ),
+    LogPattern(
+        "kv_cache", "startup",
+        rf"# GPU blocks: (?P<gpu_blocks>{_NUM}), # CPU blocks: (?P<cpu_blocks>{_NUM})",
+        backend="vllm",
+    ),
+    LogPattern(
+        "kv_cache", "startup",
+        rf"Available KV cache memory: (?P<kv_cache_gib>{_NUM}) GiB",
+        backend="vllm",
+    ),
+    LogPattern(
+        "kv_cache", "startup",
+        rf"GPU KV cache size: (?P<kv_cache_tokens>{_NUM}) tokens",
+        backend="vllm",
+    ),
+    LogPattern(
+        "kv_cache", "startup",
+        rf"Allocated (?P<kv_cache_gib>{_NUM}) GiB for max tokens in paged KV cache \((?P<kv_cache_tokens>{_NUM})\)",
+        backend="tensorrt_llm",
+    ),
+    LogPattern(
+        "max_concurrency", "startup",
+        rf"Maximum concurrency for (?P<tokens_per_request>{_NUM}) tokens per request: (?P<max_concurrency>{_NUM})x",
+        backend="vllm",
+    ),
+    LogPattern(
+        "max_batch_size", "startup",
+        rf"(?:max_num_seqs=|maxBatchSize:\s*|max_batch_size[=:]\s*)(?P<max_batch_size>\d+)",
+    ),
+    LogPattern(
+        "max_seq_len", "startup",
+        rf"(?:max_seq_len=|maxSequenceLen:\s*|max_model_len[=:]\s*)(?P<max_seq_len>\d+)",
+    ),
+    LogPattern(
+        "cuda_graph_capture", "startup",
+        rf"Graph capturing finished in (?P<seconds>{_NUM}) secs?(?:, took (?P<memory_gib>{_NUM}) GiB)?",
+        backend="vllm",
+    ),
+    LogPattern("server_up", "startup", r"Uvicorn running on (?P<url>\S+)", text_fields=("url",)),
+    LogPattern(
+        "throughput", "runtime",
+        rf"Avg prompt throughput: (?P<prompt_tps>{_NUM}) tokens/s, Avg generation throughput: (?P<generation_tps>{_NUM})"
+        rf" tokens/s, Running: (?P<running>\d+) reqs(?:, Swapped: (?P<swapped>\d+) reqs)?"
+        rf"(?:, (?:Pending|Waiting): (?P<waiting>\d+) reqs)?(?:, GPU KV cache usage: (?P<kv_cache_usage_pct>{_NUM})%)?"
+        rf"(?:.*?Prefix cache hit rate: (?P<prefix_cache_hit_pct>{_NUM})%)?",
+        backend="vllm",
+    ),
+    # Errors are matched on log level or an uncaught exception, never on words like "failed"
+    # that benign INFO lines contain
+    LogPattern("error", "error", r"^(?:ERROR|CRITICAL|FATAL)\b|\[TensorRT-LLM\]\[ERROR\]"),
+    LogPattern(
+        "error", "error",
+        r"^(?P<exception>(?:[A-Za-z_][\w.]*\.)?[A-Z]\w*(?:Error|Exception)): |CUDA out of memory",
+        text_fields=("exception",),
+    ),
+]
+
+
+class LogPatternRegistry:
+    """Ordered set of patterns that turns log lines into structured events.
+
+    Built-in patterns cover the NIM launcher, vLLM and TensorRT-LLM. Custom
+    patterns are added with ``register``; a custom pattern with the name of an
+    existing event adds another way to recognise it.
+    """
+
+    def __init__(self, patterns: List[LogPattern]):
+        self.patterns = list(patterns)
+
+    def register(self, pattern: LogPattern):
+        self.unregister(pattern.name, builtin=False)
+        self.patterns.append(pattern)
+
+    def unregister(self, name: str, builtin: bool = False) -> bool:
+        before = len(self.patterns)
+        self.patterns = [p for p in self.patterns if p.name != name or (p.builtin and not builtin)]
+        return len(self.patterns) < before
+
+    def parse(self, line: str) -> List[Dict[str, Any]]:
+        """Events a log line carries; one line can carry several, but each event name once."""
+        events: List[Dict[str, Any]] = []
+        seen = set()
+        for pattern in self.patterns:
+            if pattern.name in seen:
+                continue
+            fields = pattern.match(line)
+            if fields is None:
+                continue
+            seen.add(pattern.name)
+            events.append({"name": pattern.name, "kind": pattern.kind, "backend": pattern.backend, "fields": fields})
+        return events
+
+    def describe(self) -> List[Dict[str, Any]]:
+        return [p.describe() for p in self.patterns]
+
+
+def server_config(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fold startup events into one flat settings dict; later values win."""
+    config: Dict[str, Any] = {}
+    for event in events:
+        if event["kind"] != "startup" or event["name"] == "server_up":
+            continue
+        for key, value in event["fields"].items():
+            # Durations of different steps share the "seconds" field
+            config[f"{event['name']}_{key}" if key in ("seconds", "milliseconds") else key] = value
+    return config
+
+
+# Create singleton instance
+log_patterns = LogPatternRegistry(BUILTIN_PATTERNS)
+
+__all__ = ['log_patterns', 'LogPattern', 'LogPatternRegistry', 'server_config', 'KINDS']
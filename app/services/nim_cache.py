@@ -0,0 +1,405 @@
+# app/services/nim_cache.py
+import asyncio
+import json
+import os
+import re
+import shutil
+import stat
+import time
+import uuid
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+import docker
+from ..config import settings
+from ..utils.logger import logger
+from ..utils.ngc_key_helper import retrieve_key
+from .docker_async import AsyncDocker
+from .nim_pull import PullManager
+
+# Where the host cache is mounted inside NIM containers
+CONTAINER_CACHE_PATH = "/opt/nim/.cache"
+PREFETCH_LABEL = "com.nvidia.nim.prefetch"
+ACTIVE_STATUSES = ("queued", "running")
+MAX_FINISHED_JOBS = 20
+# NIMs rewrite configs and lock files on every start; growth below this is still a cache hit
+CACHE_HIT_TOLERANCE_BYTES = 16 * 1024 ** 2
+
+
+def _model_key(name: str) -> str:
+    # Image and cache directory names spell versions differently, e.g. llama-3.1-8b and llama-3_1-8b
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def tree_usage(path: Path, follow_links: bool = False, seen: Optional[Set[Tuple[int, int]]] = None) -> Tuple[int, float]:
+    """Bytes and newest mtime of the files under ``path``, counting hard-linked files once."""
+    seen = set() if seen is None else seen
+    size, newest = 0, 0.0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                st = os.stat(os.path.join(root, name)) if follow_links else os.lstat(os.path.join(root, name))
+            except OSError:
+                continue
+            if stat.S_ISLNK(st.st_mode) or (st.st_dev, st.st_ino) in seen:
+                continue
+            seen.add((st.st_dev, st.st_ino))
+            size += st.st_size
+            newest = max(newest, st.st_mtime)
+    return size, newest
+
+
+def scan_cache(root: Path) -> Dict[str, Any]:
+    """Index a NIM cache: one entry per model repository, with its profiles.
+
+    NIMs keep weights in hub layouts (``ngc/hub``, ``huggingface/hub``): a
+    ``models--<org>--<name>`` directory holds the blobs, and each profile is a
+    snapshot directory of symlinks into them.
+    """
+    models: Dict[str, Dict[str, Any]] = {}
+    counted: Set[Tuple[int, int]] = set()
+    for model_dir in sorted(list(root.glob("*/hub/models--*")) + list(root.glob("hub/models--*"))):
+        if not model_dir.is_dir():
+            continue
+        size, newest = tree_usage(model_dir, seen=counted)
+        profiles = []
+        snapshots = model_dir / "snapshots"
+        if snapshots.is_dir():
+            for snapshot in sorted(snapshots.iterdir()):
+                # Profiles share blobs, so their sizes may add up to more than the model
+                profile_size, _ = tree_usage(snapshot, follow_links=True)
+                profiles.append({"profile": snapshot.name, "size_bytes": profile_size})
+        key = str(model_dir.relative_to(root))
+        models[key] = {
+            "key": key,
+            "model": model_dir.name[len("models--"):].replace("--", "/"),
+            "source": model_dir.parent.parent.name if model_dir.parent.parent != root else "hub",
+            "size_bytes": size,
+            "profiles": profiles,
+            "modified": newest,
+        }
+    total, _ = tree_usage(root) if root.exists() else (0, 0.0)
+    return {"models": models, "total_bytes": total}
+
+
+def drop_page_cache(paths: List[Path]) -> int:
+    """Evict the files under ``paths`` from the OS page cache; returns the bytes advised.
+
+    Only clean pages are dropped, which is all of them for model weights that
+    are read but never written. Needs no privileges, unlike ``drop_caches``.
+    """
+    dropped = 0
+    for path in paths:
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    fd = os.open(os.path.join(root, name), os.O_RDONLY)
+                except OSError:
+                    continue
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+                    dropped += os.fstat(fd).st_size
+                except OSError:
+                    pass
+                finally:
+                    os.close(fd)
+    return dropped
+
+
+@dataclass
+class PrefetchJob:
+    image_name: str
+    profile: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: str = "queued"
+    error: Optional[str] = None
+    message: Optional[str] = None
+    downloaded_bytes: int = 0
+    container_id: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    finished_at: Optional[str] = None
+    task: Optional[asyncio.Task] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "image_name": self.image_name,
+            "profile": self.profile,
+            "status": self.status,
+            "error": self.error,
+            "message": self.message,
+            "downloaded_bytes": self.downloaded_bytes,
+            "container_id": self.container_id,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class NimCache:
+    """Index, prefetch and LRU eviction for the host NIM model cache.
+
+    The cache directory is bind-mounted into every NIM container. Scans run in
+    a worker thread. Last use is the later of the newest file write and the
+    last container start recorded for a model, which is kept in
+    ``NIM_CACHE_INDEX_FILE`` because reads do not change mtimes. When
+    ``NIM_CACHE_BUDGET_GB`` is set, models are evicted least recently used
+    first after every start and prefetch, skipping models a running NIM uses.
+    """
+
+    def __init__(self, client, docker_async: AsyncDocker, pulls: PullManager, root: Optional[str] = None):
+        self.client = client
+        self.docker = docker_async
+        self.pulls = pulls
+        self.root = Path(root or settings.NIM_CACHE_DIR)
+        self.index: Dict[str, Any] = {"models": {}, "total_bytes": 0}
+        self.scanned_at: Optional[str] = None
+        self.jobs: Dict[str, PrefetchJob] = {}
+        self._last_used: Dict[str, float] = self._load_last_used()
+        self._evict_lock = asyncio.Lock()
+
+    def ensure_dir(self) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        return str(self.root)
+
+    def _load_last_used(self) -> Dict[str, float]:
+        try:
+            with open(settings.NIM_CACHE_INDEX_FILE, "r") as f:
+                return {k: float(v) for k, v in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Could not read NIM cache index {settings.NIM_CACHE_INDEX_FILE}: {e}")
+            return {}
+
+    def _save_last_used(self):
+        try:
+            with open(settings.NIM_CACHE_INDEX_FILE, "w") as f:
+                json.dump(self._last_used, f)
+        except Exception as e:
+            logger.warning(f"Could not save NIM cache index {settings.NIM_CACHE_INDEX_FILE}: {e}")
+
+    async def scan(self) -> Dict[str, Any]:
+        index = await asyncio.to_thread(scan_cache, self.root)
+        for key, model in index["models"].items():
+            model["last_used"] = max(model.pop("modified"), self._last_used.get(key, 0.0))
+        # Forget start times of models that were deleted outside the tool
+        self._last_used = {k: v for k, v in self._last_used.items() if k in index["models"]}
+        self.index = index
+        self.scanned_at = datetime.now().isoformat()
+        return index
+
+    def models_for(self, image_name: str, index: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Cache entries holding the weights of an image, matched on the model name."""
+        name = _model_key(image_name.split("/")[-1].split(":")[0])
+        models = (index or self.index)["models"]
+        return [key for key, model in models.items() if name and _model_key(model["model"]).endswith(name)]
+
+    async def usage(self, image_name: str) -> Dict[str, Any]:
+        """Cache sizes before a start, for ``record_start`` to compare against."""
+        index = await self.scan()
+        return {
+            "total_bytes": index["total_bytes"],
+            "models": {key: index["models"][key]["size_bytes"] for key in self.models_for(image_name, index)},
+        }
+
+    async def record_start(self, image_name: str, before: Dict[str, Any]) -> Dict[str, Any]:
+        """Classify a finished start as a cache hit or miss and mark its models as used."""
+        after = await self.usage(image_name)
+        if after["models"]:
+            downloaded = sum(size - before["models"].get(key, 0) for key, size in after["models"].items())
+            attributed = "model"
+        else:
+            # No directory matched the image name; concurrent starts may inflate this
+            downloaded = after["total_bytes"] - before["total_bytes"]
+            attributed = "cache"
+        now = time.time()
+        for key in after["models"]:
+            self._last_used[key] = now
+            self.index["models"][key]["last_used"] = now
+        self._save_last_used()
+        hit = downloaded < CACHE_HIT_TOLERANCE_BYTES
+        report = {
+            # Unknown when the weights are neither in the cache nor downloaded into it
+            "hit": None if hit and not after["models"] else hit,
+            "downloaded_bytes": max(downloaded, 0),
+            "attributed_to": attributed,
+            "models": sorted(after["models"]),
+            "cached_bytes": sum(before["models"].values()),
+        }
+        logger.info(
+            f"Cache {({True: 'hit', False: 'miss', None: 'unknown'})[report['hit']]} for {image_name}:"
+            f" {report['downloaded_bytes'] / 1e9:.2f} GB downloaded"
+        )
+        await self.enforce_budget()
+        return report
+
+    async def drop_page_cache(self, image_name: str) -> int:
+        """Make the next start of an image read its weights from disk; returns the bytes dropped."""
+        index = await self.scan()
+        return await asyncio.to_thread(
+            drop_page_cache, [self.root / key for key in self.models_for(image_name, index)]
+        )
+
+    async def _models_in_use(self) -> Set[str]:
+        def scan() -> List[str]:
+            images = []
+            for c in self.client.containers.list(filters={"label": "com.nvidia.nim=true"}):
+                images.append((c.attrs.get("Config") or {}).get("Image") or "")
+            return images
+        in_use: Set[str] = set()
+        images = await self.docker.call(scan)
+        images += [job.image_name for job in self.jobs.values() if job.status in ACTIVE_STATUSES]
+        for image_name in images:
+            in_use.update(self.models_for(image_name))
+        return in_use
+
+    async def evict(self, budget_bytes: Optional[int] = None, keys: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Delete the named models, or least recently used models until the cache fits ``budget_bytes``."""
+        async with self._evict_lock:
+            index = await self.scan()
+            in_use = await self._models_in_use()
+            usage = index["total_bytes"]
+            report = {"removed": [], "skipped_in_use": [], "freed_bytes": 0}
+            if keys is not None:
+                candidates = [index["models"][k] for k in keys if k in index["models"]]
+            else:
+                candidates = sorted(index["models"].values(), key=lambda m: m["last_used"])
+            for model in candidates:
+                if keys is None and usage <= budget_bytes:
+                    break
+                if model["key"] in in_use:
+                    report["skipped_in_use"].append(model["key"])
+                    continue
+                await asyncio.to_thread(shutil.rmtree, self.root / model["key"], True)
+                usage -= model["size_bytes"]
+                report["freed_bytes"] += model["size_bytes"]
+                report["removed"].append(model["key"])
+                logger.info(f"Evicted {model['model']} ({model['size_bytes'] / 1e9:.2f} GB) from the NIM cache")
+            if report["removed"]:
+                await self.scan()
+                self._save_last_used()
+            if keys is None and usage > budget_bytes:
+                logger.warning(
+                    f"NIM cache uses {usage / 1e9:.1f} GB, above its {budget_bytes / 1e9:.1f} GB budget,"
+                    f" with only models in use left"
+                )
+            report["total_bytes"] = self.index["total_bytes"]
+            return report
+
+    async def enforce_budget(self) -> Optional[Dict[str, Any]]:
+        if not settings.NIM_CACHE_BUDGET_GB:
+            return None
+        budget = int(settings.NIM_CACHE_BUDGET_GB * 1024 ** 3)
+        if self.index["total_bytes"] <= budget:
+            return None
+        try:
+            return await self.evict(budget)
+        except Exception as e:
+            logger.error(f"NIM cache eviction failed: {e}")
+            return None
+
+    def prefetch(self, image_name: str, profile: Optional[str] = None) -> PrefetchJob:
+        """Download an image's model weights into the cache without serving it."""
+        for job in self.jobs.values():
+            if job.image_name == image_name and job.profile == profile and job.status in ACTIVE_STATUSES:
+                return job
+        job = PrefetchJob(image_name, profile)
+        self.jobs[job.id] = job
+        job.task = asyncio.create_task(self._run_prefetch(job))
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.status not in ACTIVE_STATUSES or job.task is None:
+            return False
+        job.task.cancel()
+        return True
+
+    async def _run_prefetch(self, job: PrefetchJob):
+        container = None
+        try:
+            ngc_key = retrieve_key()
+            if not ngc_key:
+                raise RuntimeError("NGC API key not found. Please add it through the WebUI.")
+            await self.pulls.ensure_image(job.image_name)
+            before = await self.usage(job.image_name)
+            job.status = "running"
+            command = ["download-to-cache"] + (["--profiles", job.profile] if job.profile else [])
+            container = await self.docker.call(
+                self.client.containers.run,
+                job.image_name,
+                command=command,
+                detach=True,
+                environment={"NGC_API_KEY": ngc_key},
+                labels={PREFETCH_LABEL: job.id},
+                # Without a profile the NIM picks the one matching the visible GPUs; nothing is allocated
+                device_requests=[docker.types.DeviceRequest(count=-1, capabilities=[["gpu"]])],
+                volumes={self.ensure_dir(): {"bind": CONTAINER_CACHE_PATH, "mode": "rw"}},
+                user=f"{os.getuid()}:{os.getgid()}",
+            )
+            job.container_id = container.id
+            logger.info(f"Prefetching {job.image_name} into the NIM cache ({container.id[:12]})")
+            lines = self.docker.stream(lambda: container.logs(stream=True, follow=True))
+            async with aclosing(lines) as stream:
+                async for line in stream:
+                    text = line.decode("utf-8", errors="replace").strip()
+                    if text:
+                        job.message = text
+            result = await self.docker.call(container.wait)
+            after = await self.usage(job.image_name)
+            job.downloaded_bytes = max(
+                sum(after["models"].values()) - sum(before["models"].values())
+                if after["models"] else after["total_bytes"] - before["total_bytes"],
+                0,
+            )
+            if result.get("StatusCode", 0) != 0:
+                raise RuntimeError(f"download-to-cache exited with {result.get('StatusCode')}: {job.message}")
+            for key in after["models"]:
+                self._last_used[key] = time.time()
+            self._save_last_used()
+            self._finish(job, "completed")
+            logger.info(f"Prefetched {job.image_name}: {job.downloaded_bytes / 1e9:.2f} GB downloaded")
+        except asyncio.CancelledError:
+            self._finish(job, "cancelled")
+        except Exception as e:
+            logger.error(f"Prefetch {job.id} of {job.image_name} failed: {e}")
+            self._finish(job, "failed", str(e))
+        finally:
+            if container is not None:
+                try:
+                    await self.docker.call(container.remove, force=True)
+                except docker.errors.NotFound:
+                    pass
+                except Exception as e:
+                    logger.warning(f"Failed to remove prefetch container {container.id[:12]}: {e}")
+        if job.status == "completed":
+            await self.enforce_budget()
+
+    def _finish(self, job: PrefetchJob, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.now().isoformat()
+        finished = [job_id for job_id, j in self.jobs.items() if j.status not in ACTIVE_STATUSES]
+        for job_id in finished[:-MAX_FINISHED_JOBS]:
+            self.jobs.pop(job_id, None)
+
+    async def status(self) -> Dict[str, Any]:
+        index = await self.scan()
+        models = sorted(index["models"].values(), key=lambda m: m["last_used"], reverse=True)
+        return {
+            "root": str(self.root),
+            "scanned_at": self.scanned_at,
+            "total_bytes": index["total_bytes"],
+            "model_bytes": sum(m["size_bytes"] for m in models),
+            "budget_bytes": int(settings.NIM_CACHE_BUDGET_GB * 1024 ** 3) or None,
+            "models": [
+                {**m, "last_used": datetime.fromtimestamp(m["last_used"]).isoformat() if m["last_used"] else None}
+                for m in models
+            ],
+            "prefetch_jobs": [job.snapshot() for job in self.jobs.values()],
+        }
+
+
+__all__ = ['NimCache', 'PrefetchJob', 'scan_cache', 'drop_page_cache']
@@ -1,23 +1,279 @@
 # File: app/services/nim_pull.py
-from typing import Dict
-from queue import Queue
+import asyncio
+import time
+import uuid
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import docker
+from docker.utils import parse_repository_tag
+from ..config import settings
+from ..utils.logger import logger
+from ..utils.ngc_key_helper import retrieve_key
+from .docker_async import AsyncDocker
+
+NGC_REGISTRY = "nvcr.io"
+ACTIVE_STATUSES = ("queued", "pulling")
+MAX_FINISHED_JOBS = 20
+# Seconds between throughput samples, and the smoothing applied to them
+RATE_SAMPLE_SECONDS = 0.5
+RATE_SMOOTHING = 0.3
+# A new pull only starts while the running ones leave this much of the bandwidth budget unused
+BANDWIDTH_HEADROOM = 0.8
+# Running pulls must have been measured this long before the bandwidth check trusts their rate
+RATE_WARMUP_SECONDS = 5.0
+SCHEDULE_INTERVAL_SECONDS = 1.0
+
+
+@dataclass
+class LayerProgress:
+    status: str = "waiting"
+    total: int = 0
+    downloaded: int = 0
+    extracted: int = 0
+    cached: bool = False
+
 
 class NimPullProgress:
-    def __init__(self, image_name: str, progress_queues: Dict[str, Queue]):
-        self.image_name = image_name
-        self.queue = Queue()
-        self.total_size = 0
-        self.current_size = 0
-        progress_queues[image_name] = self.queue
-
-    def __call__(self, current: Dict):
-        if 'total' in current:
-            self.total_size = current['total']
-        if 'current' in current:
-            self.current_size = current['current']
-        
-        self.queue.put({
-            'total_size': self.total_size,
-            'current_size': self.current_size,
-            'status': 'in_progress'
-        })
+    """Aggregates docker pull stream events into per-layer and total progress."""
+
+    def __init__(self):
+        self.layers: Dict[str, LayerProgress] = {}
+        self.message: Optional[str] = None
+        self.bytes_per_second = 0.0
+        self._rate_bytes = 0
+        self._rate_time = time.monotonic()
+
+    def __call__(self, event: Dict[str, Any]):
+        if "error" in event:
+            raise RuntimeError(event.get("error") or "Pull failed")
+        status = event.get("status") or ""
+        layer_id = event.get("id")
+        detail = event.get("progressDetail") or {}
+        if not layer_id or status.startswith(("Pulling from", "Digest:", "Status:")):
+            self.message = status
+            return
+        layer = self.layers.setdefault(layer_id, LayerProgress())
+        if status == "Downloading":
+            layer.status = "downloading"
+            layer.total = detail.get("total") or layer.total
+            layer.downloaded = detail.get("current", layer.downloaded)
+        elif status in ("Verifying Checksum", "Download complete"):
+            layer.status = "downloaded"
+            layer.downloaded = layer.total
+        elif status == "Extracting":
+            layer.status = "extracting"
+            layer.downloaded = layer.total
+            layer.extracted = detail.get("current", layer.extracted)
+        elif status == "Pull complete":
+            layer.status = "complete"
+            layer.downloaded = layer.extracted = layer.total
+        elif status == "Already exists":
+            layer.status = "complete"
+            layer.cached = True
+        elif status.startswith("Retrying"):
+            layer.status = "retrying"
+        self._sample_rate()
+
+    @property
+    def downloaded_bytes(self) -> int:
+        return sum(min(layer.downloaded, layer.total) for layer in self.layers.values())
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(layer.total for layer in self.layers.values())
+
+    def _sample_rate(self):
+        now = time.monotonic()
+        elapsed = now - self._rate_time
+        if elapsed < RATE_SAMPLE_SECONDS:
+            return
+        downloaded = self.downloaded_bytes
+        rate = max(downloaded - self._rate_bytes, 0) / elapsed
+        self.bytes_per_second = RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * self.bytes_per_second
+        self._rate_bytes, self._rate_time = downloaded, now
+
+    def snapshot(self) -> Dict[str, Any]:
+        layers = self.layers.values()
+        pending = [layer for layer in layers if not layer.cached]
+        downloaded, total = self.downloaded_bytes, self.total_bytes
+        # Waiting layers report their size only once their download starts
+        sizes_known = all(layer.total or layer.status == "complete" for layer in pending)
+        remaining = total - downloaded
+        return {
+            "current_size": downloaded,
+            "total_size": total,
+            "percent": 100.0 * downloaded / total if total else (100.0 if layers and not pending else 0.0),
+            "sizes_known": sizes_known,
+            "bytes_per_second": self.bytes_per_second,
+            "eta_seconds": remaining / self.bytes_per_second if sizes_known and self.bytes_per_second > 0 else None,
+            "layers_total": len(self.layers),
+            "layers_complete": sum(1 for layer in layers if layer.status == "complete"),
+            "layers_cached": sum(1 for layer in layers if layer.cached),
+            "layers": {layer_id: vars(layer) for layer_id, layer in self.layers.items()},
+            "message": self.message,
+        }
+
+
+@dataclass
+class PullJob:
+    image_name: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: str = "queued"
+    error: Optional[str] = None
+    # Bumped on every change, so subscribers only resend updated jobs
+    seq: int = 0
+    progress: NimPullProgress = field(default_factory=NimPullProgress)
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    started: Optional[float] = None
+    task: Optional[asyncio.Task] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "image_name": self.image_name,
+            "status": self.status,
+            "error": self.error,
+            "seq": self.seq,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            **self.progress.snapshot(),
+        }
+
+
+class PullManager:
+    """Runs image pulls as background jobs with streamed per-layer progress.
+
+    At most ``NIM_PULL_MAX_CONCURRENT`` pulls run at once. When
+    ``NIM_PULL_BANDWIDTH_MBPS`` is set, a queued pull also waits until the
+    measured throughput of the running pulls leaves room in that budget, since
+    more parallel pulls on a saturated link only slow each other down.
+    """
+
+    def __init__(self, client, docker_async: AsyncDocker):
+        self.client = client
+        self.docker = docker_async
+        self.jobs: Dict[str, PullJob] = {}
+        self._scheduler: Optional[asyncio.Task] = None
+
+    def submit(self, image_name: str) -> PullJob:
+        """Queue a pull, or return the active job already pulling this image."""
+        for job in self.jobs.values():
+            if job.image_name == image_name and job.status in ACTIVE_STATUSES:
+                return job
+        job = PullJob(image_name)
+        self.jobs[job.id] = job
+        logger.info(f"Queued pull {job.id} for {image_name}")
+        self._schedule()
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.create_task(self._schedule_loop())
+        return job
+
+    async def ensure_image(self, image_name: str):
+        """Return once the image is local, joining or starting a pull job if needed."""
+        try:
+            await self.docker.call(self.client.images.get, image_name)
+            return
+        except docker.errors.ImageNotFound:
+            pass
+        job = self.submit(image_name)
+        await job.done.wait()
+        if job.status != "completed":
+            raise RuntimeError(f"Pull of {image_name} {job.status}: {job.error}")
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.status not in ACTIVE_STATUSES:
+            return False
+        if job.task:
+            job.task.cancel()
+        else:
+            self._finish(job, "cancelled")
+        return True
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [job.snapshot() for job in self.jobs.values()]
+
+    def _pulling(self) -> List[PullJob]:
+        return [job for job in self.jobs.values() if job.status == "pulling"]
+
+    def _can_start(self) -> bool:
+        running = self._pulling()
+        if not running:
+            return True
+        if len(running) >= settings.NIM_PULL_MAX_CONCURRENT:
+            return False
+        budget = settings.NIM_PULL_BANDWIDTH_MBPS * 1e6 / 8
+        if not budget:
+            return True
+        if any(time.monotonic() - job.started < RATE_WARMUP_SECONDS for job in running):
+            return False
+        return sum(job.progress.bytes_per_second for job in running) < budget * BANDWIDTH_HEADROOM
+
+    def _schedule(self):
+        for job in list(self.jobs.values()):
+            if job.status != "queued":
+                continue
+            if not self._can_start():
+                break
+            job.status = "pulling"
+            job.seq += 1
+            job.started = time.monotonic()
+            job.started_at = datetime.now().isoformat()
+            job.task = asyncio.create_task(self._run(job))
+
+    async def _schedule_loop(self):
+        # Bandwidth headroom changes as rates are measured, so queued pulls are re-checked
+        while any(job.status == "queued" for job in self.jobs.values()):
+            await asyncio.sleep(SCHEDULE_INTERVAL_SECONDS)
+            self._schedule()
+
+    async def _run(self, job: PullJob):
+        repository, tag = parse_repository_tag(job.image_name)
+        auth = None
+        if repository.startswith(NGC_REGISTRY + "/"):
+            key = retrieve_key()
+            if key:
+                auth = {"username": "$oauthtoken", "password": key}
+        logger.info(f"Pulling image {job.image_name}...")
+        try:
+            events = self.docker.stream(
+                lambda: self.client.api.pull(
+                    repository, tag=tag or "latest", stream=True, decode=True, auth_config=auth
+                )
+            )
+            async with aclosing(events) as stream:
+                async for event in stream:
+                    job.progress(event)
+                    job.seq += 1
+            self._finish(job, "completed")
+        except asyncio.CancelledError:
+            self._finish(job, "cancelled")
+        except Exception as e:
+            logger.error(f"Pull {job.id} of {job.image_name} failed: {e}")
+            self._finish(job, "failed", str(e))
+
+    def _finish(self, job: PullJob, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.seq += 1
+        job.finished_at = datetime.now().isoformat()
+        job.done.set()
+        if status == "completed":
+            snapshot = job.progress.snapshot()
+            logger.info(
+                f"Pulled {job.image_name}: {snapshot['total_size'] / 1e9:.2f} GB in"
+                f" {time.monotonic() - job.started:.0f}s ({snapshot['layers_cached']} layers cached)"
+            )
+        finished = [job_id for job_id, j in self.jobs.items() if j.status not in ACTIVE_STATUSES]
+        for job_id in finished[:-MAX_FINISHED_JOBS]:
+            self.jobs.pop(job_id, None)
+        self._schedule()
+
+
+__all__ = ['PullManager', 'PullJob', 'NimPullProgress']
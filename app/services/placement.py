@@ -0,0 +1,137 @@
+# app/services/placement.py
+import socket
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from ..config import settings
+from ..utils.logger import logger
+from .gpu_utils import count_nvidia_gpus
+
+# Port the NIM server listens on inside its container
+CONTAINER_PORT = "8000/tcp"
+
+
+class PlacementError(RuntimeError):
+    """No free GPUs or host ports for a container."""
+
+
+@dataclass
+class Placement:
+    device_ids: List[int]
+    port: int
+    container_id: Optional[str] = None
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://localhost:{self.port}"
+
+
+def _port_free(port: int) -> bool:
+    # Docker publishes on all interfaces, so the port must be bindable there
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind(("", port))
+        except OSError:
+            return False
+    return True
+
+
+class PlacementScheduler:
+    """Assigns GPUs by device id and host ports to NIM containers.
+
+    Placements are held from ``reserve`` until ``release``, so containers
+    starting concurrently never share a GPU or a port. Adjacent device ids are
+    preferred, which keeps a multi-GPU model on neighbouring (usually
+    NVLink-connected) GPUs. All methods run on the event loop.
+    """
+
+    def __init__(self, devices: Optional[List[int]] = None, ports: Optional[range] = None):
+        # Resolved on first use, so importing this module does not run nvidia-smi
+        self.devices = devices
+        self.ports = ports or range(settings.BASE_PORT, settings.BASE_PORT + settings.NIM_PORT_COUNT)
+        self.placements: List[Placement] = []
+
+    def gpu_devices(self) -> List[int]:
+        if self.devices is None:
+            configured = [int(d) for d in settings.NIM_GPU_DEVICES.split(",") if d.strip()]
+            self.devices = configured or list(range(count_nvidia_gpus()))
+        return self.devices
+
+    def free_devices(self) -> List[int]:
+        used = {d for p in self.placements for d in p.device_ids}
+        return [d for d in self.gpu_devices() if d not in used]
+
+    def _pick_devices(self, gpu_count: int) -> Optional[List[int]]:
+        free = self.free_devices()
+        if len(free) < gpu_count:
+            return None
+        for start in range(len(free) - gpu_count + 1):
+            block = free[start:start + gpu_count]
+            if block[-1] - block[0] == gpu_count - 1:
+                return block
+        return free[:gpu_count]
+
+    def _pick_port(self) -> Optional[int]:
+        used = {p.port for p in self.placements}
+        for port in self.ports:
+            if port not in used and _port_free(port):
+                return port
+        return None
+
+    def can_place(self, gpu_count: int) -> bool:
+        return len(self.free_devices()) >= gpu_count
+
+    def reserve(self, gpu_count: int) -> Placement:
+        """Hold GPUs and a host port for a container about to start."""
+        device_ids = self._pick_devices(gpu_count)
+        if device_ids is None:
+            raise PlacementError(
+                f"{gpu_count} GPUs requested but only {len(self.free_devices())}"
+                f" of {len(self.gpu_devices())} are free"
+            )
+        port = self._pick_port()
+        if port is None:
+            raise PlacementError(f"No free host port in {self.ports.start}-{self.ports.stop - 1}")
+        placement = Placement(device_ids, port)
+        self.placements.append(placement)
+        logger.info(f"Placed container on GPUs {device_ids}, host port {port}")
+        return placement
+
+    def bind(self, placement: Placement, container_id: str):
+        placement.container_id = container_id
+
+    def adopt(self, container_id: str, device_ids: List[int], port: Optional[int]):
+        """Record the placement of a container started elsewhere, e.g. before a restart."""
+        if self.get(container_id) or port is None:
+            return
+        self.placements.append(Placement(list(device_ids), port, container_id))
+
+    def get(self, container_id: str) -> Optional[Placement]:
+        return next((p for p in self.placements if p.container_id == container_id), None)
+
+    def release(self, placement: Optional[Placement]):
+        self.placements = [p for p in self.placements if p is not placement]
+
+    def release_container(self, container_id: str):
+        self.release(self.get(container_id))
+
+    def retain(self, container_ids: List[str]):
+        """Drop placements of containers that are gone; pending reservations are kept."""
+        alive = set(container_ids)
+        self.placements = [p for p in self.placements if p.container_id is None or p.container_id in alive]
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "gpus": self.gpu_devices(),
+            "free_gpus": self.free_devices(),
+            "port_range": [self.ports.start, self.ports.stop - 1],
+            "placements": [
+                {"container_id": p.container_id, "gpus": p.device_ids, "port": p.port, "endpoint": p.endpoint}
+                for p in self.placements
+            ],
+        }
+
+
+# Create singleton instance
+placement_scheduler = PlacementScheduler()
+
+__all__ = ['placement_scheduler', 'PlacementScheduler', 'Placement', 'PlacementError', 'CONTAINER_PORT']
@@ -0,0 +1,222 @@
+# app/services/readiness.py
+import asyncio
+import time
+from contextlib import aclosing
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+import aiohttp
+from ..utils.logger import logger
+from .log_patterns import log_patterns, server_config
+
+# Startup phases in the order they normally happen
+PHASES = ["image_ready", "container_created", "weights_loaded", "server_up", "first_inference"]
+# Parsed log events that mark the startup phase of the same name (see app/services/log_patterns.py)
+PHASE_EVENTS = ("weights_loaded", "server_up")
+HEALTH_PATHS = ("/v1/health/ready", "/v1/models")
+BACKOFF_INITIAL_SECONDS = 0.25
+BACKOFF_MAX_SECONDS = 5.0
+MAX_TRACKERS = 50
+
+
+class StartupTracker:
+    """Readiness state and startup phase timeline of one container start."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.started_at = datetime.now().isoformat()
+        self.container_id: Optional[str] = None
+        self.phases: Dict[str, float] = {}
+        self.status = "starting"
+        self.error: Optional[str] = None
+        # Model cache hit or miss of this start, filled in by the container manager
+        self.cache: Optional[Dict[str, Any]] = None
+        # Structured events parsed from the log while the container started
+        self.log_events: List[Dict[str, Any]] = []
+        self._done = asyncio.Event()
+        # Set by the log watcher so the HTTP prober stops backing off right away
+        self._server_hint = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def mark(self, phase: str):
+        if phase in self.phases or self.done:
+            return
+        self.phases[phase] = time.monotonic() - self.started
+        logger.info(f"Container {(self.container_id or 'pending')[:12]} startup: {phase} after {self.phases[phase]:.1f}s")
+        if phase == "server_up":
+            self._server_hint.set()
+
+    def finish(self, status: str, error: Optional[str] = None):
+        if self.done:
+            return
+        self.status = status
+        self.error = error
+        self._done.set()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    async def wait(self, timeout: Optional[float] = None) -> str:
+        """Block until the container is ready or failed; returns the final status."""
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            self.finish("timeout", f"Not ready after {timeout}s")
+        return self.status
+
+    def timeline(self) -> Dict[str, Any]:
+        phases: List[Dict[str, Any]] = []
+        previous = 0.0
+        for phase in sorted(self.phases, key=self.phases.get):
+            at = self.phases[phase]
+            phases.append({"phase": phase, "at": at, "duration": at - previous})
+            previous = at
+        return {
+            "container_id": self.container_id,
+            "started_at": self.started_at,
+            "status": self.status,
+            "error": self.error,
+            "phases": phases,
+            "missing_phases": [p for p in PHASES if p not in self.phases],
+            "total_seconds": previous,
+            "cache": self.cache,
+            # Profile, KV cache and batch limits the server chose; they explain performance differences
+            "server_config": server_config(self.log_events),
+        }
+
+
+class ReadinessEngine:
+    """Watches container logs and health endpoints concurrently to detect readiness.
+
+    Waiters block on the tracker's event rather than polling. Every start also
+    records a phase timeline, which shows where a cold start spends its time.
+    """
+
+    def __init__(self):
+        self.trackers: Dict[str, StartupTracker] = {}
+
+    def register(self, container_id: str, tracker: Optional[StartupTracker] = None) -> StartupTracker:
+        tracker = tracker or StartupTracker()
+        tracker.container_id = container_id
+        self.trackers[container_id] = tracker
+        for stale in list(self.trackers)[:-MAX_TRACKERS]:
+            self.trackers.pop(stale, None)
+        return tracker
+
+    def get(self, container_id: str) -> Optional[StartupTracker]:
+        return self.trackers.get(container_id)
+
+    def watch(self, tracker: StartupTracker, logs: AsyncIterator[bytes], base_url: str, model: str):
+        """Start watching ``logs`` and probing ``base_url`` until the tracker finishes."""
+        tracker._task = asyncio.create_task(self._run(tracker, logs, base_url, model))
+
+    async def wait(self, container_id: str, timeout: Optional[float] = None) -> Optional[str]:
+        tracker = self.get(container_id)
+        return await tracker.wait(timeout) if tracker else None
+
+    async def _run(self, tracker: StartupTracker, logs: AsyncIterator[bytes], base_url: str, model: str):
+        watchers = [
+            asyncio.create_task(self._watch_logs(tracker, logs)),
+            asyncio.create_task(self._probe(tracker, base_url, model)),
+        ]
+        try:
+            await asyncio.wait(watchers, return_when=asyncio.FIRST_EXCEPTION)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for watcher in watchers:
+                watcher.cancel()
+            for watcher in watchers:
+                if watcher.done() and not watcher.cancelled() and watcher.exception():
+                    tracker.finish("error", str(watcher.exception()))
+
+    async def _watch_logs(self, tracker: StartupTracker, logs: AsyncIterator[bytes]):
+        async with aclosing(logs) as lines:
+            async for raw in lines:
+                line = raw.decode("utf-8", "replace").strip()
+                logger.info(f"Container Log: {line}")
+                for event in log_patterns.parse(line):
+                    if event["kind"] == "error":
+                        # Only startup errors count; the server may log benign errors once it is up
+                        if "server_up" not in tracker.phases:
+                            logger.error(f"Error in container logs: {line}")
+                            tracker.finish("error", line)
+                            return
+                        continue
+                    if not tracker.done:
+                        tracker.log_events.append({**event, "at": time.monotonic() - tracker.started, "line": line})
+                    if event["name"] in PHASE_EVENTS:
+                        tracker.mark(event["name"])
+        if not tracker.done:
+            tracker.finish("error", "Container exited before becoming ready")
+
+    async def _backoff(self, tracker: StartupTracker, delay: float) -> float:
+        try:
+            await asyncio.wait_for(tracker._server_hint.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        return min(delay * 2, BACKOFF_MAX_SECONDS)
+
+    async def _probe(self, tracker: StartupTracker, base_url: str, model: str):
+        delay = BACKOFF_INITIAL_SECONDS
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+            while "server_up" not in tracker.phases:
+                results = await asyncio.gather(
+                    *(self._get(session, base_url + path) for path in HEALTH_PATHS)
+                )
+                if any(status == 200 for status, _ in results):
+                    tracker.mark("server_up")
+                    break
+                delay = await self._backoff(tracker, delay)
+
+            delay = BACKOFF_INITIAL_SECONDS
+            while not tracker.done:
+                if await self._infer(session, base_url, model):
+                    tracker.mark("first_inference")
+                    tracker.finish("ready")
+                    return
+                # Retry with the name the server actually serves; the log may have reported
+                # server_up before /v1/models was ever fetched
+                _, models = await self._get(session, base_url + "/v1/models")
+                served = [m.get("id") for m in (models or {}).get("data", []) if m.get("id")]
+                if served and model not in served:
+                    model = served[0]
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, BACKOFF_MAX_SECONDS)
+
+    @staticmethod
+    async def _get(session: aiohttp.ClientSession, url: str):
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return response.status, None
+                try:
+                    return 200, await response.json(content_type=None)
+                except ValueError:
+                    return 200, None
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None, None
+
+    @staticmethod
+    async def _infer(session: aiohttp.ClientSession, base_url: str, model: str) -> bool:
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": "Are you alive?"}],
+            "max_tokens": 8,
+        }
+        try:
+            async with session.post(f"{base_url}/v1/chat/completions", json=payload) as response:
+                if response.status == 200:
+                    return True
+                logger.debug(f"Readiness inference probe returned {response.status}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"Readiness inference probe failed: {e}")
+        return False
+
+
+# Create singleton instance
+readiness_engine = ReadinessEngine()
+
+__all__ = ['readiness_engine', 'StartupTracker', 'PHASES']
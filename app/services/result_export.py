@@ -0,0 +1,174 @@
+# app/services/result_export.py
+import csv
+import hashlib
+import json
+import os
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+import numpy as np
+from .sample_archive import SampleArchive
+from ..utils.logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+FORMATS = {"csv": ".csv", "ndjson": ".ndjson", "parquet": ".parquet"}
+TABLES = ["requests", "timeline"]
+# Rows materialized per chunk; bounds memory regardless of run size
+CHUNK_ROWS = 65536
+
+REQUEST_COLUMNS = [
+    "request", "scheduled", "sent", "first_token", "last_token", "ttft", "e2e",
+    "prompt_tokens", "output_tokens", "chunks", "status", "endpoint", "workload",
+]
+TIMELINE_COLUMNS = [
+    "t", "in_flight", "tokens_per_second", "completed_requests", "failed_requests",
+    "gpu_utilization", "gpu_memory_used", "power_draw",
+]
+
+
+def request_chunks(archive: SampleArchive, chunk_rows: int = CHUNK_ROWS) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield the per-request table as column dicts of at most ``chunk_rows`` rows."""
+    categories = {name: np.array(values or [""], dtype=object) for name, values in archive.meta["categories"].items()}
+    for start in range(0, archive.count, chunk_rows):
+        rows = slice(start, min(start + chunk_rows, archive.count))
+        sent = np.asarray(archive.column("sent")[rows])
+        first_token = np.asarray(archive.column("first_token")[rows])
+        last_token = np.asarray(archive.column("last_token")[rows])
+        yield {
+            "request": np.arange(rows.start, rows.stop),
+            "scheduled": np.asarray(archive.column("scheduled")[rows]),
+            "sent": sent,
+            "first_token": first_token,
+            "last_token": last_token,
+            "ttft": first_token - sent,
+            "e2e": last_token - sent,
+            "prompt_tokens": np.asarray(archive.column("prompt_tokens")[rows]),
+            "output_tokens": np.asarray(archive.column("output_tokens")[rows]),
+            "chunks": np.asarray(archive.column("chunks")[rows]),
+            "status": categories["status"][archive.column("status")[rows]],
+            "endpoint": categories["endpoint"][archive.column("endpoint")[rows]],
+            "workload": categories["workload"][archive.column("workload")[rows]],
+        }
+
+
+def timeline_chunks(timeline: List[Dict[str, Any]], chunk_rows: int = CHUNK_ROWS) -> Iterator[Dict[str, np.ndarray]]:
+    for start in range(0, len(timeline), chunk_rows):
+        rows = timeline[start:start + chunk_rows]
+        yield {
+            name: np.array([row.get(name) if row.get(name) is not None else np.nan for row in rows], dtype=np.float64)
+            for name in TIMELINE_COLUMNS
+        }
+
+
+def _rows(chunk: Dict[str, np.ndarray], columns: List[str]) -> Iterator[List[Any]]:
+    # tolist() converts numpy scalars to Python types in one pass
+    return zip(*(chunk[name].tolist() for name in columns))
+
+
+def _clean(value: Any) -> Any:
+    return None if isinstance(value, float) and value != value else value
+
+
+def write_chunks(path: Path, chunks: Iterator[Dict[str, np.ndarray]], columns: List[str], fmt: str):
+    """Write column chunks to ``path`` in the given format without holding the whole table."""
+    if fmt == "csv":
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for chunk in chunks:
+                writer.writerows(["" if _clean(v) is None else v for v in row] for row in _rows(chunk, columns))
+    elif fmt == "ndjson":
+        with open(path, "w") as f:
+            for chunk in chunks:
+                f.writelines(
+                    json.dumps(dict(zip(columns, map(_clean, row)))) + "\n" for row in _rows(chunk, columns)
+                )
+    elif fmt == "parquet":
+        if pa is None:
+            raise ValueError("Parquet export requires the pyarrow package")
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.table({name: chunk[name] for name in columns})
+                if writer is None:
+                    writer = pq.ParquetWriter(str(path), table.schema, compression="zstd")
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            pq.write_table(pa.table({name: [] for name in columns}), str(path))
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+
+class ResultExporter:
+    """Materializes run exports on disk so they can be served with HTTP range support."""
+
+    def __init__(self, export_dir: Path):
+        self.export_dir = Path(export_dir)
+
+    def _target(self, name: str) -> Path:
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        return self.export_dir / name
+
+    def _materialize(self, path: Path, write) -> Path:
+        # Completed runs are immutable, so an existing export is reused as-is
+        if path.exists():
+            return path
+        # Unique temp name so concurrent requests for the same export don't collide
+        partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.partial")
+        try:
+            write(partial)
+            os.replace(partial, path)
+        finally:
+            if partial.exists():
+                partial.unlink()
+        logger.info(f"Exported {path}")
+        return path
+
+    def export_requests(self, run_id: int, archive: SampleArchive, fmt: str) -> Path:
+        path = self._target(f"run_{run_id}_requests{FORMATS[fmt]}")
+        return self._materialize(path, lambda p: write_chunks(p, request_chunks(archive), REQUEST_COLUMNS, fmt))
+
+    def export_timeline(self, run_id: int, timeline: List[Dict[str, Any]], fmt: str) -> Path:
+        path = self._target(f"run_{run_id}_timeline{FORMATS[fmt]}")
+        return self._materialize(path, lambda p: write_chunks(p, timeline_chunks(timeline), TIMELINE_COLUMNS, fmt))
+
+    def invalidate(self, run_id: int) -> int:
+        """Drop cached exports of a run whose data changed, e.g. after a resume."""
+        if not self.export_dir.exists():
+            return 0
+        removed = 0
+        # Bundles are keyed by file names, not contents, so they go too
+        for path in list(self.export_dir.glob(f"run_{run_id}_*")) + list(self.export_dir.glob("bundle_*.zip")):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def bundle(self, files: Dict[int, List[Path]], fmt: str) -> Path:
+        """Zip per-run export files into one archive (streamed from disk, not memory)."""
+        digest = hashlib.sha1(
+            json.dumps({str(k): [p.name for p in v] for k, v in sorted(files.items())}).encode()
+        ).hexdigest()[:16]
+        path = self._target(f"bundle_{digest}.zip")
+        # Parquet pages are already compressed
+        compression = zipfile.ZIP_STORED if fmt == "parquet" else zipfile.ZIP_DEFLATED
+
+        def write(target: Path):
+            with zipfile.ZipFile(target, "w", compression=compression, allowZip64=True) as zf:
+                for run_id, paths in sorted(files.items()):
+                    for p in paths:
+                        zf.write(p, arcname=f"run_{run_id}/{p.name}")
+
+        return self._materialize(path, write)
+
+
+__all__ = ['ResultExporter', 'FORMATS', 'TABLES']
@@ -0,0 +1,414 @@
+# app/services/results_store.py
+import base64
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, or_, select, text, update
+from ..models.database import async_session, init_db
+from ..models.benchmark import BenchmarkRun, StoreMeta
+from ..utils.logger import logger
+
+LEGACY_IMPORT_KEY = "legacy_json_import"
+
+# Columns that can be listed without touching the run document
+SUMMARY_FIELDS = [
+    "id", "name", "model_name", "provider", "quantization", "benchmark_type", "status", "start_time", "end_time",
+    "total_requests", "successful_requests", "total_tokens", "average_tps", "peak_tps",
+    "p95_latency", "time_to_first_token", "inter_token_latency", "is_baseline",
+]
+# Fields served from the (series-free) run document
+DOCUMENT_FIELDS = ["config", "metrics", "artifacts", "container_id"]
+SORT_KEYS = ["start_time", "id", "average_tps", "peak_tps", "p95_latency", "time_to_first_token"]
+# Per-request and time-series metrics, stored apart from the run document
+SERIES_METRICS = ["historical", "timeline"]
+
+
+def split_series(run_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Separate heavy series from a run document, returning (light document, series)."""
+    light = dict(run_data)
+    metrics = dict(light.get("metrics") or {})
+    series = {key: metrics.pop(key) for key in SERIES_METRICS if key in metrics}
+    container_resources = metrics.get("container_resources")
+    if isinstance(container_resources, dict) and "samples" in container_resources:
+        container_resources = dict(container_resources)
+        series["container_samples"] = container_resources.pop("samples")
+        metrics["container_resources"] = container_resources
+    server_metrics = metrics.get("server_metrics")
+    if isinstance(server_metrics, dict) and "samples" in server_metrics:
+        server_metrics = dict(server_metrics)
+        series["server_metrics_samples"] = server_metrics.pop("samples")
+        metrics["server_metrics"] = server_metrics
+    light["metrics"] = metrics
+    return light, series
+
+
+def encode_cursor(value: Any, run_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([value, run_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_key: str) -> Tuple[Any, int]:
+    value, run_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if sort_key == "start_time" and value is not None:
+        value = datetime.fromisoformat(value)
+    return value, int(run_id)
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _apply_run_data(row: BenchmarkRun, run_data: Dict[str, Any]):
+    """Copy the indexed summary columns from a run document onto a row."""
+    config = run_data.get("config") or {}
+    metrics = run_data.get("metrics") or {}
+    row.name = run_data.get("name")
+    row.model_name = run_data.get("model_name") or metrics.get("model_name")
+    row.provider = metrics.get("provider") or config.get("provider") or "nim"
+    row.quantization = metrics.get("quantization") or config.get("quantization") or "default"
+    row.benchmark_type = run_data.get("benchmark_type") or "throughput"
+    row.status = run_data.get("status", row.status)
+    row.start_time = _parse_time(run_data.get("start_time")) or row.start_time
+    row.end_time = _parse_time(run_data.get("end_time"))
+    row.config = json.dumps(config)
+    row.total_requests = config.get("total_requests", 0)
+    row.successful_requests = metrics.get("successful_requests", 0)
+    row.total_tokens = metrics.get("total_tokens", 0)
+    row.average_tps = metrics.get("tokens_per_second", 0.0)
+    row.peak_tps = metrics.get("peak_tps", 0.0)
+    row.p95_latency = metrics.get("p95_latency", 0.0)
+    row.time_to_first_token = metrics.get("time_to_first_token", 0.0)
+    row.inter_token_latency = metrics.get("inter_token_latency", 0.0)
+    light, series = split_series(run_data)
+    row.data = json.dumps(light)
+    row.series = json.dumps(series) if series else None
+
+
+def _row_to_run(row: BenchmarkRun) -> Dict[str, Any]:
+    if row.data:
+        run = json.loads(row.data)
+        run["id"] = row.id
+        run["status"] = row.status
+        run["is_baseline"] = bool(row.is_baseline)
+        return run
+    return {
+        "id": row.id,
+        "name": row.name,
+        "model_name": row.model_name,
+        "status": row.status,
+        "start_time": row.start_time.isoformat() if row.start_time else None,
+        "end_time": row.end_time.isoformat() if row.end_time else None,
+        "config": json.loads(row.config) if row.config else {},
+        "metrics": {},
+    }
+
+
+class ResultsStore:
+    """Indexed SQLite store for benchmark runs (WAL mode, async access)."""
+
+    async def init(self, legacy_dir: Optional[Path] = None):
+        await init_db()
+        if legacy_dir is not None:
+            await self.import_json_files(legacy_dir)
+
+    async def allocate_run(self, config: Dict[str, Any], start_time: Optional[datetime] = None) -> int:
+        """Atomically reserve a run id by inserting a placeholder row."""
+        async with async_session() as session:
+            row = BenchmarkRun(
+                name=config.get("name"),
+                model_name=config.get("model_name") or config.get("nim_id"),
+                provider=config.get("provider") or "nim",
+                quantization=config.get("quantization") or "default",
+                benchmark_type=config.get("benchmark_type") or "throughput",
+                config=json.dumps(config),
+                status="running",
+                start_time=start_time or datetime.now(),
+                total_requests=config.get("total_requests", 0),
+            )
+            session.add(row)
+            await session.commit()
+            return row.id
+
+    async def save_run(self, run_data: Dict[str, Any], source_file: Optional[Path] = None):
+        async with async_session() as session:
+            row = await session.get(BenchmarkRun, run_data["id"])
+            if row is None:
+                row = BenchmarkRun(id=run_data["id"])
+                session.add(row)
+            _apply_run_data(row, run_data)
+            if source_file is not None:
+                row.source_file = str(source_file)
+            # A saved run has fresh raw samples, e.g. a resumed run that retention had compacted
+            row.retention_tier = "raw"
+            await session.commit()
+
+    async def set_status(self, run_id: int, status: str):
+        async with async_session() as session:
+            row = await session.get(BenchmarkRun, run_id)
+            if row is not None:
+                row.status = status
+                row.end_time = row.end_time or datetime.now()
+                await session.commit()
+
+    async def get_run(self, run_id: int) -> Optional[Dict[str, Any]]:
+        """Return the run document without its heavy series."""
+        async with async_session() as session:
+            row = await session.get(BenchmarkRun, run_id)
+            return _row_to_run(row) if row is not None else None
+
+    async def get_series(self, run_id: int) -> Optional[Dict[str, Any]]:
+        async with async_session() as session:
+            result = await session.execute(
+                select(BenchmarkRun.id, BenchmarkRun.series).where(BenchmarkRun.id == run_id)
+            )
+            row = result.first()
+            if row is None:
+                return None
+            return json.loads(row.series) if row.series else {}
+
+    async def set_baseline(self, run_id: int, enabled: bool = True) -> bool:
+        """Mark a run as the baseline for its model and provider, replacing any previous one."""
+        async with async_session() as session:
+            row = await session.get(BenchmarkRun, run_id)
+            if row is None:
+                return False
+            if enabled:
+                await session.execute(
+                    update(BenchmarkRun)
+                    .where(BenchmarkRun.model_name == row.model_name, BenchmarkRun.provider == row.provider)
+                    .values(is_baseline=False)
+                )
+            row.is_baseline = enabled
+            await session.commit()
+            return True
+
+    async def find_baseline(self, run_id: int) -> Optional[int]:
+        """Id of the baseline run sharing this run's model and provider."""
+        async with async_session() as session:
+            row = await session.get(BenchmarkRun, run_id)
+            if row is None:
+                return None
+            result = await session.execute(
+                select(BenchmarkRun.id)
+                .where(
+                    BenchmarkRun.is_baseline.is_(True),
+                    BenchmarkRun.model_name == row.model_name,
+                    BenchmarkRun.provider == row.provider,
+                    BenchmarkRun.id != run_id,
+                )
+                .order_by(BenchmarkRun.start_time.desc())
+                .limit(1)
+            )
+            return result.scalar_one_or_none()
+
+    async def runs_for_retention(
+        self,
+        tiers: List[str],
+        before: Optional[datetime] = None,
+        limit: int = 50,
+        exclude: Optional[Iterable[int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Oldest finished runs in one of ``tiers``, optionally started before ``before``."""
+        tier_filter = BenchmarkRun.retention_tier.in_(tiers)
+        if "raw" in tiers:
+            # Rows created before the column existed count as raw
+            tier_filter = or_(tier_filter, BenchmarkRun.retention_tier.is_(None))
+        query = (
+            select(BenchmarkRun)
+            .where(tier_filter, BenchmarkRun.status.in_(["completed", "aborted", "failed", "partial"]))
+            .order_by(BenchmarkRun.start_time.asc(), BenchmarkRun.id.asc())
+            .limit(limit)
+        )
+        if before is not None:
+            query = query.where(BenchmarkRun.start_time < before)
+        if exclude:
+            query = query.where(BenchmarkRun.id.notin_(list(exclude)))
+        async with async_session() as session:
+            rows = (await session.execute(query)).scalars().all()
+            return [{**_row_to_run(row), "source_file": row.source_file} for row in rows]
+
+    async def update_retention(
+        self,
+        run_id: int,
+        tier: Optional[str] = None,
+        artifacts: Optional[Dict[str, Any]] = None,
+        series: Optional[Dict[str, Any]] = None,
+        source_file: Optional[str] = None,
+    ):
+        """Record the outcome of a retention step without rewriting summary columns."""
+        async with async_session() as session:
+            row = await session.get(BenchmarkRun, run_id)
+            if row is None:
+                return
+            if tier is not None:
+                row.retention_tier = tier
+            if artifacts is not None and row.data:
+                document = json.loads(row.data)
+                document["artifacts"] = artifacts
+                row.data = json.dumps(document)
+            if series is not None:
+                row.series = json.dumps(series)
+            if source_file is not None:
+                row.source_file = source_file
+            await session.commit()
+
+    async def optimize(self):
+        """Let SQLite refresh planner statistics and fold the WAL back into the database."""
+        async with async_session() as session:
+            await session.execute(text("PRAGMA optimize"))
+            await session.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+
+    async def list_runs(
+        self,
+        model: Optional[str] = None,
+        provider: Optional[str] = None,
+        quantization: Optional[str] = None,
+        benchmark_type: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort: str = "-start_time",
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        fields: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Keyset-paginated listing of run summaries.
+
+        ``sort`` is a key from SORT_KEYS, prefixed with ``-`` for descending order.
+        ``fields`` selects summary columns and optionally document fields; by
+        default only summary columns are returned.
+        """
+        descending = sort.startswith("-")
+        sort_key = sort.lstrip("-")
+        if sort_key not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort_key}")
+        fields = fields or SUMMARY_FIELDS
+        unknown = [f for f in fields if f not in SUMMARY_FIELDS and f not in DOCUMENT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unsupported fields: {', '.join(unknown)}")
+
+        column_names = ["id"] + [f for f in fields if f in SUMMARY_FIELDS and f != "id"]
+        if sort_key not in column_names:
+            column_names.append(sort_key)
+        document_fields = [f for f in fields if f in DOCUMENT_FIELDS]
+        columns = [getattr(BenchmarkRun, name) for name in column_names]
+        if document_fields:
+            columns.append(BenchmarkRun.data)
+
+        sort_column = getattr(BenchmarkRun, sort_key)
+        query = select(*columns)
+        if model:
+            query = query.where(BenchmarkRun.model_name == model)
+        if provider:
+            query = query.where(BenchmarkRun.provider == provider)
+        if quantization:
+            query = query.where(BenchmarkRun.quantization == quantization)
+        if benchmark_type == "throughput":
+            # Rows created before the column existed are throughput runs
+            query = query.where(or_(BenchmarkRun.benchmark_type == benchmark_type, BenchmarkRun.benchmark_type.is_(None)))
+        elif benchmark_type:
+            query = query.where(BenchmarkRun.benchmark_type == benchmark_type)
+        if status:
+            query = query.where(BenchmarkRun.status == status)
+        if since:
+            query = query.where(BenchmarkRun.start_time >= since)
+        if until:
+            query = query.where(BenchmarkRun.start_time < until)
+        # Rows without a sort value (e.g. legacy runs with an unparsable start time) come last in
+        # either direction; comparisons with NULL are never true, so they get their own branch
+        if cursor:
+            value, last_id = decode_cursor(cursor, sort_key)
+            id_after = BenchmarkRun.id < last_id if descending else BenchmarkRun.id > last_id
+            if value is None:
+                query = query.where(sort_column.is_(None), id_after)
+            else:
+                value_after = sort_column < value if descending else sort_column > value
+                query = query.where(or_(value_after, and_(sort_column == value, id_after), sort_column.is_(None)))
+        if descending:
+            query = query.order_by(sort_column.desc().nulls_last(), BenchmarkRun.id.desc())
+        else:
+            query = query.order_by(sort_column.asc().nulls_last(), BenchmarkRun.id.asc())
+        query = query.limit(limit + 1)
+
+        async with async_session() as session:
+            rows = (await session.execute(query)).all()
+
+        items = []
+        for row in rows[:limit]:
+            item = {}
+            for name in column_names:
+                value = getattr(row, name)
+                item[name] = value.isoformat() if isinstance(value, datetime) else value
+            if document_fields:
+                document = json.loads(row.data) if row.data else {}
+                for name in document_fields:
+                    item[name] = document.get(name)
+            items.append(item)
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(getattr(last, sort_key), last.id)
+        return {"items": items, "next_cursor": next_cursor}
+
+    async def import_json_files(self, directory: Path) -> int:
+        """One-time import of legacy benchmarks/benchmark_*.json files."""
+        async with async_session() as session:
+            if await session.get(StoreMeta, LEGACY_IMPORT_KEY) is not None:
+                return 0
+
+            imported = 0
+            deferred = []
+            # First pass keeps legacy ids that are free; second pass renumbers collisions
+            # (ids came from len(history) + 1 and may repeat)
+            for pass_files, keep_ids in ((sorted(Path(directory).glob("benchmark_*.json")), True), (deferred, False)):
+                for file_path in list(pass_files):
+                    try:
+                        with open(file_path, "r") as f:
+                            run_data = json.load(f)
+                    except (OSError, json.JSONDecodeError) as e:
+                        logger.error(f"Skipping unreadable benchmark file {file_path}: {e}")
+                        continue
+
+                    existing = (await session.execute(
+                        select(BenchmarkRun.id).where(BenchmarkRun.source_file == str(file_path))
+                    )).scalar_one_or_none()
+                    if existing is not None:
+                        continue
+
+                    run_id = run_data.get("id")
+                    if keep_ids:
+                        if not isinstance(run_id, int) or await session.get(BenchmarkRun, run_id) is not None:
+                            deferred.append(file_path)
+                            continue
+                        row = BenchmarkRun(id=run_id)
+                    else:
+                        row = BenchmarkRun()
+                    session.add(row)
+                    _apply_run_data(row, run_data)
+                    row.source_file = str(file_path)
+                    await session.flush()
+                    if run_id != row.id:
+                        logger.warning(f"Benchmark id {run_id} from {file_path} is taken, assigned id {row.id}")
+                        run_data["id"] = row.id
+                        _apply_run_data(row, run_data)
+                    imported += 1
+
+            session.add(StoreMeta(key=LEGACY_IMPORT_KEY, value=datetime.now().isoformat()))
+            await session.commit()
+            logger.info(f"Imported {imported} legacy benchmark files into the results store")
+            return imported
+
+
+results_store = ResultsStore()
+
+__all__ = ['results_store', 'ResultsStore']
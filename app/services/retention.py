@@ -0,0 +1,377 @@
+# app/services/retention.py
+import asyncio
+import gzip
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Dict, List, Optional, Set
+import numpy as np
+from ..config import settings
+from ..utils.logger import logger
+from .live_stats import LogHistogram
+from .results_store import results_store
+from .run_journal import RunJournal
+from .sample_archive import SampleArchive
+
+try:
+    import zstandard
+except ImportError:  # Fall back to gzip when zstd bindings are unavailable
+    zstandard = None
+
+# Per-request metrics kept as histograms once raw samples are dropped
+HISTOGRAM_METRICS = ["ttft", "e2e", "tpot", "queue"]
+SUMMARY_PERCENTILES = [50, 90, 95, 99, 99.9]
+COMPRESSED_SUFFIXES = (".zst", ".gz")
+BATCH_SIZE = 20
+# Let startup finish before the first pass competes for disk and the database
+STARTUP_DELAY_SECONDS = 60
+
+
+def compress_file(path: Path) -> Path:
+    """Compress ``path`` with zstd (gzip fallback), remove the original and return the new path."""
+    if zstandard is not None:
+        target = path.with_name(path.name + ".zst")
+        with open(path, "rb") as src, open(target, "wb") as dst:
+            zstandard.ZstdCompressor(level=10).copy_stream(src, dst)
+    else:
+        target = path.with_name(path.name + ".gz")
+        with open(path, "rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+    os.remove(path)
+    return target
+
+
+def histogram_summary(values: np.ndarray) -> Dict[str, Any]:
+    """Sparse log histogram plus exact percentiles computed before raw values are discarded."""
+    values = values[~np.isnan(values)]
+    histogram = LogHistogram()
+    counts = np.bincount(
+        [histogram.bucket_index(v) for v in values.tolist()], minlength=LogHistogram.BUCKETS
+    ) if values.size else np.zeros(LogHistogram.BUCKETS, dtype=np.int64)
+    return {
+        "count": int(values.size),
+        "mean": float(values.mean()) if values.size else None,
+        "percentiles": {
+            f"p{q:g}": float(v) for q, v in zip(SUMMARY_PERCENTILES, np.percentile(values, SUMMARY_PERCENTILES))
+        } if values.size else {},
+        "histogram": {
+            "min": LogHistogram.MIN_VALUE,
+            "growth": LogHistogram.GROWTH,
+            "buckets": {str(i): int(c) for i, c in enumerate(counts) if c},
+        },
+    }
+
+
+def downsample_timeline(timeline: List[Dict[str, Any]], bucket_seconds: float) -> List[Dict[str, Any]]:
+    """Merge fine timeline buckets into ``bucket_seconds`` buckets (sums for counts, means otherwise)."""
+    if len(timeline) < 2:
+        return timeline
+    width = timeline[1]["t"] - timeline[0]["t"]
+    factor = int(round(bucket_seconds / width)) if width > 0 else 1
+    if factor <= 1:
+        return timeline
+    coarse = []
+    for start in range(0, len(timeline), factor):
+        group = timeline[start:start + factor]
+        merged = {"t": group[0]["t"]}
+        for key in group[0]:
+            if key == "t":
+                continue
+            values = [b[key] for b in group if b.get(key) is not None]
+            if key in ("completed_requests", "failed_requests"):
+                merged[key] = sum(values)
+            else:
+                merged[key] = sum(values) / len(values) if values else None
+        coarse.append(merged)
+    return coarse
+
+
+def directory_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+class RetentionEngine:
+    """Background policy that ages stored runs out of full fidelity.
+
+    Recent runs keep raw per-request samples. Older runs are reduced to
+    histograms and a coarse timeline, artifacts are compressed, export caches
+    expire, and the oldest raw data is evicted first when over the disk budget.
+    """
+
+    def __init__(self, benchmark_dir: Path):
+        self.benchmark_dir = Path(benchmark_dir)
+        self._task: Optional[asyncio.Task] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        await asyncio.sleep(STARTUP_DELAY_SECONDS)
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Retention pass failed: {e}")
+            await asyncio.sleep(settings.RETENTION_INTERVAL_SECONDS)
+
+    async def compact_run(self, run: Dict[str, Any]) -> int:
+        """Replace a run's raw samples and fine series with histograms and a coarse timeline.
+
+        Artifacts are compressed too; returns the number of files compressed.
+        """
+        artifacts = dict(run.get("artifacts") or {})
+        series = await results_store.get_series(run["id"]) or {}
+        samples_dir = artifacts.get("samples")
+
+        if samples_dir and (Path(samples_dir) / "meta.json").exists():
+            archive = SampleArchive(samples_dir)
+            ok = archive.mask(status="ok")
+            series["histograms"] = await asyncio.to_thread(
+                lambda: {metric: histogram_summary(np.asarray(archive.metric(metric)[ok])) for metric in HISTOGRAM_METRICS}
+            )
+            series["request_counts"] = {
+                status: int(archive.mask(status=status).sum()) for status in archive.meta["categories"]["status"]
+            }
+            del archive
+            await asyncio.to_thread(shutil.rmtree, samples_dir, True)
+        artifacts["samples"] = None
+
+        # Per-request JSON latencies are superseded by the histograms
+        series.pop("historical", None)
+        series.pop("container_samples", None)
+        series.pop("server_metrics_samples", None)
+        if series.get("timeline"):
+            series["timeline"] = downsample_timeline(series["timeline"], settings.RETENTION_COARSE_BUCKET_SECONDS)
+        await results_store.update_retention(run["id"], tier="compacted", artifacts=artifacts, series=series)
+        return await self.compress_run({**run, "artifacts": artifacts}, tier="compacted")
+
+    async def compress_run(self, run: Dict[str, Any], tier: str = "compressed") -> int:
+        """Compress a run's JSON summary, trace and container log; returns the number of files compressed."""
+        artifacts = dict(run.get("artifacts") or {})
+        compressed = 0
+        # Container logs are usually compressed as they are archived, unless that was turned off
+        for key in ("trace", "container_log"):
+            path = artifacts.get(key)
+            if path and not path.endswith(COMPRESSED_SUFFIXES) and Path(path).exists():
+                artifacts[key] = str(await asyncio.to_thread(compress_file, Path(path)))
+                compressed += 1
+        source_file = run.get("source_file")
+        new_source = None
+        if source_file and not source_file.endswith(COMPRESSED_SUFFIXES) and Path(source_file).exists():
+            new_source = str(await asyncio.to_thread(compress_file, Path(source_file)))
+            compressed += 1
+        await results_store.update_retention(
+            run["id"], tier=tier, artifacts=artifacts if compressed else None, source_file=new_source
+        )
+        return compressed
+
+    async def _batch(
+        self, tiers: List[str], before: Optional[datetime] = None, skip: Optional[Set[int]] = None
+    ) -> List[Dict[str, Any]]:
+        live = await asyncio.to_thread(self._live_journals)
+        return await results_store.runs_for_retention(
+            tiers, before=before, limit=BATCH_SIZE, exclude=live | (skip or set())
+        )
+
+    async def _isolated(
+        self, run: Dict[str, Any], stage: str, work: Awaitable[int], report: Dict[str, Any], skip: Set[int]
+    ) -> Optional[int]:
+        """Await one run's retention step; on failure log it, skip the run for the rest of the pass and return None."""
+        try:
+            return await work
+        except Exception as e:
+            logger.error(f"Retention {stage} of run {run['id']} failed: {e}")
+            skip.add(run["id"])
+            report["runs_failed"] += 1
+            return None
+
+    def _live_journals(self) -> Set[int]:
+        """Runs whose journal is still being written, or was left so by a crash and not yet recovered.
+
+        Journals of runs finalized as ``partial`` do not hold a run back: a resume
+        rebuilds samples and series from the journal and saves the run as raw again.
+        """
+        runs_dir = self.benchmark_dir / "runs"
+        if not runs_dir.exists():
+            return set()
+        live = set()
+        for path in runs_dir.iterdir():
+            run_id = path.name[len("run_"):]
+            if not (path.is_dir() and path.name.startswith("run_") and run_id.isdigit()):
+                continue
+            journal = RunJournal(path)
+            try:
+                status = journal.load_state().get("status") if journal.exists() else None
+            except (OSError, ValueError):
+                status = None
+            if status == "running":
+                live.add(int(run_id))
+        return live
+
+    def _expire_exports(self) -> int:
+        export_dir = self.benchmark_dir / "exports"
+        if not export_dir.exists():
+            return 0
+        cutoff = time.time() - settings.RETENTION_EXPORT_TTL_HOURS * 3600
+        removed = 0
+        for path in export_dir.iterdir():
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    async def _enforce_budget(self, report: Dict[str, Any], skip: Set[int]):
+        budget = int(settings.RETENTION_DISK_BUDGET_GB * 1024 ** 3)
+        usage = await asyncio.to_thread(directory_size, self.benchmark_dir)
+        report["disk_usage_bytes"] = usage
+        if usage <= budget:
+            return
+
+        # Cheapest losses first: export caches, then raw samples, then traces and container logs of the oldest runs
+        export_dir = self.benchmark_dir / "exports"
+        if export_dir.exists():
+            for path in sorted(export_dir.iterdir(), key=lambda p: p.stat().st_mtime):
+                if usage <= budget:
+                    break
+                size = path.stat().st_size
+                path.unlink(missing_ok=True)
+                usage -= size
+                report["exports_removed"] += 1
+
+        async def prune(run: Dict[str, Any]) -> int:
+            nonlocal usage
+            artifacts = dict(run.get("artifacts") or {})
+            trace = artifacts.get("trace")
+            if trace and Path(trace).exists():
+                usage -= Path(trace).stat().st_size
+                Path(trace).unlink()
+                report["traces_removed"] += 1
+            artifacts["trace"] = None
+            container_log = artifacts.get("container_log")
+            if container_log and Path(container_log).exists():
+                usage -= Path(container_log).stat().st_size
+                Path(container_log).unlink()
+                report["container_logs_removed"] += 1
+            artifacts["container_log"] = None
+            await results_store.update_retention(run["id"], tier="pruned", artifacts=artifacts)
+            return 0
+
+        while usage > budget:
+            runs = await self._batch(["raw", "compressed"], skip=skip)
+            if not runs:
+                break
+            for run in runs:
+                if usage <= budget:
+                    break
+                # Count only the raw samples as freed; compression gains are a bonus
+                samples_dir = (run.get("artifacts") or {}).get("samples")
+                freed = directory_size(Path(samples_dir)) if samples_dir and Path(samples_dir).exists() else 0
+                compressed = await self._isolated(run, "compaction", self.compact_run(run), report, skip)
+                if compressed is not None:
+                    report["files_compressed"] += compressed
+                    usage -= freed
+                    report["runs_compacted"] += 1
+
+        while usage > budget:
+            runs = await self._batch(["compacted"], skip=skip)
+            if not runs:
+                break
+            for run in runs:
+                if usage <= budget:
+                    break
+                await self._isolated(run, "pruning", prune(run), report, skip)
+
+        if usage > budget:
+            logger.warning(
+                f"Benchmark data uses {usage / 1024 ** 3:.1f} GB, above the "
+                f"{settings.RETENTION_DISK_BUDGET_GB} GB budget, after evicting all raw data"
+            )
+        report["disk_usage_bytes"] = usage
+
+    async def run_once(self) -> Dict[str, Any]:
+        started = time.monotonic()
+        report = {
+            "started_at": datetime.now().isoformat(),
+            "runs_compacted": 0,
+            "files_compressed": 0,
+            "exports_removed": 0,
+            "traces_removed": 0,
+            "container_logs_removed": 0,
+            "runs_failed": 0,
+        }
+        # Runs whose step failed in this pass; they are retried on the next pass
+        skip: Set[int] = set()
+
+        # Each stage only looks at runs that have not reached it yet, oldest first and in
+        # small batches, so passes stay cheap however much history has accumulated
+        raw_cutoff = datetime.now() - timedelta(days=settings.RETENTION_RAW_DAYS)
+        while True:
+            runs = await self._batch(["raw", "compressed"], before=raw_cutoff, skip=skip)
+            if not runs:
+                break
+            for run in runs:
+                compressed = await self._isolated(run, "compaction", self.compact_run(run), report, skip)
+                if compressed is not None:
+                    report["files_compressed"] += compressed
+                    report["runs_compacted"] += 1
+
+        compress_cutoff = datetime.now() - timedelta(days=settings.RETENTION_COMPRESS_DAYS)
+        while True:
+            runs = await self._batch(["raw"], before=compress_cutoff, skip=skip)
+            if not runs:
+                break
+            for run in runs:
+                report["files_compressed"] += await self._isolated(
+                    run, "compression", self.compress_run(run), report, skip
+                ) or 0
+
+        report["exports_removed"] += await asyncio.to_thread(self._expire_exports)
+        await self._enforce_budget(report, skip)
+        await results_store.optimize()
+
+        report["duration_seconds"] = time.monotonic() - started
+        self.last_report = report
+        logger.info(
+            f"Retention pass: {report['runs_compacted']} runs compacted, "
+            f"{report['files_compressed']} files compressed, {report['exports_removed']} exports removed"
+            + (f", {report['runs_failed']} runs failed" if report["runs_failed"] else "")
+        )
+        return report
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "policy": {
+                "raw_days": settings.RETENTION_RAW_DAYS,
+                "compress_days": settings.RETENTION_COMPRESS_DAYS,
+                "export_ttl_hours": settings.RETENTION_EXPORT_TTL_HOURS,
+                "disk_budget_gb": settings.RETENTION_DISK_BUDGET_GB,
+                "coarse_bucket_seconds": settings.RETENTION_COARSE_BUCKET_SECONDS,
+                "interval_seconds": settings.RETENTION_INTERVAL_SECONDS,
+                "compression": "zstd" if zstandard is not None else "gzip",
+            },
+            "running": self._task is not None and not self._task.done(),
+            "last_report": self.last_report,
+        }
+
+
+__all__ = ['RetentionEngine', 'compress_file', 'downsample_timeline']
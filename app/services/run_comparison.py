@@ -0,0 +1,223 @@
+# app/services/run_comparison.py
+import math
+from typing import Any, Dict, List, Optional
+import numpy as np
+from .sample_archive import SampleArchive
+
+# Latency metrics compared per percentile; lower is better
+LATENCY_METRICS = ["ttft", "e2e", "tpot"]
+DEFAULT_QUANTILES = [50, 95, 99]
+# Maximum tolerated relative degradation in percent, keyed "tps" or "<metric>_p<q>";
+# "error_rate" is the tolerated increase of the failed request share in percentage points
+DEFAULT_THRESHOLDS = {"tps": 3.0, "ttft_p95": 5.0, "e2e_p95": 5.0, "tpot_p95": 5.0, "error_rate": 1.0}
+# Overall verdicts, most severe first; a comparison reports the most severe of its metrics
+VERDICTS = ["regression", "inconclusive", "insufficient_data", "improvement", "no_change"]
+# Bound on resampled values held in memory at once
+BOOTSTRAP_CHUNK_ELEMENTS = 5_000_000
+
+
+def _bootstrap(values: np.ndarray, statistic, n_boot: int, rng: np.random.Generator, weights=None) -> np.ndarray:
+    """Vectorized bootstrap: resample rows of indices in chunks and apply ``statistic`` along axis 1."""
+    n = values.size
+    chunk = max(BOOTSTRAP_CHUNK_ELEMENTS // max(n, 1), 1)
+    results = []
+    for start in range(0, n_boot, chunk):
+        idx = rng.integers(0, n, size=(min(chunk, n_boot - start), n))
+        results.append(statistic(values[idx], weights[idx] if weights is not None else None))
+    return np.concatenate(results)
+
+
+def _percentile_stat(q: float):
+    return lambda sample, _: np.percentile(sample, q, axis=1)
+
+
+def _throughput_stat(latency: np.ndarray, tokens: np.ndarray) -> np.ndarray:
+    # Same estimator as the run summary: total tokens over summed request latency
+    return tokens.sum(axis=1) / latency.sum(axis=1)
+
+
+def _rank(values: np.ndarray) -> np.ndarray:
+    """Ranks with ties averaged (1-based)."""
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    upper = np.cumsum(counts)
+    return ((upper - counts + 1 + upper) / 2.0)[inverse]
+
+
+def mann_whitney_u(a: np.ndarray, b: np.ndarray) -> Dict[str, Optional[float]]:
+    """Two-sided Mann-Whitney U test using the tie-corrected normal approximation."""
+    n1, n2 = a.size, b.size
+    if not n1 or not n2:
+        return {"u": None, "p_value": None}
+    combined = np.concatenate([a, b])
+    ranks = _rank(combined)
+    u1 = ranks[:n1].sum() - n1 * (n1 + 1) / 2.0
+    n = n1 + n2
+    _, counts = np.unique(combined, return_counts=True)
+    tie_term = (counts ** 3 - counts).sum() / (n * (n - 1)) if n > 1 else 0.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term)
+    if variance <= 0:
+        return {"u": float(u1), "p_value": 1.0}
+    z = (u1 - n1 * n2 / 2.0) / math.sqrt(variance)
+    return {"u": float(u1), "p_value": float(math.erfc(abs(z) / math.sqrt(2)))}
+
+
+def _delta(base: float, candidate: float, base_boot: np.ndarray, cand_boot: np.ndarray, alpha: float) -> Dict[str, Any]:
+    rel = (cand_boot - base_boot) / base_boot * 100.0
+    rel = rel[np.isfinite(rel)]
+    low, high = (np.percentile(rel, [alpha / 2 * 100, (1 - alpha / 2) * 100]) if rel.size else (np.nan, np.nan))
+    # Bootstrap two-sided p-value for "no change"
+    p_boot = float(min(1.0, 2 * min((rel <= 0).mean(), (rel >= 0).mean()))) if rel.size else None
+    return {
+        "baseline": float(base),
+        "candidate": float(candidate),
+        "delta": float(candidate - base),
+        "delta_pct": float((candidate - base) / base * 100.0) if base else None,
+        "ci_pct": [float(low), float(high)],
+        "bootstrap_p_value": p_boot,
+    }
+
+
+def _verdict(stat: Dict[str, Any], threshold: Optional[float], higher_is_better: bool) -> str:
+    """Regression only when the change exceeds the threshold and its CI excludes zero.
+
+    Metrics without a threshold are informational: ``changed`` or ``no_change``.
+    """
+    low, high = stat["ci_pct"]
+    if stat["delta_pct"] is None or math.isnan(low):
+        return "insufficient_data"
+    # Re-express as degradation (positive = worse) whichever direction is better
+    sign = -1 if higher_is_better else 1
+    degradation = sign * stat["delta_pct"]
+    ci_low, ci_high = sorted((sign * low, sign * high))
+    significant = ci_low > 0 or ci_high < 0
+    if threshold is None:
+        return "changed" if significant else "no_change"
+    if degradation > threshold:
+        return "regression" if ci_low > 0 else "inconclusive"
+    if -degradation > threshold and ci_high < 0:
+        return "improvement"
+    return "no_change"
+
+
+def _error_rate(base_failed: int, base_total: int, cand_failed: int, cand_total: int, threshold: Optional[float],
+                alpha: float) -> Dict[str, Any]:
+    """Change in the share of failed requests, in percentage points, with a two-proportion z-test."""
+    base_rate, cand_rate = base_failed / base_total * 100.0, cand_failed / cand_total * 100.0
+    pooled = (base_failed + cand_failed) / (base_total + cand_total)
+    se = math.sqrt(pooled * (1 - pooled) * (1 / base_total + 1 / cand_total))
+    p_value = float(math.erfc(abs(cand_rate - base_rate) / 100.0 / se / math.sqrt(2))) if se else 1.0
+    significant = p_value < alpha
+    increase = cand_rate - base_rate
+    if threshold is None:
+        verdict = "changed" if significant and increase else "no_change"
+    elif increase > threshold:
+        verdict = "regression" if significant else "inconclusive"
+    elif -increase > threshold and significant:
+        verdict = "improvement"
+    else:
+        verdict = "no_change"
+    return {
+        "baseline": base_rate,
+        "candidate": cand_rate,
+        "delta": increase,
+        "failed": {"baseline": base_failed, "candidate": cand_failed},
+        "p_value": p_value,
+        "verdict": verdict,
+    }
+
+
+def overall_verdict(verdicts: List[str]) -> str:
+    """Most severe of the given verdicts; informational ``changed`` counts as ``no_change``."""
+    for verdict in VERDICTS:
+        if verdict in verdicts:
+            return verdict
+    return "no_change"
+
+
+def compare_archives(
+    baseline: SampleArchive,
+    candidate: SampleArchive,
+    metrics: Optional[List[str]] = None,
+    quantiles: Optional[List[float]] = None,
+    thresholds: Optional[Dict[str, float]] = None,
+    n_boot: int = 1000,
+    confidence: float = 0.95,
+    seed: Optional[int] = 0,
+) -> Dict[str, Any]:
+    """Compare a candidate run's successful requests against a baseline run.
+
+    Failed requests are compared as their share of all requests. A run without
+    any successful request cannot be compared on latency or throughput, so the
+    verdict is then ``insufficient_data`` unless the error rate already shows a
+    regression.
+    """
+    metrics = metrics or LATENCY_METRICS
+    unknown = [m for m in metrics if m not in LATENCY_METRICS]
+    if unknown:
+        raise ValueError(f"Unsupported comparison metrics: {', '.join(unknown)}")
+    quantiles = quantiles or DEFAULT_QUANTILES
+    thresholds = DEFAULT_THRESHOLDS if thresholds is None else thresholds
+    alpha = 1 - confidence
+    rng = np.random.default_rng(seed)
+    results: Dict[str, Any] = {}
+
+    base_ok, cand_ok = baseline.mask(status="ok"), candidate.mask(status="ok")
+    if baseline.count and candidate.count:
+        results["error_rate"] = _error_rate(
+            baseline.count - int(base_ok.sum()), baseline.count,
+            candidate.count - int(cand_ok.sum()), candidate.count,
+            thresholds.get("error_rate"), alpha,
+        )
+    base_e2e, cand_e2e = baseline.metric("e2e")[base_ok], candidate.metric("e2e")[cand_ok]
+    base_tokens = baseline.metric("output_tokens")[base_ok]
+    cand_tokens = candidate.metric("output_tokens")[cand_ok]
+    if base_e2e.size and cand_e2e.size:
+        stat = _delta(
+            base_tokens.sum() / base_e2e.sum(),
+            cand_tokens.sum() / cand_e2e.sum(),
+            _bootstrap(base_e2e, _throughput_stat, n_boot, rng, base_tokens),
+            _bootstrap(cand_e2e, _throughput_stat, n_boot, rng, cand_tokens),
+            alpha,
+        )
+        stat["verdict"] = _verdict(stat, thresholds.get("tps"), True)
+        results["tps"] = stat
+
+    for metric in metrics:
+        base_values = baseline.metric(metric)[base_ok]
+        cand_values = candidate.metric(metric)[cand_ok]
+        base_values = np.asarray(base_values[~np.isnan(base_values)])
+        cand_values = np.asarray(cand_values[~np.isnan(cand_values)])
+        if not base_values.size or not cand_values.size:
+            continue
+        test = mann_whitney_u(base_values, cand_values)
+        for q in quantiles:
+            key = f"{metric}_p{q:g}"
+            stat = _delta(
+                np.percentile(base_values, q),
+                np.percentile(cand_values, q),
+                _bootstrap(base_values, _percentile_stat(q), n_boot, rng),
+                _bootstrap(cand_values, _percentile_stat(q), n_boot, rng),
+                alpha,
+            )
+            # The rank test compares whole distributions; percentiles use the bootstrap
+            stat["mann_whitney"] = test
+            stat["verdict"] = _verdict(stat, thresholds.get(key), False)
+            results[key] = stat
+
+    verdicts = [r["verdict"] for r in results.values()]
+    if not base_ok.any() or not cand_ok.any():
+        verdicts.append("insufficient_data")
+    overall = overall_verdict(verdicts)
+
+    return {
+        "samples": {"baseline": int(base_ok.sum()), "candidate": int(cand_ok.sum())},
+        "requests": {"baseline": baseline.count, "candidate": candidate.count},
+        "confidence": confidence,
+        "bootstrap_samples": n_boot,
+        "thresholds": thresholds,
+        "metrics": results,
+        "verdict": overall,
+    }
+
+
+__all__ = ['compare_archives', 'overall_verdict', 'mann_whitney_u', 'DEFAULT_THRESHOLDS', 'LATENCY_METRICS', 'VERDICTS']
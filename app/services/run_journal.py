@@ -0,0 +1,154 @@
+# app/services/run_journal.py
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from .telemetry_timeline import RequestEvent
+from ..utils.logger import logger
+
+# Journal fields, in RequestEvent order; times are seconds from the run origin
+RECORD_FIELDS = [
+    "scheduled", "sent", "first_token", "end", "output_tokens", "status",
+    "prompt_tokens", "endpoint", "workload", "index", "chunks",
+]
+TIME_FIELDS = ("scheduled", "sent", "first_token", "end")
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class RunJournal:
+    """Append-only per-run request log plus a small state document.
+
+    Finished requests are buffered and flushed (with fsync) every
+    ``flush_interval`` seconds or ``flush_records`` records, so a crash loses at
+    most one flush window and memory does not grow with run length.
+    """
+
+    def __init__(self, directory: Path, flush_interval: float = 2.0, flush_records: int = 512):
+        self.directory = Path(directory)
+        self.requests_path = self.directory / "requests.ndjson"
+        self.state_path = self.directory / "state.json"
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+        self.count = 0
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self._file = None
+        self.state: Dict[str, Any] = {}
+
+    def exists(self) -> bool:
+        return self.state_path.exists()
+
+    def open(self, state: Optional[Dict[str, Any]] = None):
+        """Create a journal with ``state``, or reopen an existing one for appending."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if state is not None:
+            self.state = state
+            _write_json_atomic(self.state_path, self.state)
+        self.load()
+        self._file = open(self.requests_path, "a")
+
+    def load(self):
+        """Read state and count flushed records of an existing journal, e.g. after a crash."""
+        if self.exists():
+            self.state = self.load_state()
+        if self.requests_path.exists():
+            self._truncate_partial_line()
+            self.count = sum(1 for _ in self.iter_records())
+
+    def load_state(self) -> Dict[str, Any]:
+        with open(self.state_path, "r") as f:
+            return json.load(f)
+
+    def update_state(self, **changes):
+        self.state.update(changes)
+        _write_json_atomic(self.state_path, self.state)
+
+    def _truncate_partial_line(self):
+        # A crash mid-write can leave a torn last line; drop it before appending
+        with open(self.requests_path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if not size:
+                return
+            f.seek(max(size - 1, 0))
+            if f.read(1) == b"\n":
+                return
+            position = size
+            while position > 0:
+                step = min(4096, position)
+                position -= step
+                f.seek(position)
+                chunk = f.read(step)
+                newline = chunk.rfind(b"\n")
+                if newline != -1:
+                    f.truncate(position + newline + 1)
+                    return
+            f.truncate(0)
+
+    def append(self, event: RequestEvent, origin: float):
+        record = {}
+        for name in RECORD_FIELDS:
+            value = getattr(event, name)
+            if name in TIME_FIELDS and value is not None:
+                value = round(value - origin, 6)
+            record[name] = value
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+        self.count += 1
+        if len(self._buffer) >= self.flush_records or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self._file is None:
+            return
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
+        self.state["last_flush_at"] = datetime.now().isoformat()
+        self.state["records"] = self.count
+        _write_json_atomic(self.state_path, self.state)
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Flushed records in append order; a torn trailing line is skipped."""
+        if not self.requests_path.exists():
+            return
+        with open(self.requests_path, "r") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt journal record {self.requests_path}:{line_number}")
+
+    def iter_events(self, origin: float = 0.0) -> Iterator[RequestEvent]:
+        for record in self.iter_records():
+            values = []
+            for name in RECORD_FIELDS:
+                value = record.get(name)
+                if name in TIME_FIELDS and value is not None:
+                    value += origin
+                values.append(value)
+            yield RequestEvent(*values)
+
+
+__all__ = ['RunJournal']
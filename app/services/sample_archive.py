@@ -0,0 +1,257 @@
+# app/services/sample_archive.py
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+from .telemetry_timeline import RequestEvent
+
+ARCHIVE_VERSION = 1
+
+# Column name -> dtype; times are seconds relative to the run origin (NaN when absent)
+COLUMNS = {
+    "scheduled": np.float64,
+    "sent": np.float64,
+    "first_token": np.float64,
+    "last_token": np.float64,
+    "prompt_tokens": np.int32,
+    "output_tokens": np.int32,
+    # Streamed chunks received; inter-chunk latency is decode time over (chunks - 1)
+    "chunks": np.int32,
+    "status": np.uint8,
+    "endpoint": np.uint16,
+    "workload": np.uint16,
+}
+# Categorical columns are stored as codes into the lists kept in meta.json
+CATEGORICAL = ["status", "endpoint", "workload"]
+
+# Per-request metrics derived from the raw columns
+METRICS = ["ttft", "e2e", "queue", "tpot", "decode", "prompt_tokens", "output_tokens"]
+# Upper bound on rebucket output; each bucket is a Python dict
+MAX_BUCKETS = 10_000
+
+
+def write_archive(
+    directory: Path, requests: Iterable[RequestEvent], origin: float, count: Optional[int] = None
+) -> Path:
+    """Write per-request records as one ``.npy`` file per column plus ``meta.json``.
+
+    Plain ``.npy`` files (rather than a compressed container) keep every column
+    memory-mappable, so analysis never has to load a whole run. Columns are
+    filled through memory maps, so ``requests`` may be a stream of ``count`` events.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    categories: Dict[str, List[str]] = {name: [] for name in CATEGORICAL}
+
+    def code(name: str, value: str) -> int:
+        values = categories[name]
+        if value not in values:
+            values.append(value)
+        return values.index(value)
+
+    n = len(requests) if count is None else count
+    columns = {
+        name: np.lib.format.open_memmap(directory / f"{name}.npy", mode="w+", dtype=dtype, shape=(n,))
+        if n else np.empty(0, dtype=dtype)
+        for name, dtype in COLUMNS.items()
+    }
+    written = 0
+    for i, r in enumerate(requests):
+        if i >= n:
+            break
+        columns["scheduled"][i] = r.scheduled - origin
+        columns["sent"][i] = r.sent - origin
+        columns["first_token"][i] = r.first_token - origin if r.first_token is not None else np.nan
+        columns["last_token"][i] = r.end - origin
+        columns["prompt_tokens"][i] = r.prompt_tokens
+        columns["output_tokens"][i] = r.output_tokens
+        columns["chunks"][i] = r.chunks
+        columns["status"][i] = code("status", r.status)
+        columns["endpoint"][i] = code("endpoint", r.endpoint)
+        columns["workload"][i] = code("workload", r.workload)
+        written += 1
+
+    for name, values in columns.items():
+        if n:
+            values.flush()
+        else:
+            np.save(directory / f"{name}.npy", values)
+    columns.clear()
+    with open(directory / "meta.json", "w") as f:
+        json.dump({
+            "version": ARCHIVE_VERSION,
+            # Fewer events than announced (e.g. a torn journal) leaves trailing rows unused
+            "count": written,
+            "columns": {name: np.dtype(dtype).name for name, dtype in COLUMNS.items()},
+            "categories": categories,
+        }, f, indent=2)
+    return directory
+
+
+class SampleArchive:
+    """Read-only view over a run's per-request columns, memory-mapped on demand."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        with open(self.directory / "meta.json", "r") as f:
+            self.meta = json.load(f)
+        self._columns: Dict[str, np.ndarray] = {}
+
+    @property
+    def count(self) -> int:
+        return self.meta["count"]
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in COLUMNS:
+            raise ValueError(f"Unknown column: {name}")
+        if name not in self._columns:
+            path = self.directory / f"{name}.npy"
+            if not path.exists():
+                # Column added after this archive was written
+                self._columns[name] = np.zeros(self.count, dtype=COLUMNS[name])
+            elif not self.count:
+                # Empty arrays cannot be memory-mapped
+                self._columns[name] = np.load(path)[:0]
+            else:
+                self._columns[name] = np.load(path, mmap_mode="r")[:self.count]
+        return self._columns[name]
+
+    def metric(self, name: str) -> np.ndarray:
+        """Derived per-request metric in seconds (token counts for *_tokens)."""
+        if name == "ttft":
+            return self.column("first_token") - self.column("sent")
+        if name == "e2e":
+            return self.column("last_token") - self.column("sent")
+        if name == "queue":
+            return self.column("sent") - self.column("scheduled")
+        if name == "decode":
+            return self.column("last_token") - self.column("first_token")
+        if name == "tpot":
+            steps = self.column("output_tokens").astype(np.float64) - 1
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(steps > 0, self.metric("decode") / steps, np.nan)
+        if name in ("prompt_tokens", "output_tokens"):
+            return self.column(name).astype(np.float64)
+        raise ValueError(f"Unknown metric: {name}")
+
+    def _code(self, name: str, value: str) -> Optional[int]:
+        values = self.meta["categories"][name]
+        return values.index(value) if value in values else None
+
+    def mask(
+        self,
+        status: Optional[str] = "ok",
+        endpoint: Optional[str] = None,
+        workload: Optional[str] = None,
+    ) -> np.ndarray:
+        selected = np.ones(self.count, dtype=bool)
+        for name, value in (("status", status), ("endpoint", endpoint), ("workload", workload)):
+            if value is None:
+                continue
+            code = self._code(name, value)
+            if code is None:
+                return np.zeros(self.count, dtype=bool)
+            selected &= self.column(name) == code
+        return selected
+
+    def percentiles(self, metric: str, quantiles: List[float], **filters) -> Dict[str, Any]:
+        """Exact percentiles (0-100) of a metric over the selected requests."""
+        values = self.metric(metric)[self.mask(**filters)]
+        values = values[~np.isnan(values)]
+        result = {"metric": metric, "count": int(values.size)}
+        if values.size:
+            result["mean"] = float(values.mean())
+            result["percentiles"] = {
+                f"p{q:g}": float(v) for q, v in zip(quantiles, np.percentile(values, quantiles))
+            }
+        else:
+            result["mean"] = None
+            result["percentiles"] = {f"p{q:g}": None for q in quantiles}
+        return result
+
+    def rebucket(
+        self,
+        bucket_seconds: float,
+        metric: str = "e2e",
+        quantiles: Optional[List[float]] = None,
+        **filters,
+    ) -> List[Dict[str, Any]]:
+        """Re-aggregate requests into fixed buckets by completion time."""
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive")
+        quantiles = quantiles or [50, 95, 99]
+        selected = self.mask(**filters)
+        end = self.column("last_token")[selected]
+        if not end.size:
+            return []
+        values = self.metric(metric)[selected]
+        tokens = self.column("output_tokens")[selected]
+        count = int(np.floor(max(float(end.max()), 0.0) / bucket_seconds)) + 1
+        if count > MAX_BUCKETS:
+            raise ValueError(
+                f"bucket_seconds={bucket_seconds:g} gives {count} buckets; "
+                f"at most {MAX_BUCKETS} are allowed, use a larger bucket_seconds"
+            )
+        index = np.floor(np.maximum(end, 0) / bucket_seconds).astype(np.int64)
+        completed = np.bincount(index, minlength=count)
+        token_sums = np.bincount(index, weights=tokens, minlength=count)
+
+        # Group values by bucket with one sort instead of a Python loop over requests
+        order = np.argsort(index, kind="stable")
+        boundaries = np.searchsorted(index[order], np.arange(count + 1))
+        buckets = []
+        for i in range(count):
+            group = values[order[boundaries[i]:boundaries[i + 1]]]
+            group = group[~np.isnan(group)]
+            buckets.append({
+                "t": i * bucket_seconds,
+                "completed_requests": int(completed[i]),
+                "tokens_per_second": float(token_sums[i] / bucket_seconds),
+                "percentiles": {
+                    f"p{q:g}": float(v) if group.size else None
+                    for q, v in zip(quantiles, np.percentile(group, quantiles) if group.size else quantiles)
+                },
+            })
+        return buckets
+
+    def summary(self) -> Dict[str, Any]:
+        """Run-level request metrics, as reported in a run's ``metrics``."""
+        ok = self.mask(status="ok")
+        e2e = np.asarray(self.metric("e2e")[ok])
+        ttft = np.asarray(self.metric("ttft")[ok])
+        ttft = ttft[~np.isnan(ttft)]
+        tokens = self.column("output_tokens")[ok].astype(np.float64)
+        total_tokens = int(tokens.sum())
+        total_latency = float(e2e.sum())
+
+        # Mean gap between streamed chunks across all requests
+        chunks = self.column("chunks")[ok].astype(np.float64)
+        decode = np.asarray(self.metric("decode")[ok])
+        streamed = (chunks > 1) & ~np.isnan(decode)
+        gaps = (chunks[streamed] - 1).sum()
+
+        # Peak of the cumulative throughput, tokens completed so far over elapsed time
+        end = np.asarray(self.column("last_token")[ok])
+        order = np.argsort(end, kind="stable")
+        elapsed = end[order]
+        cumulative = np.cumsum(tokens[order])
+        positive = elapsed > 0
+        return {
+            "successful_requests": int(ok.sum()),
+            "failed_requests": int(self.count - ok.sum()),
+            "total_tokens": total_tokens,
+            "tokens_per_second": total_tokens / total_latency if total_latency > 0 else 0,
+            "peak_tps": float((cumulative[positive] / elapsed[positive]).max()) if positive.any() else 0.0,
+            "latency": float(e2e.mean()) if e2e.size else 0,
+            "p95_latency": float(np.percentile(e2e, 95)) if e2e.size else 0,
+            "time_to_first_token": float(ttft.mean()) if ttft.size else 0,
+            "prefill_latency": float(ttft.mean()) if ttft.size else 0,
+            "inter_token_latency": float(decode[streamed].sum() / gaps) if gaps else 0,
+            "total_completion_time": float(e2e.mean()) if e2e.size else 0,
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        return {**self.meta, "metrics": METRICS}
+
+
+__all__ = ['SampleArchive', 'write_archive', 'COLUMNS', 'METRICS', 'MAX_BUCKETS']
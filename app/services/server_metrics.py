@@ -0,0 +1,202 @@
+# app/services/server_metrics.py
+import asyncio
+import math
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import aiohttp
+from ..utils.logger import logger
+
+# Series recorded by default, each from the first metric family the server exposes.
+# vLLM prefixes its families with "vllm:", NIM exposes the same names without a prefix.
+DEFAULT_SERIES = {
+    "requests_running": ("num_requests_running",),
+    "requests_waiting": ("num_requests_waiting",),
+    "requests_swapped": ("num_requests_swapped",),
+    # Fraction of KV cache blocks in use, 0 to 1
+    "kv_cache_usage": ("gpu_cache_usage_perc", "kv_cache_usage_perc"),
+    "prefix_cache_hit_rate": ("gpu_prefix_cache_hit_rate",),
+    # Counters; newer vLLM reports prefix cache hits as these instead of a hit rate
+    "prefix_cache_queries": ("prefix_cache_queries_total", "gpu_prefix_cache_queries_total"),
+    "prefix_cache_hits": ("prefix_cache_hits_total", "gpu_prefix_cache_hits_total"),
+    "preemptions": ("num_preemptions_total",),
+}
+COUNTER_SUFFIX = "_total"
+_SAMPLE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)(?:\s+-?\d+)?$")
+_LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def metric_name(line: str) -> Optional[str]:
+    """Name of the metric a sample line is for, without parsing the rest; None for comments."""
+    if not line or line[0] == "#":
+        return None
+    return line.split("{", 1)[0].split(" ", 1)[0]
+
+
+def parse_sample(line: str) -> Optional[Tuple[str, Dict[str, str], float]]:
+    """Parse one line of the Prometheus text exposition format into (name, labels, value)."""
+    match = _SAMPLE.match(line.strip())
+    if match is None:
+        return None
+    name, labels, value = match.groups()
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return name, dict(_LABEL.findall(labels or "")), number
+
+
+def _base_name(name: str) -> str:
+    return name.rsplit(":", 1)[-1]
+
+
+class ServerMetricsScraper:
+    """Scrapes an inference server's Prometheus ``/metrics`` endpoint during a run.
+
+    The response is parsed line by line as it arrives and only the selected
+    families are kept, so the large latency histograms vLLM exports cost only a
+    name check per line. Samples are summed over label sets (e.g. several
+    engines) and stamped with ``time.monotonic()`` to line up with the run
+    timeline.
+    """
+
+    def __init__(self, url: str, interval: float = 1.0, extra_series: Optional[Iterable[str]] = None):
+        self.url = url
+        self.interval = interval
+        self.series: Dict[str, Tuple[str, ...]] = dict(DEFAULT_SERIES)
+        for name in extra_series or []:
+            # Extra series are recorded under the family name they were given as
+            self.series[name] = (name,)
+        self._lookup: Dict[str, str] = {}
+        for series, families in self.series.items():
+            for family in families:
+                self._lookup.setdefault(family, series)
+        self.samples: List[Tuple[float, Dict[str, float]]] = []
+        self.scrapes = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def scrape(self, session: aiohttp.ClientSession) -> Dict[str, float]:
+        values: Dict[str, float] = {}
+        # A family found under several names (vLLM versions renamed some) is taken from the first
+        family_of: Dict[str, str] = {}
+        async with session.get(self.url) as response:
+            response.raise_for_status()
+            async for raw in response.content:
+                line = raw.decode("utf-8", "replace")
+                name = metric_name(line)
+                if name is None:
+                    continue
+                family = name if name in self._lookup else _base_name(name)
+                series = self._lookup.get(family)
+                if series is None or family_of.setdefault(series, family) != family:
+                    continue
+                parsed = parse_sample(line)
+                if parsed is None or math.isnan(parsed[2]):
+                    continue
+                values[series] = values.get(series, 0.0) + parsed[2]
+        return values
+
+    async def _run(self):
+        timeout = aiohttp.ClientTimeout(total=max(self.interval * 2, 5.0))
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            while True:
+                started = time.monotonic()
+                try:
+                    values = await self.scrape(session)
+                    self.samples.append(((started + time.monotonic()) / 2, values))
+                    self.scrapes += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.errors += 1
+                    if self.last_error is None:
+                        logger.warning(f"Scraping server metrics from {self.url} failed: {e}")
+                    self.last_error = str(e)
+                    if isinstance(e, aiohttp.ClientResponseError) and e.status == 404 and not self.scrapes:
+                        logger.info(f"{self.url} is not served; server metrics are not recorded for this run")
+                        return
+                await asyncio.sleep(max(self.interval - (time.monotonic() - started), 0.0))
+
+    def summary(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+        """Summarize samples within [start, end] (monotonic seconds); counters report their increase."""
+        samples = [
+            (t, values) for t, values in self.samples
+            if (start is None or t >= start) and (end is None or t <= end)
+        ]
+        report: Dict[str, Any] = {
+            "url": self.url,
+            "interval_seconds": self.interval,
+            "scrapes": self.scrapes,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "sample_count": len(samples),
+            "series": {},
+            "samples": [],
+        }
+        if not samples:
+            return report
+        origin = start if start is not None else samples[0][0]
+        names = sorted({name for _, values in samples for name in values})
+        for name in names:
+            points = [values[name] for _, values in samples if name in values]
+            if self._is_counter(name):
+                report["series"][name] = {"increase": max(points[-1] - points[0], 0.0)}
+            else:
+                report["series"][name] = {
+                    "mean": sum(points) / len(points),
+                    "max": max(points),
+                    "last": points[-1],
+                }
+        series = report["series"]
+        queries = series.get("prefix_cache_queries", {}).get("increase")
+        if "prefix_cache_hit_rate" not in series and queries and "prefix_cache_hits" in series:
+            series["prefix_cache_hit_rate"] = {"mean": series["prefix_cache_hits"]["increase"] / queries}
+        report["samples"] = [{"t": t - origin, **values} for t, values in samples]
+        return report
+
+    def buckets(self, origin: float, bucket_seconds: float, count: int) -> List[Dict[str, Optional[float]]]:
+        """Per-bucket ``server_<series>`` columns for ``TelemetryTimeline.buckets``.
+
+        Gauges are averaged; counters become rates per second, so coarser
+        buckets can average them as well.
+        """
+        names = sorted({name for _, values in self.samples for name in values})
+        sums: List[Dict[str, float]] = [{} for _ in range(count)]
+        counts: List[Dict[str, int]] = [{} for _ in range(count)]
+        previous: Dict[str, float] = {}
+        for t, values in self.samples:
+            i = int((t - origin) // bucket_seconds)
+            for name, value in values.items():
+                if self._is_counter(name):
+                    last, previous[name] = previous.get(name), value
+                    if last is None or not 0 <= i < count:
+                        continue
+                    sums[i][name] = sums[i].get(name, 0.0) + max(value - last, 0.0) / bucket_seconds
+                    counts[i][name] = 1
+                elif 0 <= i < count:
+                    sums[i][name] = sums[i].get(name, 0.0) + value
+                    counts[i][name] = counts[i].get(name, 0) + 1
+        return [
+            {f"server_{name}": sums[i][name] / counts[i][name] if name in sums[i] else None for name in names}
+            for i in range(count)
+        ]
+
+    def _is_counter(self, name: str) -> bool:
+        return any(family.endswith(COUNTER_SUFFIX) for family in self.series.get(name, (name,)))
+
+
+__all__ = ['ServerMetricsScraper', 'parse_sample', 'DEFAULT_SERIES']
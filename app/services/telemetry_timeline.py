@@ -0,0 +1,217 @@
+# app/services/telemetry_timeline.py
+import heapq
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+from ..utils.gpu_sampler import GpuSampler
+
+
+@dataclass
+class RequestEvent:
+    scheduled: float
+    sent: float
+    first_token: Optional[float]
+    end: float
+    output_tokens: int
+    status: str
+    prompt_tokens: int = 0
+    endpoint: str = ""
+    workload: str = "default"
+    index: int = -1
+    chunks: int = 0
+
+
+class TelemetryTimeline:
+    """Joins request events and GPU samples recorded on the monotonic clock."""
+
+    def __init__(self, gpu_sampler: Optional[GpuSampler] = None, origin: Optional[float] = None, sink=None):
+        self.gpu_sampler = gpu_sampler
+        self.origin = origin if origin is not None else time.monotonic()
+        # With a sink (RunJournal) events go to disk instead of accumulating in memory
+        self.sink = sink
+        self.requests: List[RequestEvent] = []
+        # Optional ServerMetricsScraper whose samples are bucketed with the requests
+        self.server_metrics = None
+
+    @staticmethod
+    def clock() -> float:
+        return time.monotonic()
+
+    def record_request(
+        self,
+        scheduled: float,
+        sent: float,
+        first_token: Optional[float],
+        end: float,
+        output_tokens: int,
+        status: str = "ok",
+        prompt_tokens: int = 0,
+        endpoint: str = "",
+        workload: str = "default",
+        index: int = -1,
+        chunks: int = 0,
+    ):
+        event = RequestEvent(
+            scheduled, sent, first_token, end, output_tokens, status, prompt_tokens, endpoint, workload, index, chunks
+        )
+        if self.sink is not None:
+            self.sink.append(event, self.origin)
+        else:
+            self.requests.append(event)
+
+    @property
+    def count(self) -> int:
+        return self.sink.count if self.sink is not None else len(self.requests)
+
+    def events(self) -> Iterator[RequestEvent]:
+        """All recorded requests; re-reads the sink on each call."""
+        if self.sink is not None:
+            self.sink.flush()
+            return self.sink.iter_events(self.origin)
+        return iter(self.requests)
+
+    def _end_time(self, requests_end: float) -> float:
+        end = requests_end
+        if self.gpu_sampler:
+            end = max([end] + [series.t[-1] for series in self.gpu_sampler.series.values() if len(series)])
+        return end
+
+    def buckets(self, bucket_seconds: float = 1.0) -> List[Dict[str, Any]]:
+        """Aggregate in-flight requests, throughput and GPU state per time bucket.
+
+        Reads the events once; with a journal sink that is a full pass over the
+        file, so callers on the event loop should run this in a thread.
+        """
+        requests = [(r.sent, r.first_token, r.end, r.output_tokens, r.status == "ok") for r in self.events()]
+        end = self._end_time(max((r[2] for r in requests), default=self.origin))
+        count = max(int(math.ceil((end - self.origin) / bucket_seconds)), 1)
+        in_flight = [0.0] * count
+        tokens = [0.0] * count
+        completed = [0] * count
+        errors = [0] * count
+
+        def spread(start: float, stop: float, target: List[float], weight: float):
+            """Distribute weight uniformly over [start, stop) into the buckets it overlaps."""
+            span = stop - start
+            first = max(int((start - self.origin) // bucket_seconds), 0)
+            last = min(int((stop - self.origin) // bucket_seconds), count - 1)
+            for i in range(first, last + 1):
+                b0 = self.origin + i * bucket_seconds
+                overlap = min(stop, b0 + bucket_seconds) - max(start, b0)
+                if overlap > 0:
+                    target[i] += weight * (overlap / span if span > 0 else 1.0)
+
+        for sent, first_token, request_end, output_tokens, ok in requests:
+            # Time-weighted in-flight count: seconds in flight divided by bucket width
+            if request_end > sent:
+                spread(sent, request_end, in_flight, (request_end - sent) / bucket_seconds)
+            idx = min(max(int((request_end - self.origin) // bucket_seconds), 0), count - 1)
+            if output_tokens:
+                token_start = first_token if first_token is not None else sent
+                if request_end > token_start:
+                    spread(token_start, request_end, tokens, output_tokens)
+                else:
+                    tokens[idx] += output_tokens
+            if ok:
+                completed[idx] += 1
+            else:
+                errors[idx] += 1
+
+        gpu_util = [[] for _ in range(count)]
+        gpu_mem = [[] for _ in range(count)]
+        gpu_power = [[] for _ in range(count)]
+        if self.gpu_sampler:
+            for series in self.gpu_sampler.series.values():
+                # Per-GPU sums per bucket, then averaged (util) or summed (memory, power)
+                util_sum, mem_sum, power_sum, n = [0.0] * count, [0.0] * count, [0.0] * count, [0] * count
+                for t, util, mem, power in zip(series.t, series.utilization, series.memory_used, series.power):
+                    i = int((t - self.origin) // bucket_seconds)
+                    if 0 <= i < count and not math.isnan(util):
+                        util_sum[i] += util
+                        mem_sum[i] += 0 if math.isnan(mem) else mem
+                        power_sum[i] += 0 if math.isnan(power) else power
+                        n[i] += 1
+                for i in range(count):
+                    if n[i]:
+                        gpu_util[i].append(util_sum[i] / n[i])
+                        gpu_mem[i].append(mem_sum[i] / n[i])
+                        gpu_power[i].append(power_sum[i] / n[i])
+
+        server = self.server_metrics.buckets(self.origin, bucket_seconds, count) if self.server_metrics else None
+
+        return [{
+            "t": i * bucket_seconds,
+            "in_flight": in_flight[i],
+            "tokens_per_second": tokens[i] / bucket_seconds,
+            "completed_requests": completed[i],
+            "failed_requests": errors[i],
+            "gpu_utilization": sum(gpu_util[i]) / len(gpu_util[i]) if gpu_util[i] else None,
+            "gpu_memory_used": sum(gpu_mem[i]) if gpu_mem[i] else None,
+            "power_draw": sum(gpu_power[i]) if gpu_power[i] else None,
+            **(server[i] if server else {}),
+        } for i in range(count)]
+
+    def _us(self, t: float) -> float:
+        return (t - self.origin) * 1_000_000
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Export as Chrome trace event JSON (loadable in chrome://tracing and Perfetto)."""
+        events: List[Dict[str, Any]] = [
+            {"ph": "M", "pid": 1, "name": "process_name", "args": {"name": "Requests"}},
+            {"ph": "M", "pid": 2, "name": "process_name", "args": {"name": "GPUs"}},
+        ]
+
+        # Assign each request to the lowest free lane so overlapping requests stack
+        free_lanes: List[int] = []
+        busy: List[tuple] = []
+        lane_count = 0
+        in_flight_changes: List[tuple] = []
+        for r in sorted(self.events(), key=lambda r: r.sent):
+            while busy and busy[0][0] <= r.sent:
+                heapq.heappush(free_lanes, heapq.heappop(busy)[1])
+            if free_lanes:
+                lane = heapq.heappop(free_lanes)
+            else:
+                lane = lane_count
+                lane_count += 1
+            heapq.heappush(busy, (r.end, lane))
+
+            args = {
+                "output_tokens": r.output_tokens,
+                "status": r.status,
+                "queue_ms": (r.sent - r.scheduled) * 1000,
+            }
+            if r.first_token is not None:
+                args["ttft_ms"] = (r.first_token - r.sent) * 1000
+            events.append({
+                "ph": "X", "pid": 1, "tid": lane, "name": "request",
+                "ts": self._us(r.sent), "dur": max(self._us(r.end) - self._us(r.sent), 0), "args": args,
+            })
+            if r.first_token is not None:
+                events.append({
+                    "ph": "X", "pid": 1, "tid": lane, "name": "prefill",
+                    "ts": self._us(r.sent), "dur": max(self._us(r.first_token) - self._us(r.sent), 0),
+                })
+            in_flight_changes.append((r.sent, 1))
+            in_flight_changes.append((r.end, -1))
+
+        in_flight = 0
+        for t, delta in sorted(in_flight_changes):
+            in_flight += delta
+            events.append({"ph": "C", "pid": 1, "name": "in_flight", "ts": self._us(t), "args": {"requests": in_flight}})
+
+        if self.gpu_sampler:
+            for gpu_index, series in sorted(self.gpu_sampler.series.items()):
+                for t, util, mem, power in zip(series.t, series.utilization, series.memory_used, series.power):
+                    if t < self.origin:
+                        continue
+                    ts = self._us(t)
+                    if not math.isnan(util):
+                        events.append({"ph": "C", "pid": 2, "name": f"GPU{gpu_index} utilization", "ts": ts, "args": {"percent": util}})
+                    if not math.isnan(mem):
+                        events.append({"ph": "C", "pid": 2, "name": f"GPU{gpu_index} memory", "ts": ts, "args": {"MiB": mem}})
+                    if not math.isnan(power):
+                        events.append({"ph": "C", "pid": 2, "name": f"GPU{gpu_index} power", "ts": ts, "args": {"watts": power}})
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
@@ -0,0 +1,242 @@
+# app/utils/gpu_sampler.py
+import asyncio
+import math
+import shutil
+import time
+from array import array
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from ..utils.logger import logger
+
+NVIDIA_SMI_TIMESTAMP_FORMAT = "%Y/%m/%d %H:%M:%S.%f"
+BASE_FIELDS = ["timestamp", "index", "power.draw", "utilization.gpu", "memory.used"]
+ENERGY_FIELD = "total_energy_consumption"
+
+
+def _parse_value(value: str) -> float:
+    """Parse an nvidia-smi CSV value, mapping [N/A] / [Not Supported] to NaN."""
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+def _interpolate(times: array, values: array, t: float) -> float:
+    """Linearly interpolate values at time t (times must be ascending)."""
+    lo, hi = 0, len(times) - 1
+    if t <= times[lo]:
+        return values[lo]
+    if t >= times[hi]:
+        return values[hi]
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if times[mid] <= t:
+            lo = mid
+        else:
+            hi = mid
+    span = times[hi] - times[lo]
+    if span <= 0:
+        return values[hi]
+    return values[lo] + (values[hi] - values[lo]) * (t - times[lo]) / span
+
+
+def integrate_power(times: array, watts: array, start: float, end: float) -> float:
+    """Trapezoidal integration of power (W) over [start, end], returning joules."""
+    if len(times) == 0 or end <= start:
+        return 0.0
+    points = [(start, _interpolate(times, watts, start))]
+    points.extend((t, w) for t, w in zip(times, watts) if start < t < end)
+    points.append((end, _interpolate(times, watts, end)))
+    return sum(
+        (t1 - t0) * (w0 + w1) / 2
+        for (t0, w0), (t1, w1) in zip(points, points[1:])
+    )
+
+
+class _GpuSeries:
+    """Column-oriented sample storage for a single GPU."""
+
+    def __init__(self):
+        self.t = array('d')
+        self.power = array('d')
+        self.energy = array('d')
+        self.utilization = array('d')
+        self.memory_used = array('d')
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+
+class GpuSampler:
+    """High-rate GPU power/energy sampler backed by a looping nvidia-smi process.
+
+    Samples are stamped on the monotonic clock (converted from the driver
+    timestamp, so pipe buffering does not skew them) and stored per GPU.
+    """
+
+    def __init__(self, interval_ms: int = 100, devices: Optional[List[int]] = None):
+        self.interval_ms = max(int(interval_ms), 20)
+        # Only these GPU indices are sampled; None samples every GPU
+        self.devices = devices
+        self.series: Dict[int, _GpuSeries] = {}
+        self.has_energy_counter = False
+        # Sum of power across GPUs for each sampling iteration
+        self._total_t = array('d')
+        self._total_power = array('d')
+        self._last_index = None
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._clock_offset = time.time() - time.monotonic()
+
+    def _device_args(self) -> List[str]:
+        return [f"--id={','.join(str(d) for d in self.devices)}"] if self.devices else []
+
+    async def _probe_energy_counter(self, nvidia_smi: str) -> bool:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                nvidia_smi, f"--query-gpu={ENERGY_FIELD}", "--format=csv,nounits,noheader", *self._device_args(),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=5)
+            if process.returncode != 0:
+                return False
+            values = [_parse_value(v.strip()) for v in stdout.decode().splitlines() if v.strip()]
+            return bool(values) and all(not math.isnan(v) for v in values)
+        except Exception as e:
+            logger.debug(f"Energy counter probe failed: {e}")
+            return False
+
+    async def start(self):
+        nvidia_smi = shutil.which("nvidia-smi")
+        if not nvidia_smi:
+            logger.warning("nvidia-smi not found, GPU power sampling disabled")
+            return
+
+        self.has_energy_counter = await self._probe_energy_counter(nvidia_smi)
+        fields = BASE_FIELDS + ([ENERGY_FIELD] if self.has_energy_counter else [])
+        self._clock_offset = time.time() - time.monotonic()
+        self._process = await asyncio.create_subprocess_exec(
+            nvidia_smi,
+            f"--query-gpu={','.join(fields)}",
+            "--format=csv,nounits,noheader",
+            f"-lms={self.interval_ms}",
+            *self._device_args(),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        self._reader = asyncio.create_task(self._read_samples())
+        logger.info(
+            f"GPU sampler started at {self.interval_ms} ms"
+            f" (energy counters {'available' if self.has_energy_counter else 'unavailable'})"
+        )
+
+    async def _read_samples(self):
+        try:
+            async for raw_line in self._process.stdout:
+                self._ingest(raw_line.decode("utf-8", errors="replace"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"GPU sampler read error: {e}")
+
+    def _ingest(self, line: str):
+        values = [v.strip() for v in line.strip().split(',')]
+        if len(values) < len(BASE_FIELDS):
+            return
+        try:
+            wall = datetime.strptime(values[0], NVIDIA_SMI_TIMESTAMP_FORMAT).timestamp()
+            gpu_index = int(values[1])
+        except ValueError:
+            return
+
+        t = wall - self._clock_offset
+        power = _parse_value(values[2])
+        energy_mj = _parse_value(values[5]) if len(values) > 5 else math.nan
+
+        series = self.series.setdefault(gpu_index, _GpuSeries())
+        series.t.append(t)
+        series.power.append(power)
+        series.energy.append(energy_mj / 1000.0)
+        series.utilization.append(_parse_value(values[3]))
+        series.memory_used.append(_parse_value(values[4]))
+
+        # A non-increasing GPU index marks the start of a new sampling iteration
+        if self._last_index is None or gpu_index <= self._last_index:
+            self._total_t.append(t)
+            self._total_power.append(0.0)
+        if not math.isnan(power):
+            self._total_power[-1] += power
+        self._last_index = gpu_index
+
+    async def stop(self):
+        if self._process and self._process.returncode is None:
+            # Give the sampler one more interval so the window end is covered
+            await asyncio.sleep(self.interval_ms / 1000.0)
+            self._process.terminate()
+            try:
+                await asyncio.wait_for(self._process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                self._process.kill()
+        if self._reader:
+            try:
+                await asyncio.wait_for(self._reader, timeout=5)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                self._reader.cancel()
+            self._reader = None
+
+    def _gpu_energy(self, gpu_index: int, series: _GpuSeries, start: float, end: float) -> Dict[str, Any]:
+        valid = [i for i in range(len(series)) if not math.isnan(series.power[i])]
+        times = array('d', (series.t[i] for i in valid))
+        watts = array('d', (series.power[i] for i in valid))
+        in_window = [w for t, w in zip(times, watts) if start <= t <= end]
+
+        method = "trapezoid"
+        energy_joules = integrate_power(times, watts, start, end)
+
+        # Prefer the driver's cumulative energy counter when it brackets the window
+        counter_idx = [i for i in range(len(series)) if not math.isnan(series.energy[i])]
+        if counter_idx:
+            counter_t = array('d', (series.t[i] for i in counter_idx))
+            counter_j = array('d', (series.energy[i] for i in counter_idx))
+            tolerance = 2 * self.interval_ms / 1000.0
+            if counter_t[0] <= start + tolerance and counter_t[-1] >= end - tolerance:
+                delta = _interpolate(counter_t, counter_j, end) - _interpolate(counter_t, counter_j, start)
+                if delta >= 0:
+                    energy_joules = delta
+                    method = "counter"
+
+        duration = end - start
+        return {
+            "gpu_index": gpu_index,
+            "energy_joules": energy_joules,
+            "avg_power_watts": energy_joules / duration if duration > 0 else 0,
+            "peak_power_watts": max(in_window) if in_window else 0,
+            "samples": len(in_window),
+            "method": method,
+        }
+
+    def energy_report(self, start: float, end: float, output_tokens: int, requests: int) -> Dict[str, Any]:
+        """Integrate energy over the [start, end] monotonic window for all GPUs."""
+        per_gpu: List[Dict[str, Any]] = [
+            self._gpu_energy(gpu_index, series, start, end)
+            for gpu_index, series in sorted(self.series.items())
+            if len(series)
+        ]
+        total_joules = sum(gpu["energy_joules"] for gpu in per_gpu)
+        duration = max(end - start, 0.0)
+        peak_total = max(
+            (w for t, w in zip(self._total_t, self._total_power) if start <= t <= end),
+            default=0.0,
+        )
+
+        return {
+            "window_seconds": duration,
+            "sample_interval_ms": self.interval_ms,
+            "total_energy_joules": total_joules,
+            "joules_per_token": total_joules / output_tokens if output_tokens > 0 else 0,
+            "joules_per_request": total_joules / requests if requests > 0 else 0,
+            "avg_power_watts": total_joules / duration if duration > 0 else 0,
+            "peak_power_watts": peak_total,
+            "per_gpu": per_gpu,
+        }
@@ -1,11 +1,30 @@
 # File: app/utils/logger.py
+import gzip
 import logging
+import os
+import shutil
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 # Create logs directory if it doesn't exist
 log_dir = Path("logs")
 log_dir.mkdir(exist_ok=True)
 
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(20 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "10"))
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+# Rotate instead of growing forever; rotated files are gzip-compressed
+file_handler = RotatingFileHandler(log_dir / "benchmark.log", maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+file_handler.namer = lambda name: name + ".gz"
+file_handler.rotator = _gzip_rotator
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -14,7 +33,7 @@ logging.basicConfig(
         # Console handler
         logging.StreamHandler(),
         # File handler
-        logging.FileHandler(log_dir / "benchmark.log")
+        file_handler
     ]
 )
 
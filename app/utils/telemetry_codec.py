@@ -0,0 +1,194 @@
+# app/utils/telemetry_codec.py
+import json
+import struct
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+from fastapi import WebSocket
+from ..utils.logger import logger
+
+PROTOCOL_VERSION = 2
+FRAME_KEYFRAME = 1
+FRAME_DELTA = 2
+# frame type, value count, timestamp (ms since epoch)
+HEADER = struct.Struct("<BHd")
+# field index, value; the high bit of the index marks a float64 value
+ENTRY = struct.Struct("<Hf")
+WIDE_ENTRY = struct.Struct("<Hd")
+WIDE_FLAG = 0x8000
+# Integers above 2**24 are not exact in float32 (token and byte counters); they go as float64
+FLOAT32_EXACT_LIMIT = 2 ** 24
+
+MIN_INTERVAL_MS = 100
+MAX_INTERVAL_MS = 10000
+KEYFRAME_INTERVAL_S = 10.0
+
+Frame = Union[str, bytes]
+
+
+def _wide(value: float) -> bool:
+    return abs(value) > FLOAT32_EXACT_LIMIT and float(value).is_integer()
+
+
+def _wire_value(value: float) -> float:
+    """The value a client decodes after it went through ``_pack_entry``."""
+    if _wide(value):
+        return value
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+def _pack_entry(index: int, value: float) -> bytes:
+    if _wide(value):
+        return WIDE_ENTRY.pack(index | WIDE_FLAG, value)
+    return ENTRY.pack(index, value)
+
+
+def flatten_metrics(metrics: Any, prefix: str = "") -> Tuple[Dict[str, float], Dict[str, Any]]:
+    """Flatten nested metrics into dotted numeric fields and non-numeric static values."""
+    numeric: Dict[str, float] = {}
+    static: Dict[str, Any] = {}
+    if isinstance(metrics, dict):
+        items = metrics.items()
+    elif isinstance(metrics, list):
+        items = enumerate(metrics)
+    else:
+        items = None
+
+    if items is None:
+        if isinstance(metrics, bool):
+            numeric[prefix] = float(metrics)
+        elif isinstance(metrics, (int, float)):
+            numeric[prefix] = float(metrics)
+        elif metrics is not None:
+            static[prefix] = metrics
+        return numeric, static
+
+    for key, value in items:
+        path = f"{prefix}.{key}" if prefix else str(key)
+        child_numeric, child_static = flatten_metrics(value, path)
+        numeric.update(child_numeric)
+        static.update(child_static)
+    return numeric, static
+
+
+class DeltaEncoder:
+    """Encode successive metrics documents as a keyframe followed by changed values only."""
+
+    def __init__(self, fields: Optional[List[str]] = None):
+        self.fields = fields or []
+        self._schema: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._static: Dict[str, Any] = {}
+        self._last: Dict[str, float] = {}
+        self._last_keyframe = 0.0
+
+    def _selected(self, name: str) -> bool:
+        return not self.fields or any(name == f or name.startswith(f"{f}.") for f in self.fields)
+
+    def encode(self, metrics: Dict[str, Any]) -> List[Frame]:
+        numeric, static = flatten_metrics(metrics)
+        numeric = {k: v for k, v in numeric.items() if self._selected(k)}
+        static = {k: v for k, v in static.items() if self._selected(k) and k != "timestamp"}
+        timestamp_ms = time.time() * 1000
+
+        frames: List[Frame] = []
+        schema_changed = set(numeric) != set(self._index) or static != self._static
+        keyframe_due = time.monotonic() - self._last_keyframe >= KEYFRAME_INTERVAL_S
+        if schema_changed:
+            self._schema = sorted(numeric)
+            if len(self._schema) > WIDE_FLAG:
+                raise ValueError(f"Too many telemetry fields for a binary frame: {len(self._schema)}")
+            self._index = {name: i for i, name in enumerate(self._schema)}
+            self._static = static
+            frames.append(json.dumps({
+                "type": "schema",
+                "version": PROTOCOL_VERSION,
+                "fields": self._schema,
+                "static": self._static,
+            }))
+
+        if schema_changed or keyframe_due:
+            changed = numeric
+            frame_type = FRAME_KEYFRAME
+            self._last_keyframe = time.monotonic()
+        else:
+            # Compare at the precision that goes on the wire
+            changed = {k: v for k, v in numeric.items() if _wire_value(v) != self._last.get(k)}
+            frame_type = FRAME_DELTA
+
+        payload = bytearray(HEADER.pack(frame_type, len(changed), timestamp_ms))
+        for name, value in changed.items():
+            payload += _pack_entry(self._index[name], value)
+            self._last[name] = _wire_value(value)
+        frames.append(bytes(payload))
+        return frames
+
+
+class TelemetrySubscription:
+    """Per-client negotiation state for the /ws/metrics stream.
+
+    Clients default to full JSON documents. Sending
+    {"type": "subscribe", "encoding": "binary", "fields": [...], "rate_ms": 1000}
+    switches to schema + delta-encoded binary frames at the requested rate.
+    """
+
+    def __init__(self, interval_ms: int = 250):
+        self.encoding = "json"
+        self.fields: List[str] = []
+        self.interval_ms = interval_ms
+        self.encoder: Optional[DeltaEncoder] = None
+
+    @property
+    def interval(self) -> float:
+        return self.interval_ms / 1000.0
+
+    def apply(self, message: Dict[str, Any]):
+        if message.get("type") != "subscribe":
+            return
+        self.encoding = "binary" if message.get("encoding") == "binary" else "json"
+        self.fields = [str(f) for f in message.get("fields") or []]
+        if message.get("rate_ms"):
+            self.interval_ms = min(max(int(message["rate_ms"]), MIN_INTERVAL_MS), MAX_INTERVAL_MS)
+        self.encoder = DeltaEncoder(self.fields) if self.encoding == "binary" else None
+        logger.info(f"Metrics subscription: encoding={self.encoding} rate={self.interval_ms}ms fields={self.fields or 'all'}")
+
+    async def listen(self, websocket: WebSocket):
+        """Consume subscription messages until the client goes away; binary frames are ignored."""
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            text = message.get("text")
+            if text is None:
+                continue
+            try:
+                request = json.loads(text)
+            except ValueError:
+                continue
+            if isinstance(request, dict):
+                self.apply(request)
+
+    def frames(self, metrics: Dict[str, Any]) -> List[Frame]:
+        if self.encoder:
+            return self.encoder.encode(metrics)
+        return [json.dumps({"type": "metrics_update", "metrics": metrics})]
+
+    async def send(self, websocket: WebSocket, metrics: Dict[str, Any]):
+        for frame in self.frames(metrics):
+            if isinstance(frame, bytes):
+                await websocket.send_bytes(frame)
+            else:
+                await websocket.send_text(frame)
+
+
+def decode_frame(frame: bytes) -> Tuple[int, float, List[Tuple[int, float]]]:
+    """Decode a binary frame into (frame type, timestamp ms, [(field index, value)])."""
+    frame_type, count, timestamp_ms = HEADER.unpack_from(frame, 0)
+    entries = []
+    offset = HEADER.size
+    for _ in range(count):
+        (index,) = struct.unpack_from("<H", frame, offset)
+        entry = WIDE_ENTRY if index & WIDE_FLAG else ENTRY
+        index, value = entry.unpack_from(frame, offset)
+        entries.append((index & ~WIDE_FLAG, value))
+        offset += entry.size
+    return frame_type, timestamp_ms, entries
@@ -1,31 +1,85 @@
 // src/components/BenchmarkHistory.tsx
 import React, { useState, useEffect } from "react";
-import { Download, ChevronDown, ChevronRight } from "lucide-react";
-import { fetchBenchmarkHistory } from "@/services/api";
+import { Download, ChevronDown, ChevronRight, RotateCcw } from "lucide-react";
+import { fetchBenchmarkHistory, fetchBenchmarkRun, fetchBenchmarkSeries, resumeBenchmark } from "@/services/api";
 import { formatNumber } from "@/utils/format";
-import type { BenchmarkRun } from "@/types/benchmark";
+import RunTimeline from "@/components/RunTimeline";
+import type { BenchmarkRun, BenchmarkRunSummary, BenchmarkSeries } from "@/types/benchmark";
+
+const PAGE_SIZE = 25;
+// Interrupted runs keep a journal on the server and can be continued
+const RESUMABLE_STATUSES = ['partial', 'failed'];
 
 const BenchmarkHistory = () => {
   const [expandedRows, setExpandedRows] = useState<Set<number>>(new Set());
-  const [history, setHistory] = useState<BenchmarkRun[]>([]);
+  const [history, setHistory] = useState<BenchmarkRunSummary[]>([]);
+  const [details, setDetails] = useState<Record<number, BenchmarkRun>>({});
+  const [series, setSeries] = useState<Record<number, BenchmarkSeries>>({});
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [resuming, setResuming] = useState<number | null>(null);
 
   useEffect(() => {
     loadHistory();
   }, []);
 
-  const loadHistory = async () => {
+  const loadHistory = async (cursor?: string) => {
     try {
-      const data = await fetchBenchmarkHistory();
-      setHistory(data);
+      const page = await fetchBenchmarkHistory({ cursor, limit: PAGE_SIZE });
+      setHistory(prev => (cursor ? [...prev, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
     } catch (error) {
       console.error("Failed to load benchmark history:", error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
+    }
+  };
+
+  const loadMore = () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    loadHistory(nextCursor);
+  };
+
+  const resumeRun = async (id: number) => {
+    setResuming(id);
+    try {
+      await resumeBenchmark(id);
+      setDetails(prev => {
+        const next = { ...prev };
+        delete next[id];
+        return next;
+      });
+      setSeries(prev => {
+        const next = { ...prev };
+        delete next[id];
+        return next;
+      });
+      await loadHistory();
+    } catch (error) {
+      console.error(`Failed to resume benchmark ${id}:`, error);
+    } finally {
+      setResuming(null);
+    }
+  };
+
+  const loadDetails = async (id: number) => {
+    if (details[id]) return;
+    try {
+      const [run, runSeries] = await Promise.all([fetchBenchmarkRun(id), fetchBenchmarkSeries(id)]);
+      setDetails(prev => ({ ...prev, [id]: run }));
+      setSeries(prev => ({ ...prev, [id]: runSeries }));
+    } catch (error) {
+      console.error(`Failed to load benchmark ${id}:`, error);
     }
   };
 
   const toggleRow = (id: number) => {
+    if (!expandedRows.has(id)) {
+      loadDetails(id);
+    }
     setExpandedRows(prev => {
       const next = new Set(prev);
       if (next.has(id)) {
@@ -37,7 +91,11 @@ const BenchmarkHistory = () => {
     });
   };
 
-  const exportResults = async (run: BenchmarkRun) => {
+  const exportResults = async (summary: BenchmarkRunSummary) => {
+    const [run, series] = await Promise.all([
+      fetchBenchmarkRun(summary.id),
+      fetchBenchmarkSeries(summary.id),
+    ]);
     const benchmarkData = {
       id: run.id,
       name: run.name,
@@ -45,7 +103,7 @@ const BenchmarkHistory = () => {
       status: run.status,
       start_time: run.start_time,
       end_time: run.end_time,
-      metrics: run.metrics,
+      metrics: { ...run.metrics, ...series },
     };
 
     const blob = new Blob([JSON.stringify(benchmarkData, null, 2)], {
@@ -55,7 +113,7 @@ const BenchmarkHistory = () => {
     const url = window.URL.createObjectURL(blob);
     const a = document.createElement("a");
     a.href = url;
-    a.download = `benchmark_${run.name.replace(/[^a-zA-Z0-9_-]/g, "_")}_${run.id}.json`;
+    a.download = `benchmark_${(run.name || "run").replace(/[^a-zA-Z0-9_-]/g, "_")}_${run.id}.json`;
     document.body.appendChild(a);
     a.click();
     window.URL.revokeObjectURL(url);
@@ -84,7 +142,9 @@ const BenchmarkHistory = () => {
             </tr>
           </thead>
           <tbody>
-            {history.map((run) => (
+            {history.map((run) => {
+              const detail = details[run.id];
+              return (
               <React.Fragment key={run.id}>
                 <tr 
                   className="border-b border-gray-800 cursor-pointer hover:bg-gray-800"
@@ -103,15 +163,15 @@ const BenchmarkHistory = () => {
                       {run.status}
                     </span>
                   </td>
-                  <td className="p-2">{new Date(run.start_time).toLocaleString()}</td>
+                  <td className="p-2">{run.start_time ? new Date(run.start_time).toLocaleString() : '-'}</td>
                   <td className="p-2">
-                    {run.end_time ? 
+                    {run.end_time && run.start_time ?
                       Math.round((new Date(run.end_time).getTime() - new Date(run.start_time).getTime()) / 1000) + 's'
                       : '-'
                     }
                   </td>
                   <td className="p-2">
-                    {formatNumber(run.metrics?.tokens_per_second || 0)} t/s
+                    {formatNumber(run.average_tps || 0)} t/s
                   </td>
                   <td>
                     <button
@@ -124,6 +184,19 @@ const BenchmarkHistory = () => {
                       <Download className="w-4 h-4 mr-1" />
                       Export
                     </button>
+                    {run.status && RESUMABLE_STATUSES.includes(run.status) && (
+                      <button
+                        onClick={(e) => {
+                          e.stopPropagation();
+                          resumeRun(run.id);
+                        }}
+                        disabled={resuming !== null}
+                        className="text-yellow-400 hover:text-yellow-300 flex items-center disabled:opacity-50"
+                      >
+                        <RotateCcw className="w-4 h-4 mr-1" />
+                        {resuming === run.id ? 'Resuming...' : 'Resume'}
+                      </button>
+                    )}
                   </td>
                 </tr>
                 {expandedRows.has(run.id) && (
@@ -135,15 +208,15 @@ const BenchmarkHistory = () => {
                           <dl className="space-y-2">
                             <div>
                               <dt className="text-gray-400">Peak TPS</dt>
-                              <dd>{formatNumber(run.metrics?.peak_tps || 0)} t/s</dd>
+                              <dd>{formatNumber(run.peak_tps || 0)} t/s</dd>
                             </div>
                             <div>
                               <dt className="text-gray-400">P95 Latency</dt>
-                              <dd>{formatNumber(run.metrics?.p95_latency || 0)} ms</dd>
+                              <dd>{formatNumber(run.p95_latency || 0)} ms</dd>
                             </div>
                             <div>
                               <dt className="text-gray-400">Time to First Token</dt>
-                              <dd>{formatNumber(run.metrics?.time_to_first_token || 0)} ms</dd>
+                              <dd>{formatNumber(run.time_to_first_token || 0)} ms</dd>
                             </div>
                           </dl>
                         </div>
@@ -152,15 +225,19 @@ const BenchmarkHistory = () => {
                           <dl className="space-y-2">
                             <div>
                               <dt className="text-gray-400">GPU Utilization</dt>
-                              <dd>{formatNumber(run.metrics?.average_gpu_utilization || 0)}%</dd>
+                              <dd>{formatNumber(detail?.metrics?.average_gpu_utilization || 0)}%</dd>
                             </div>
                             <div>
                               <dt className="text-gray-400">Peak GPU Memory</dt>
-                              <dd>{formatNumber(run.metrics?.peak_gpu_memory || 0)} GB</dd>
+                              <dd>{formatNumber(detail?.metrics?.peak_gpu_memory || 0)} GB</dd>
                             </div>
                             <div>
                               <dt className="text-gray-400">Power Draw</dt>
-                              <dd>{formatNumber(run.metrics?.gpu_power_draw || 0)} W</dd>
+                              <dd>{formatNumber(detail?.metrics?.avg_power_watts ?? detail?.metrics?.gpu_power_draw ?? 0)} W</dd>
+                            </div>
+                            <div>
+                              <dt className="text-gray-400">Energy per Token</dt>
+                              <dd>{formatNumber(detail?.metrics?.joules_per_token || 0)} J</dd>
                             </div>
                           </dl>
                         </div>
@@ -169,27 +246,43 @@ const BenchmarkHistory = () => {
                           <dl className="space-y-2">
                             <div>
                               <dt className="text-gray-400">Total Tokens</dt>
-                              <dd>{(run.metrics?.total_tokens || 0).toLocaleString()}</dd>
+                              <dd>{(run.total_tokens || 0).toLocaleString()}</dd>
                             </div>
                             <div>
                               <dt className="text-gray-400">Successful Requests</dt>
-                              <dd>{(run.metrics?.successful_requests || 0).toLocaleString()}</dd>
+                              <dd>{(run.successful_requests || 0).toLocaleString()}</dd>
                             </div>
                             <div>
                               <dt className="text-gray-400">Failed Requests</dt>
-                              <dd>{(run.metrics?.failed_requests || 0).toLocaleString()}</dd>
+                              <dd>{(detail?.metrics?.failed_requests || 0).toLocaleString()}</dd>
                             </div>
                           </dl>
                         </div>
                       </div>
+                      {series[run.id]?.timeline && (
+                        <div className="mt-6">
+                          <h4 className="font-medium mb-2">Timeline</h4>
+                          <RunTimeline runId={run.id} timeline={series[run.id].timeline!} />
+                        </div>
+                      )}
                     </td>
                   </tr>
                 )}
               </React.Fragment>
-            ))}
+              );
+            })}
           </tbody>
         </table>
       </div>
+      {nextCursor && (
+        <button
+          onClick={loadMore}
+          disabled={loadingMore}
+          className="px-4 py-2 bg-gray-800 hover:bg-gray-700 rounded disabled:opacity-50"
+        >
+          {loadingMore ? "Loading..." : "Load more"}
+        </button>
+      )}
     </div>
   );
 };
@@ -32,6 +32,11 @@ const LogViewer: React.FC<LogViewerProps> = ({ containerId, isContainerRunning,
       
       ws.onmessage = (event) => {
         const logData = JSON.parse(event.data);
+        if (logData.dropped) {
+          // The server skips lines this viewer fell too far behind on
+          setLogs(prev => [...prev, `... ${logData.dropped} lines skipped ...`]);
+        }
+        if (logData.log === undefined) return;
         setLogs(prev => [...prev, logData.log]);
         logEndRef.current?.scrollIntoView({ behavior: 'smooth' });
       };
@@ -0,0 +1,130 @@
+// src/components/RunTimeline.tsx
+import React, { useEffect, useState } from 'react';
+import {
+  ComposedChart, Line, Scatter, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ReferenceLine, ResponsiveContainer,
+} from 'recharts';
+import { fetchBenchmarkLogEvents } from '@/services/api';
+import { formatNumber } from '@/utils/format';
+import type { LogEvent, RunLogEvents, TimelineBucket } from '@/types/benchmark';
+
+interface RunTimelineProps {
+  runId: number;
+  timeline: TimelineBucket[];
+}
+
+const MARKER_COLORS: Record<LogEvent['kind'], string> = {
+  startup: '#A78BFA',
+  runtime: '#34D399',
+  error: '#F87171',
+};
+
+const describeFields = (fields: LogEvent['fields']) =>
+  Object.entries(fields).map(([key, value]) => `${key}=${value}`).join(', ');
+
+// Throughput, concurrency and queue depth of a stored run, with the events parsed from
+// its container log marked at the time they were logged
+const RunTimeline: React.FC<RunTimelineProps> = ({ runId, timeline }) => {
+  const [logEvents, setLogEvents] = useState<RunLogEvents | null>(null);
+
+  useEffect(() => {
+    fetchBenchmarkLogEvents(runId)
+      .then(setLogEvents)
+      .catch((error) => console.error(`Failed to load log events of benchmark ${runId}:`, error));
+  }, [runId]);
+
+  if (!timeline.length) {
+    return <div className="text-gray-400 text-sm">No timeline recorded for this run.</div>;
+  }
+
+  const end = timeline[timeline.length - 1].t;
+  const events = logEvents?.events ?? [];
+  const beforeRun = events.filter((e) => e.offset_seconds < 0);
+  // Periodic throughput lines are plotted as points; everything else in the window is a marker
+  const throughput = events
+    .filter((e) => e.name === 'throughput' && e.offset_seconds >= 0 && e.offset_seconds <= end)
+    .map((e) => ({ t: e.offset_seconds, server_tps: Number(e.fields.generation_tps) }));
+  const markers = events.filter((e) => e.name !== 'throughput' && e.offset_seconds >= 0 && e.offset_seconds <= end);
+  const hasQueue = timeline.some((b) => b.server_requests_waiting != null);
+  const config = Object.entries(logEvents?.server_config ?? {});
+
+  return (
+    <div className="space-y-3">
+      <ResponsiveContainer width="100%" height={260}>
+        <ComposedChart data={timeline}>
+          <CartesianGrid strokeDasharray="3 3" />
+          <XAxis
+            dataKey="t"
+            type="number"
+            domain={[0, end]}
+            tick={{ fill: '#9CA3AF' }}
+            tickFormatter={(val) => `${Math.round(val)}s`}
+          />
+          <YAxis
+            yAxisId="left"
+            tick={{ fill: '#9CA3AF' }}
+            label={{ value: 'Tokens/s', angle: -90, position: 'insideLeft' }}
+          />
+          <YAxis
+            yAxisId="right"
+            orientation="right"
+            tick={{ fill: '#9CA3AF' }}
+            label={{ value: 'Requests', angle: 90, position: 'insideRight' }}
+          />
+          <Tooltip
+            contentStyle={{ backgroundColor: '#1F2937', border: 'none' }}
+            labelFormatter={(val) => `${formatNumber(Number(val), 1)}s`}
+          />
+          <Legend />
+          <Line yAxisId="left" type="monotone" dataKey="tokens_per_second" name="Tokens/s" stroke="#60A5FA" dot={false} />
+          <Line yAxisId="right" type="stepAfter" dataKey="in_flight" name="In flight" stroke="#FBBF24" dot={false} />
+          {hasQueue && (
+            <Line
+              yAxisId="right"
+              type="stepAfter"
+              dataKey="server_requests_waiting"
+              name="Server queue"
+              stroke="#F472B6"
+              dot={false}
+            />
+          )}
+          {throughput.length > 0 && (
+            <Scatter yAxisId="left" data={throughput} dataKey="server_tps" name="Logged gen. tokens/s" fill="#34D399" />
+          )}
+          {markers.map((e, i) => (
+            <ReferenceLine
+              key={`${e.name}-${e.timestamp}-${i}`}
+              yAxisId="left"
+              x={e.offset_seconds}
+              stroke={MARKER_COLORS[e.kind]}
+              strokeDasharray="4 2"
+              label={{ value: e.name, fill: MARKER_COLORS[e.kind], fontSize: 11, position: 'top' }}
+            />
+          ))}
+        </ComposedChart>
+      </ResponsiveContainer>
+
+      {markers.length > 0 && (
+        <ul className="text-xs space-y-1">
+          {markers.map((e, i) => (
+            <li key={`${e.name}-${e.timestamp}-${i}`} style={{ color: MARKER_COLORS[e.kind] }}>
+              {formatNumber(e.offset_seconds, 1)}s {e.name}
+              {Object.keys(e.fields).length > 0 && <span className="text-gray-400"> {describeFields(e.fields)}</span>}
+            </li>
+          ))}
+        </ul>
+      )}
+
+      {(config.length > 0 || beforeRun.length > 0) && (
+        <div className="text-xs text-gray-400">
+          <span className="text-gray-300">Server startup: </span>
+          {config.map(([key, value]) => `${key}=${value}`).join(', ')}
+          {beforeRun.some((e) => e.kind === 'error') && (
+            <span className="text-red-400"> ({beforeRun.filter((e) => e.kind === 'error').length} errors before the run)</span>
+          )}
+        </div>
+      )}
+    </div>
+  );
+};
+
+export default RunTimeline;
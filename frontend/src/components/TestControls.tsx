@@ -4,7 +4,7 @@ import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, Responsi
 import { AlertCircle, Plus, X, Upload } from 'lucide-react';
 import LogViewer from '@/components/LogViewer';
 import { startBenchmark, getNims, saveLogs, fetchBenchmarkHistory, setupNgcModel } from "@/services/api";
-import type { BenchmarkConfig, BenchmarkRun } from '@/types/benchmark';
+import type { BenchmarkConfig, BenchmarkRunSummary } from '@/types/benchmark';
 import type { ContainerInfo, NgcModelSetupResponse } from '@/services/api';
 import BenchmarkHistory from '@/components/BenchmarkHistory';
 
@@ -55,7 +55,7 @@ const TestControls = () => {
   const [activeContainer, setActiveContainer] = useState<string | null>(null);
   const [isContainerRunning, setIsContainerRunning] = useState(false);
   const [metrics, setMetrics] = useState<any>(null);
-  const [benchmarkHistory, setBenchmarkHistory] = useState<BenchmarkRun[]>([]);
+  const [benchmarkHistory, setBenchmarkHistory] = useState<BenchmarkRunSummary[]>([]);
   const [ngcForm, setNgcForm] = useState({
     source: '',
     model_name: '',
@@ -88,8 +88,12 @@ const TestControls = () => {
 
   const loadBenchmarkHistory = async () => {
     try {
-      const history = await fetchBenchmarkHistory();
-      setBenchmarkHistory(history);
+      const page = await fetchBenchmarkHistory({
+        limit: 10,
+        fields: ['id', 'name', 'start_time', 'average_tps', 'p95_latency'],
+      });
+      // Newest first from the API; chart oldest to newest
+      setBenchmarkHistory([...page.items].reverse());
     } catch (err) {
       console.error("Error loading benchmark history:", err);
     }
@@ -476,7 +480,7 @@ const TestControls = () => {
           <div className="bg-gray-800 p-6 rounded-lg">
             <h2 className="text-xl font-bold mb-4">Recent Benchmarks</h2>
             <ResponsiveContainer width="100%" height={200}>
-              <LineChart data={benchmarkHistory.slice(-10)}>
+              <LineChart data={benchmarkHistory}>
                 <CartesianGrid strokeDasharray="3 3" />
                 <XAxis
                   dataKey="start_time"
@@ -502,15 +506,15 @@ const TestControls = () => {
                 <Line
                   yAxisId="left"
                   type="monotone"
-                  dataKey="metrics.tokens_per_second"
+                  dataKey="average_tps"
                   name="Tokens/s"
                   stroke="#10B981"
                 />
                 <Line
                   yAxisId="right"
                   type="monotone"
-                  dataKey="metrics.latency"
-                  name="Latency"
+                  dataKey="p95_latency"
+                  name="P95 Latency"
                   stroke="#60A5FA"
                 />
               </LineChart>
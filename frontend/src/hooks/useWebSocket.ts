@@ -8,22 +8,93 @@ export interface WebSocketState {
   error: string | null;
 }
 
-const useWebSocket = (url: string): WebSocketState => {
+export interface WebSocketOptions {
+  // 'binary' negotiates the delta-encoded protocol; JSON remains the fallback
+  encoding?: 'binary' | 'json';
+  // Dotted field prefixes to subscribe to, e.g. ['gpu_metrics', 'power_draw']
+  fields?: string[];
+  rateMs?: number;
+}
+
+// Binary frame layout (little-endian): uint8 type, uint16 count, float64 timestamp ms,
+// followed by `count` entries of uint16 field index + value. The value is a float32,
+// or a float64 when the index has its high bit set (large counters).
+const HEADER_SIZE = 11;
+const WIDE_FLAG = 0x8000;
+
+interface Schema {
+  fields: string[];
+  static: Record<string, unknown>;
+}
+
+const setPath = (target: any, path: string, value: unknown) => {
+  const keys = path.split('.');
+  let node = target;
+  keys.slice(0, -1).forEach((key, i) => {
+    if (node[key] === undefined) {
+      node[key] = /^\d+$/.test(keys[i + 1]) ? [] : {};
+    }
+    node = node[key];
+  });
+  node[keys[keys.length - 1]] = value;
+};
+
+const buildMetrics = (schema: Schema, values: Float64Array, timestamp: number): MetricsData => {
+  const metrics: any = {};
+  Object.entries(schema.static).forEach(([path, value]) => setPath(metrics, path, value));
+  schema.fields.forEach((path, i) => setPath(metrics, path, values[i]));
+  metrics.timestamp = new Date(timestamp).toISOString();
+  return metrics as MetricsData;
+};
+
+const useWebSocket = (url: string, options: WebSocketOptions = { encoding: 'binary' }): WebSocketState => {
   const [state, setState] = useState<WebSocketState>({
     metrics: null,
     isConnected: false,
     error: null
   });
+  const { encoding = 'binary', rateMs } = options;
+  const fieldsKey = (options.fields || []).join(',');
 
   useEffect(() => {
     const ws = new WebSocket(url);
-    
+    ws.binaryType = 'arraybuffer';
+    let schema: Schema | null = null;
+    let values = new Float64Array(0);
+
+    const applyFrame = (buffer: ArrayBuffer) => {
+      if (!schema) return;
+      const view = new DataView(buffer);
+      const count = view.getUint16(1, true);
+      const timestamp = view.getFloat64(3, true);
+      let offset = HEADER_SIZE;
+      for (let i = 0; i < count; i++) {
+        const index = view.getUint16(offset, true);
+        if (index & WIDE_FLAG) {
+          values[index & ~WIDE_FLAG] = view.getFloat64(offset + 2, true);
+          offset += 10;
+        } else {
+          values[index] = view.getFloat32(offset + 2, true);
+          offset += 6;
+        }
+      }
+      const metrics = buildMetrics(schema, values, timestamp);
+      setState(prev => ({ ...prev, metrics, error: null }));
+    };
+
     ws.onmessage = (event) => {
       try {
+        if (event.data instanceof ArrayBuffer) {
+          applyFrame(event.data);
+          return;
+        }
         const data = JSON.parse(event.data);
-        if (data.type === 'metrics_update' && data.metrics) {
-          setState(prev => ({ 
-            ...prev, 
+        if (data.type === 'schema') {
+          schema = { fields: data.fields, static: data.static || {} };
+          values = new Float64Array(data.fields.length);
+        } else if (data.type === 'metrics_update' && data.metrics) {
+          setState(prev => ({
+            ...prev,
             metrics: data.metrics,
             error: null
           }));
@@ -37,32 +108,40 @@ const useWebSocket = (url: string): WebSocketState => {
     };
 
     ws.onopen = () => {
-      setState(prev => ({ 
-        ...prev, 
+      if (encoding === 'binary' || rateMs || fieldsKey) {
+        ws.send(JSON.stringify({
+          type: 'subscribe',
+          encoding,
+          fields: fieldsKey ? fieldsKey.split(',') : [],
+          rate_ms: rateMs
+        }));
+      }
+      setState(prev => ({
+        ...prev,
         isConnected: true,
         error: null
       }));
     };
 
     ws.onclose = () => {
-      setState(prev => ({ 
-        ...prev, 
+      setState(prev => ({
+        ...prev,
         isConnected: false,
         error: 'Connection lost'
       }));
     };
 
     ws.onerror = () => {
-      setState(prev => ({ 
+      setState(prev => ({
         ...prev,
         error: 'Failed to connect to metrics service'
       }));
     };
 
     return () => ws.close();
-  }, [url]);
+  }, [url, encoding, rateMs, fieldsKey]);
 
   return state;
 };
 
-export default useWebSocket;
\ No newline at end of file
+export default useWebSocket;
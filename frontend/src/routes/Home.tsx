@@ -3,13 +3,13 @@ import React, { useState, useEffect } from 'react';
 import { AlertCircle } from 'lucide-react';
 import useWebSocket from '@/hooks/useWebSocket';
 import { fetchBenchmarkHistory } from "@/services/api";
-import type { BenchmarkRun } from "@/types/benchmark";
+import type { BenchmarkRunSummary } from "@/types/benchmark";
 import { WS_BASE_URL } from '@/config';
 const WS_BASE = WS_BASE_URL;
 
 const Home: React.FC = () => {
   const { metrics, error: wsError, isConnected } = useWebSocket(`${WS_BASE}/ws/metrics`);
-  const [history, setHistory] = useState<BenchmarkRun[]>([]);
+  const [history, setHistory] = useState<BenchmarkRunSummary[]>([]);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -20,8 +20,8 @@ const Home: React.FC = () => {
 
   const fetchHistoricalData = async () => {
     try {
-      const data = await fetchBenchmarkHistory();
-      setHistory(data);
+      const page = await fetchBenchmarkHistory({ limit: 10 });
+      setHistory(page.items);
     } catch (error) {
       console.error("Failed to fetch benchmark history:", error);
     } finally {
@@ -90,15 +90,15 @@ const Home: React.FC = () => {
                           {run.status}
                         </span>
                       </td>
-                      <td className="p-2">{new Date(run.start_time).toLocaleString()}</td>
+                      <td className="p-2">{run.start_time ? new Date(run.start_time).toLocaleString() : '-'}</td>
                       <td className="p-2">
-                        {run.end_time ? 
+                        {run.end_time && run.start_time ?
                           Math.round((new Date(run.end_time).getTime() - new Date(run.start_time).getTime()) / 1000) + 's'
                           : '-'
                         }
                       </td>
                       <td className="p-2">
-                        {run.metrics?.tokens_per_second?.toFixed(2) || 'N/A'} t/s
+                        {run.average_tps?.toFixed(2) || 'N/A'} t/s
                       </td>
                     </tr>
                   ))}
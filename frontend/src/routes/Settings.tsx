@@ -1,12 +1,13 @@
 import React, { useState, useEffect } from 'react'
 import { Key, Download, XCircle, RefreshCw } from 'lucide-react'
 import type { ContainerInfo } from '@/services/api'
-import { API_BASE_URL } from '@/config'
+import { API_BASE_URL, WS_BASE_URL } from '@/config'
 
 interface NimProgress {
   totalSize: number;
   currentSize: number;
   percent: number;
+  bytesPerSecond: number;
 }
 
 const Settings = () => {
@@ -87,29 +88,37 @@ const Settings = () => {
       })
 
       if (!response.ok) throw new Error('Failed to start NIM installation')
+      const { id: jobId } = await response.json()
 
-      // Set up SSE for progress updates
-      const eventSource = new EventSource(`${API_BASE_URL}/api/nims/pull/progress`)
-      
-      eventSource.onmessage = (event) => {
-        const data = JSON.parse(event.data)
+      // Pull progress of every job is pushed on one websocket; follow this job only
+      const socket = new WebSocket(`${WS_BASE_URL}/ws/pulls`)
+
+      socket.onmessage = (event) => {
+        const { job } = JSON.parse(event.data)
+        if (!job || job.id !== jobId) return
         setPullProgress({
-          totalSize: data.total_size,
-          currentSize: data.current_size,
-          percent: (data.current_size / data.total_size) * 100
+          totalSize: job.total_size,
+          currentSize: job.current_size,
+          percent: job.percent,
+          bytesPerSecond: job.bytes_per_second
         })
 
-        if (data.status === 'completed') {
-          eventSource.close()
+        if (job.status === 'completed') {
+          socket.close()
           setLoading(false)
           setPullProgress(null)
           fetchInstalledNims()
           showMessage('success', 'NIM installed successfully')
+        } else if (job.status === 'failed' || job.status === 'cancelled') {
+          socket.close()
+          setLoading(false)
+          setPullProgress(null)
+          showMessage('error', job.error || `NIM installation ${job.status}`)
         }
       }
 
-      eventSource.onerror = () => {
-        eventSource.close()
+      socket.onerror = () => {
+        socket.close()
         setLoading(false)
         showMessage('error', 'Failed to install NIM')
       }
@@ -225,7 +234,10 @@ const Settings = () => {
             {pullProgress && (
               <div className="space-y-2">
                 <div className="flex justify-between text-sm text-gray-400">
-                  <span>{formatBytes(pullProgress.currentSize)} / {formatBytes(pullProgress.totalSize)}</span>
+                  <span>
+                    {formatBytes(pullProgress.currentSize)} / {formatBytes(pullProgress.totalSize)}
+                    {pullProgress.bytesPerSecond > 0 && ` (${formatBytes(pullProgress.bytesPerSecond)}/s)`}
+                  </span>
                   <span>{pullProgress.percent.toFixed(1)}%</span>
                 </div>
                 <div className="w-full bg-gray-700 rounded-full h-2">
@@ -1,6 +1,13 @@
 // src/services/api.ts
 import axios from "axios";
-import type { BenchmarkRun as BenchmarkRunType, BenchmarkConfig as BenchmarkConfigType } from "../types/benchmark";
+import type {
+  BenchmarkRun as BenchmarkRunType,
+  BenchmarkConfig as BenchmarkConfigType,
+  BenchmarkSeries,
+  HistoryPage,
+  HistoryQuery,
+  RunLogEvents,
+} from "../types/benchmark";
 import { API_BASE_URL, WS_BASE_URL } from "@/config";
 
 const BASE_URL = API_BASE_URL;
@@ -76,8 +83,52 @@ export const startBenchmark = async (config: BenchmarkConfig): Promise<StartBenc
   }
 };
 
-export const fetchBenchmarkHistory = async (): Promise<BenchmarkRun[]> => {
-  const response = await axios.get(`${BASE_URL}/benchmark/history`);
+export const resumeBenchmark = async (runId: number): Promise<StartBenchmarkResponse> => {
+  try {
+    const response = await axios.post(`${BASE_URL}/benchmark/${runId}/resume`);
+    return response.data;
+  } catch (error) {
+    if (axios.isAxiosError(error)) {
+      throw new Error(error.response?.data?.detail || "Failed to resume benchmark");
+    }
+    throw error;
+  }
+};
+
+export const fetchBenchmarkHistory = async (query: HistoryQuery = {}): Promise<HistoryPage> => {
+  const { fields, ...params } = query;
+  const response = await axios.get(`${BASE_URL}/benchmark/history`, {
+    params: { ...params, fields: fields?.join(",") },
+  });
+  return response.data;
+};
+
+export const fetchBenchmarkRun = async (runId: number): Promise<BenchmarkRun> => {
+  const response = await axios.get(`${BASE_URL}/benchmark/${runId}`);
+  return response.data;
+};
+
+export const compareBenchmarks = async (runIds: number[], baselineId?: number) => {
+  const response = await axios.post(`${BASE_URL}/benchmark/compare`, {
+    run_ids: runIds,
+    baseline_id: baselineId,
+  });
+  return response.data;
+};
+
+export const setBaselineRun = async (runId: number, enabled = true) => {
+  const url = `${BASE_URL}/benchmark/${runId}/baseline`;
+  const response = enabled ? await axios.put(url) : await axios.delete(url);
+  return response.data;
+};
+
+export const fetchBenchmarkSeries = async (runId: number): Promise<BenchmarkSeries> => {
+  const response = await axios.get(`${BASE_URL}/benchmark/${runId}/series`);
+  return response.data;
+};
+
+export const fetchBenchmarkLogEvents = async (runId: number): Promise<RunLogEvents> => {
+  const response = await axios.get(`${BASE_URL}/benchmark/${runId}/log-events`);
   return response.data;
 };
 
@@ -137,10 +188,24 @@ export const getNims = async (): Promise<ContainerInfo[]> => {
   }
 };
 
-export const pullNim = async (imageName: string): Promise<ContainerInfo> => {
+export interface PullJob {
+  id: string;
+  image_name: string;
+  status: 'queued' | 'pulling' | 'completed' | 'failed' | 'cancelled';
+  error: string | null;
+  current_size: number;
+  total_size: number;
+  percent: number;
+  bytes_per_second: number;
+  eta_seconds: number | null;
+  layers_total: number;
+  layers_complete: number;
+}
+
+export const pullNim = async (imageName: string): Promise<PullJob> => {
   try {
     const response = await axios.post(`${BASE_URL}/nims/pull`, { image_name: imageName });
-    return response.data.container;
+    return response.data;
   } catch (error) {
     console.error("Error pulling NIM:", error);
     throw error;
@@ -173,7 +238,8 @@ export const saveLogs = async (containerId: string, filename: string): Promise<v
 export const createLogStream = (containerId: string, onMessage: (log: string) => void) => {
   const ws = new WebSocket(`${WS_BASE}/ws/logs/${containerId}`);
   ws.onmessage = (event) => {
-    onMessage(JSON.parse(event.data).log);
+    const data = JSON.parse(event.data);
+    if (data.log !== undefined) onMessage(data.log);
   };
   return ws;
 };
@@ -15,6 +15,88 @@ export interface BenchmarkConfig {
   quantization?: string;
   expected_output?: string;
   port?: number;
+  power_sample_interval_ms?: number;
+  timeline_bucket_seconds?: number;
+  live_window_seconds?: number;
+  live_publish_interval?: number;
+  workload_class?: string;
+}
+
+export interface LivePercentiles {
+  p50: number | null;
+  p95: number | null;
+  p99: number | null;
+  count: number;
+}
+
+export interface LiveBenchmarkStats {
+  run_id: number;
+  seq: number;
+  status: 'running' | 'completed' | 'aborted';
+  elapsed: number;
+  completed: number;
+  errors: number;
+  total: number;
+  in_flight: number;
+  window_seconds: number;
+  tokens_per_second: number;
+  requests_per_second: number;
+  error_rate: number;
+  ttft: LivePercentiles;
+  itl: LivePercentiles;
+  e2e_latency: LivePercentiles;
+}
+
+export interface TimelineBucket {
+  t: number;
+  in_flight: number;
+  tokens_per_second: number;
+  completed_requests: number;
+  failed_requests: number;
+  gpu_utilization: number | null;
+  gpu_memory_used: number | null;
+  power_draw: number | null;
+  // Present when the run scraped the server's /metrics endpoint
+  server_requests_waiting?: number | null;
+  server_kv_cache_usage?: number | null;
+}
+
+export interface GpuEnergy {
+  gpu_index: number;
+  energy_joules: number;
+  avg_power_watts: number;
+  peak_power_watts: number;
+  samples: number;
+  method: 'counter' | 'trapezoid';
+}
+
+export interface EnergyReport {
+  window_seconds: number;
+  sample_interval_ms: number;
+  total_energy_joules: number;
+  joules_per_token: number;
+  joules_per_request: number;
+  avg_power_watts: number;
+  peak_power_watts: number;
+  per_gpu: GpuEnergy[];
+}
+
+export interface ContainerResources {
+  sample_count: number;
+  avg_cpu_percent?: number;
+  peak_cpu_percent?: number;
+  online_cpus?: number;
+  throttled_time_seconds?: number;
+  throttled_period_ratio?: number;
+  peak_memory_usage?: number;
+  peak_memory_rss?: number;
+  peak_memory_cache?: number;
+  memory_limit?: number;
+  network_rx_bytes?: number;
+  network_tx_bytes?: number;
+  block_read_bytes?: number;
+  block_write_bytes?: number;
+  samples: Array<Record<string, number>>;
 }
 
 export interface BenchmarkMetrics {
@@ -47,6 +129,14 @@ export interface BenchmarkMetrics {
   provider?: string;
   quantization?: string;
   tokens_per_watt?: number;
+  energy_joules?: number;
+  joules_per_token?: number;
+  joules_per_request?: number;
+  avg_power_watts?: number;
+  peak_power_watts?: number;
+  energy?: EnergyReport;
+  timeline?: TimelineBucket[];
+  container_resources?: ContainerResources | null;
 }
 
 export interface BenchmarkRun {
@@ -59,6 +149,72 @@ export interface BenchmarkRun {
   config: BenchmarkConfig;
   metrics: BenchmarkMetrics;
   container_id?: string;
+  artifacts?: Record<string, string>;
+}
+
+export interface BenchmarkRunSummary {
+  id: number;
+  name?: string;
+  model_name?: string;
+  provider?: string;
+  quantization?: string;
+  status?: string;
+  start_time?: string;
+  end_time?: string | null;
+  total_requests?: number;
+  successful_requests?: number;
+  total_tokens?: number;
+  average_tps?: number;
+  peak_tps?: number;
+  p95_latency?: number;
+  time_to_first_token?: number;
+  inter_token_latency?: number;
+  is_baseline?: boolean;
+  metrics?: BenchmarkMetrics;
+  config?: BenchmarkConfig;
+}
+
+export interface HistoryQuery {
+  cursor?: string;
+  limit?: number;
+  model?: string;
+  provider?: string;
+  quantization?: string;
+  status?: string;
+  since?: string;
+  until?: string;
+  sort?: string;
+  fields?: string[];
+}
+
+export interface HistoryPage {
+  items: BenchmarkRunSummary[];
+  next_cursor: string | null;
+}
+
+export interface BenchmarkSeries {
+  historical?: Array<{ timestamp: string; tokens_per_second: number; latency: number }>;
+  timeline?: TimelineBucket[];
+  container_samples?: Array<Record<string, number>>;
+}
+
+export interface LogEvent {
+  container_id: string;
+  timestamp: number;
+  time: string;
+  name: string;
+  kind: 'startup' | 'runtime' | 'error';
+  backend: string;
+  fields: Record<string, string | number>;
+  line: string | null;
+  // Seconds from the run start; negative for startup events before the run
+  offset_seconds: number;
+}
+
+export interface RunLogEvents {
+  container_id: string | null;
+  server_config: Record<string, string | number>;
+  events: LogEvent[];
 }
 
 export type Run = BenchmarkRun;
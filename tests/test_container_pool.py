@@ -0,0 +1,108 @@
+# tests/test_container_pool.py
+import pytest
+from app.services import container_pool as container_pool_module
+from app.services import placement
+from app.services.container_pool import POOL_LABEL, ContainerPool, PooledContainer, pool_key
+from app.services.placement import PlacementError, PlacementScheduler
+
+
+class FakeManager:
+    """Stops containers by releasing their placement, like ContainerManager.stop_container."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.stopped = []
+        self.labels = {}
+
+    async def start_container(self, image_name, gpu_count, env=None, labels=None, placement=None):
+        container_id = f"c{len(self.labels)}"
+        self.labels[container_id] = labels
+        self.scheduler.adopt(container_id, placement.device_ids, placement.port)
+        return {"container_id": container_id, "port": placement.port}
+
+    async def list_labelled(self, label):
+        return [{"container_id": cid, "labels": labels} for cid, labels in self.labels.items()]
+
+    async def reattach_container(self, container_id):
+        return {"container_id": container_id}
+
+    async def stop_container(self, container_id):
+        self.stopped.append(container_id)
+        self.scheduler.release_container(container_id)
+
+    async def sync_placements(self):
+        pass
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(placement, "_port_free", lambda port: True)
+    scheduler = PlacementScheduler(devices=[0, 1, 2, 3], ports=range(9000, 9010))
+    monkeypatch.setattr(container_pool_module, "placement_scheduler", scheduler)
+    return scheduler
+
+
+@pytest.fixture
+def manager(monkeypatch, scheduler):
+    manager = FakeManager(scheduler)
+    monkeypatch.setattr(container_pool_module, "container_manager", manager)
+    return manager
+
+
+def _pooled(pool, scheduler, container_id, device_ids, busy=False, last_used=0.0):
+    scheduler.adopt(container_id, device_ids, 9000 + device_ids[0])
+    key = pool_key("nvcr.io/nim/meta/llama3-8b-instruct:1", len(device_ids))
+    pool.entries[container_id] = PooledContainer(
+        key, "nvcr.io/nim/meta/llama3-8b-instruct:1", len(device_ids),
+        {"container_id": container_id}, busy=busy, last_used=last_used,
+    )
+
+
+@pytest.mark.asyncio
+async def test_reserve_outside_evicts_idle_containers_least_recently_used_first(scheduler, manager):
+    pool = ContainerPool()
+    _pooled(pool, scheduler, "old", [0, 1], last_used=1.0)
+    _pooled(pool, scheduler, "recent", [2, 3], last_used=2.0)
+
+    placement = await pool.reserve_outside(2)
+    assert placement.device_ids == [0, 1]
+    assert manager.stopped == ["old"]
+    assert list(pool.entries) == ["recent"]
+
+
+@pytest.mark.asyncio
+async def test_reserve_outside_leaves_free_gpus_alone(scheduler, manager):
+    pool = ContainerPool()
+    _pooled(pool, scheduler, "idle", [0, 1])
+    placement = await pool.reserve_outside(2)
+    assert placement.device_ids == [2, 3]
+    assert manager.stopped == []
+
+
+@pytest.mark.asyncio
+async def test_reserve_outside_never_evicts_busy_containers(scheduler, manager):
+    pool = ContainerPool()
+    _pooled(pool, scheduler, "busy", [0, 1, 2], busy=True)
+    with pytest.raises(PlacementError):
+        await pool.reserve_outside(2)
+    assert manager.stopped == []
+    assert [p.container_id for p in scheduler.placements] == ["busy"]
+
+
+@pytest.mark.asyncio
+async def test_pool_labels_hold_a_digest_and_env_names_only(scheduler, manager):
+    image = "nvcr.io/nim/meta/llama3-8b-instruct:1"
+    env = {"NGC_API_KEY": "secret-value", "NIM_MAX_MODEL_LEN": "4096"}
+    pool = ContainerPool()
+    info = await pool.acquire(image, 2, env=env)
+
+    labels = manager.labels[info["container_id"]]
+    assert "secret-value" not in "".join(labels.values())
+    assert labels[POOL_LABEL] == pool_key(image, 2, env)
+    assert pool_key(image, 2, {**env, "NGC_API_KEY": "other"}) != labels[POOL_LABEL]
+
+    restarted = ContainerPool()
+    assert await restarted.adopt() == 1
+    entry = restarted.entries[info["container_id"]]
+    assert (entry.key, entry.image_name, entry.gpu_count) == (labels[POOL_LABEL], image, 2)
+    assert restarted.status()["containers"][0]["env"] == ["NGC_API_KEY", "NIM_MAX_MODEL_LEN"]
@@ -0,0 +1,129 @@
+# tests/test_container_stats.py
+import asyncio
+import itertools
+import time
+import pytest
+from app.services import container_stats
+from app.services.container_stats import ContainerStatsMonitor, parse_stats_sample
+
+GiB = 1024 ** 3
+
+
+def stats_doc(step: int, cpu_per_step: int = 200_000_000) -> dict:
+    """A Docker stats document of the given step; one step is one second of 4 busy CPUs at 20%."""
+    return {
+        "cpu_stats": {
+            "cpu_usage": {"total_usage": (step + 1) * cpu_per_step},
+            "system_cpu_usage": (step + 1) * 1_000_000_000,
+            "online_cpus": 4,
+            "throttling_data": {"periods": (step + 1) * 10, "throttled_periods": step, "throttled_time": step * 5_000_000},
+        },
+        "precpu_stats": {
+            "cpu_usage": {"total_usage": step * cpu_per_step},
+            "system_cpu_usage": step * 1_000_000_000,
+        },
+        "memory_stats": {"usage": (2 + step) * GiB, "limit": 64 * GiB, "stats": {"anon": (1 + step) * GiB, "file": GiB}},
+        "networks": {"eth0": {"rx_bytes": step * 1000, "tx_bytes": step * 500}},
+        "blkio_stats": {"io_service_bytes_recursive": [
+            {"op": "Read", "value": step * 4096}, {"op": "Write", "value": step * 8192},
+        ]},
+    }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FakeContainer:
+    """Stands in for a docker SDK container; ``stats(stream=True, decode=True)`` yields ``docs``."""
+
+    id = "0123456789abcdef"
+
+    def __init__(self, docs, clock: FakeClock, delay: float = 0.0):
+        self.docs = docs
+        self.clock = clock
+        self.delay = delay
+        self.calls = []
+
+    def stats(self, **kwargs):
+        self.calls.append(kwargs)
+        for doc in self.docs:
+            time.sleep(self.delay)
+            self.clock.now += 1.0
+            yield doc
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(container_stats, "time", clock)
+    return clock
+
+
+def test_parse_stats_sample_deltas():
+    sample = parse_stats_sample(stats_doc(3))
+    assert sample["cpu_percent"] == pytest.approx(80.0)
+    assert sample["memory_rss"] == 4 * GiB
+    assert sample["memory_cache"] == GiB
+    assert sample["block_read_bytes"] == 3 * 4096
+    assert sample["block_write_bytes"] == 3 * 8192
+
+
+def test_parse_stats_sample_first_document_has_no_cpu():
+    doc = stats_doc(0)
+    doc["precpu_stats"] = {}
+    doc["cpu_stats"]["system_cpu_usage"] = 0
+    assert parse_stats_sample(doc)["cpu_percent"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_summary_covers_only_the_window(clock):
+    container = FakeContainer([stats_doc(step) for step in range(10)], clock)
+    monitor = ContainerStatsMonitor(container, interval=0.5)
+    monitor.start()
+    monitor._thread.join(5)
+    assert container.calls == [{"stream": True, "decode": True}]
+    assert [s["t"] for s in monitor.samples] == [1001.0 + i for i in range(10)]
+
+    # Samples at 1003..1006 are steps 2..5
+    summary = monitor.summary(1003.0, 1006.0)
+    assert summary["sample_count"] == 4
+    assert summary["avg_cpu_percent"] == pytest.approx(80.0)
+    assert summary["peak_memory_usage"] == 7 * GiB
+    assert summary["network_rx_bytes"] == 3000
+    assert summary["network_tx_bytes"] == 1500
+    assert summary["block_write_bytes"] == 3 * 8192
+    assert summary["throttled_time_seconds"] == pytest.approx(0.015)
+    assert summary["throttled_period_ratio"] == pytest.approx(3 / 30)
+    assert [s["t"] for s in summary["samples"]] == [0.0, 1.0, 2.0, 3.0]
+    assert monitor.summary(2000.0, 3000.0) == {"samples": [], "sample_count": 0}
+    await monitor.stop()
+
+
+@pytest.mark.asyncio
+async def test_interval_thins_the_stream(clock):
+    container = FakeContainer([stats_doc(step) for step in range(10)], clock)
+    monitor = ContainerStatsMonitor(container, interval=3.0)
+    monitor.start()
+    monitor._thread.join(5)
+    await monitor.stop()
+    assert [s["t"] for s in monitor.samples] == [1001.0, 1004.0, 1007.0, 1010.0]
+
+
+@pytest.mark.asyncio
+async def test_stop_ends_an_endless_stream(clock):
+    container = FakeContainer((stats_doc(step) for step in itertools.count()), clock, delay=0.01)
+    monitor = ContainerStatsMonitor(container, interval=0)
+    monitor.start()
+    thread = monitor._thread
+    while len(monitor.samples) < 3:
+        await asyncio.sleep(0.01)
+    await monitor.stop()
+    assert not thread.is_alive()
+    count = len(monitor.samples)
+    await asyncio.sleep(0.05)
+    assert len(monitor.samples) == count
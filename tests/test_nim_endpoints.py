@@ -0,0 +1,11 @@
+# tests/test_nim_endpoints.py
+import inspect
+import pytest
+from app.api.endpoints import nim
+
+
+# Endpoints that start or cancel asyncio tasks must run on the event loop; FastAPI
+# runs plain ``def`` endpoints in a worker thread where there is none.
+@pytest.mark.parametrize("endpoint", [nim.cancel_pull, nim.prefetch_model, nim.cancel_prefetch])
+def test_task_endpoints_run_on_the_event_loop(endpoint):
+    assert inspect.iscoroutinefunction(endpoint)
@@ -0,0 +1,188 @@
+# tests/test_placement.py
+import docker
+import pytest
+from app.config import settings
+from app.services import container as container_module
+from app.services import placement
+from app.services.container import ContainerManager
+from app.services.placement import CONTAINER_PORT, PlacementError, PlacementScheduler
+
+
+@pytest.fixture
+def busy_ports(monkeypatch):
+    """Host ports taken by something other than a NIM container."""
+    busy = set()
+    monkeypatch.setattr(placement, "_port_free", lambda port: port not in busy)
+    return busy
+
+
+class FakeContainer:
+    def __init__(self, container_id, device_ids, port, status="running"):
+        self.id = container_id
+        self.status = status
+        self.remove_error = None
+        self.labels = {"com.nvidia.nim": "true"}
+        self.attrs = {"HostConfig": {
+            "PortBindings": {CONTAINER_PORT: [{"HostIp": "", "HostPort": str(port)}]},
+            "DeviceRequests": [{"DeviceIDs": [str(d) for d in device_ids], "Capabilities": [["gpu"]]}],
+        }}
+
+    def stop(self, timeout=None):
+        pass
+
+    def remove(self, force=False):
+        if self.remove_error:
+            raise self.remove_error
+
+
+class FakeContainers:
+    def __init__(self):
+        self.running = {}
+        self.runs = []
+        self.run_error = None
+
+    def run(self, image, **kwargs):
+        self.runs.append(kwargs)
+        if self.run_error:
+            raise self.run_error
+        raise AssertionError("Only failing starts are exercised here")
+
+    def list(self, filters=None, **kwargs):
+        return list(self.running.values())
+
+    def get(self, container_id):
+        if container_id not in self.running:
+            raise docker.errors.NotFound(f"No such container: {container_id}")
+        return self.running[container_id]
+
+
+class FakeDocker:
+    """The part of the docker SDK client that placement uses."""
+
+    def __init__(self):
+        self.containers = FakeContainers()
+
+
+@pytest.fixture
+def scheduler(monkeypatch, busy_ports):
+    scheduler = PlacementScheduler(devices=[0, 1, 2, 3, 4, 5, 6, 7], ports=range(9000, 9008))
+    monkeypatch.setattr(container_module, "placement_scheduler", scheduler)
+    return scheduler
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch, scheduler):
+    monkeypatch.setattr(settings, "NIM_CACHE_DIR", str(tmp_path / "nim-cache"))
+    return ContainerManager(client=FakeDocker())
+
+
+def test_prefers_adjacent_gpus(busy_ports):
+    scheduler = PlacementScheduler(devices=[0, 1, 2, 3, 5, 6, 7], ports=range(9000, 9010))
+    assert scheduler.reserve(1).device_ids == [0]
+    two = scheduler.reserve(2)
+    assert two.device_ids == [1, 2]
+    # 3 and 5 are free but not neighbours; 5 and 6 are
+    assert scheduler.reserve(2).device_ids == [5, 6]
+    scheduler.release(two)
+    assert scheduler.free_devices() == [1, 2, 3, 7]
+    assert scheduler.reserve(3).device_ids == [1, 2, 3]
+
+
+def test_falls_back_to_any_free_gpus(busy_ports):
+    scheduler = PlacementScheduler(devices=[0, 2, 4], ports=range(9000, 9010))
+    assert scheduler.reserve(2).device_ids == [0, 2]
+    with pytest.raises(PlacementError):
+        scheduler.reserve(2)
+
+
+def test_allocates_distinct_free_ports(busy_ports):
+    busy_ports.add(9001)
+    scheduler = PlacementScheduler(devices=list(range(8)), ports=range(9000, 9004))
+    ports = [scheduler.reserve(1).port for _ in range(3)]
+    assert ports == [9000, 9002, 9003]
+    with pytest.raises(PlacementError, match="No free host port"):
+        scheduler.reserve(1)
+    # A failed reservation holds nothing
+    assert len(scheduler.placements) == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_run_releases_the_placement(manager, scheduler, monkeypatch):
+    monkeypatch.setattr(container_module, "retrieve_key", lambda: "nvapi-test")
+
+    async def ensure_image(image_name):
+        return None
+
+    async def usage(image_name):
+        return {}
+
+    monkeypatch.setattr(manager.pulls, "ensure_image", ensure_image)
+    monkeypatch.setattr(manager.cache, "usage", usage)
+    manager.client.containers.run_error = docker.errors.APIError("port is already allocated")
+
+    with pytest.raises(docker.errors.APIError):
+        await manager.start_container("nvcr.io/nim/meta/llama3-8b-instruct:1", gpu_count=2)
+    run = manager.client.containers.runs[0]
+    assert run["ports"] == {CONTAINER_PORT: 9000}
+    assert run["device_requests"][0]["DeviceIDs"] == ["0", "1"]
+    assert scheduler.placements == []
+    assert scheduler.free_devices() == list(range(8))
+
+
+@pytest.mark.asyncio
+async def test_sync_placements_rebuilds_after_restart(manager, scheduler):
+    running = manager.client.containers.running
+    running["a"] = FakeContainer("a", [0, 1], 9000)
+    running["b"] = FakeContainer("b", [4, 5, 6, 7], 9003)
+
+    # A fresh scheduler, as after a server restart, learns the running containers' GPUs and ports
+    await manager.sync_placements()
+    assert {p.container_id: (p.device_ids, p.port) for p in scheduler.placements} == {
+        "a": ([0, 1], 9000),
+        "b": ([4, 5, 6, 7], 9003),
+    }
+    pending = scheduler.reserve(2)
+    assert (pending.device_ids, pending.port) == ([2, 3], 9001)
+
+    # Containers that exited are forgotten; pending reservations are kept
+    del running["b"]
+    await manager.sync_placements()
+    assert [p.container_id for p in scheduler.placements] == ["a", None]
+    assert scheduler.free_devices() == [4, 5, 6, 7]
+
+
+def test_adopt_ignores_known_containers_and_missing_ports(busy_ports):
+    scheduler = PlacementScheduler(devices=list(range(4)), ports=range(9000, 9004))
+    scheduler.adopt("a", [0], 9000)
+    scheduler.adopt("a", [1], 9001)
+    scheduler.adopt("b", [2], None)
+    assert [(p.container_id, p.device_ids, p.port) for p in scheduler.placements] == [("a", [0], 9000)]
+    scheduler.release_container("a")
+    assert scheduler.placements == []
+
+
+@pytest.mark.asyncio
+async def test_stop_releases_a_container_whose_removal_is_in_progress(manager, scheduler, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "NIM_FILE", str(tmp_path / "nim.json"))
+    container = FakeContainer("c1", [0, 1], 9000)
+    container.remove_error = docker.errors.APIError("removal of container c1 is already in progress")
+    manager.client.containers.running["c1"] = container
+    scheduler.adopt("c1", [0, 1], 9000)
+    manager._active_nim = {"container_id": "c1"}
+
+    await manager.stop_container("c1")
+
+    assert scheduler.placements == []
+    assert manager._active_nim is None
+
+
+@pytest.mark.asyncio
+async def test_failed_stop_still_releases_the_placement(manager, scheduler):
+    container = FakeContainer("c1", [0], 9000)
+    container.remove_error = docker.errors.APIError("device or resource busy")
+    manager.client.containers.running["c1"] = container
+    scheduler.adopt("c1", [0], 9000)
+
+    with pytest.raises(docker.errors.APIError):
+        await manager.stop_container("c1")
+    assert scheduler.placements == []
@@ -0,0 +1,67 @@
+# tests/test_run_comparison.py
+import numpy as np
+from app.services.run_comparison import compare_archives, overall_verdict
+from app.services.sample_archive import SampleArchive, write_archive
+from app.services.telemetry_timeline import RequestEvent
+
+
+def _archive(path, latencies, failed=0):
+    events = [
+        RequestEvent(scheduled=i, sent=i, first_token=i + e / 4, end=i + e, output_tokens=100, status="ok")
+        for i, e in enumerate(latencies)
+    ]
+    events += [
+        RequestEvent(scheduled=i, sent=i, first_token=None, end=i + 0.1, output_tokens=0, status="error")
+        for i in range(failed)
+    ]
+    return SampleArchive(write_archive(path, events, origin=0.0))
+
+
+def test_same_distribution_is_no_change(tmp_path):
+    rng = np.random.default_rng(1)
+    baseline = _archive(tmp_path / "a", rng.normal(1.0, 0.05, 300))
+    candidate = _archive(tmp_path / "b", rng.normal(1.0, 0.05, 300))
+    result = compare_archives(baseline, candidate, n_boot=200)
+    assert result["verdict"] == "no_change"
+    assert result["metrics"]["error_rate"]["verdict"] == "no_change"
+
+
+def test_slower_candidate_is_regression(tmp_path):
+    rng = np.random.default_rng(2)
+    baseline = _archive(tmp_path / "a", rng.normal(1.0, 0.05, 300))
+    candidate = _archive(tmp_path / "b", rng.normal(1.3, 0.05, 300))
+    result = compare_archives(baseline, candidate, n_boot=200)
+    assert result["metrics"]["e2e_p95"]["verdict"] == "regression"
+    assert result["verdict"] == "regression"
+
+
+def test_candidate_without_successful_requests_fails(tmp_path):
+    baseline = _archive(tmp_path / "a", [1.0] * 200)
+    candidate = _archive(tmp_path / "b", [], failed=200)
+    result = compare_archives(baseline, candidate, n_boot=200)
+    assert result["samples"] == {"baseline": 200, "candidate": 0}
+    assert result["metrics"]["error_rate"]["candidate"] == 100.0
+    assert result["verdict"] == "regression"
+
+
+def test_no_successful_requests_without_error_threshold_is_insufficient(tmp_path):
+    baseline = _archive(tmp_path / "a", [1.0] * 50)
+    candidate = _archive(tmp_path / "b", [], failed=50)
+    result = compare_archives(baseline, candidate, thresholds={"tps": 3.0}, n_boot=200)
+    assert result["verdict"] == "insufficient_data"
+
+
+def test_error_rate_increase_is_regression(tmp_path):
+    rng = np.random.default_rng(3)
+    baseline = _archive(tmp_path / "a", rng.normal(1.0, 0.05, 500))
+    candidate = _archive(tmp_path / "b", rng.normal(1.0, 0.05, 450), failed=50)
+    result = compare_archives(baseline, candidate, n_boot=200)
+    assert result["metrics"]["error_rate"]["verdict"] == "regression"
+    assert result["verdict"] == "regression"
+
+
+def test_overall_verdict_is_most_severe():
+    assert overall_verdict(["no_change", "improvement"]) == "improvement"
+    assert overall_verdict(["improvement", "insufficient_data"]) == "insufficient_data"
+    assert overall_verdict(["changed", "inconclusive", "regression"]) == "regression"
+    assert overall_verdict([]) == "no_change"
@@ -0,0 +1,22 @@
+# tests/test_sample_archive.py
+import pytest
+from app.services.sample_archive import MAX_BUCKETS, SampleArchive, write_archive
+from app.services.telemetry_timeline import RequestEvent
+
+
+@pytest.fixture
+def archive(tmp_path):
+    # An hour-long run: one request finishing every ten minutes
+    requests = [RequestEvent(t, t, t + 0.2, t + 1.0, 20, "ok") for t in range(0, 3600, 600)]
+    return SampleArchive(write_archive(tmp_path / "samples", requests, 0.0))
+
+
+def test_rebucket_counts_requests_per_bucket(archive):
+    buckets = archive.rebucket(1200.0)
+    assert [b["t"] for b in buckets] == [0.0, 1200.0, 2400.0]
+    assert [b["completed_requests"] for b in buckets] == [2, 2, 2]
+
+
+def test_rebucket_rejects_widths_beyond_the_bucket_cap(archive):
+    with pytest.raises(ValueError, match=str(MAX_BUCKETS)):
+        archive.rebucket(0.0001)
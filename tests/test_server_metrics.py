@@ -0,0 +1,116 @@
+# tests/test_server_metrics.py
+import asyncio
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.services.server_metrics import ServerMetricsScraper, parse_sample
+
+
+def exposition(step: int) -> str:
+    """A vLLM-style /metrics page; gauges and counters grow with ``step``."""
+    return "\n".join([
+        "# HELP vllm:num_requests_running Number of requests currently running on GPU.",
+        "# TYPE vllm:num_requests_running gauge",
+        f'vllm:num_requests_running{{engine="0",model_name="m"}} {step}',
+        'vllm:num_requests_running{engine="1",model_name="m"} 1',
+        f'vllm:num_requests_waiting{{model_name="m"}} {2 * step}',
+        # Both KV cache names are present; the first family found is the one recorded
+        f'vllm:gpu_cache_usage_perc{{model_name="m"}} {step / 10}',
+        'vllm:kv_cache_usage_perc{model_name="m"} 0.99',
+        f'vllm:prefix_cache_queries_total{{model_name="m"}} {100 * step}',
+        f'vllm:prefix_cache_hits_total{{model_name="m"}} {25 * step}',
+        'vllm:num_preemptions_total{model_name="m"} NaN',
+        'vllm:e2e_request_latency_seconds_bucket{le="+Inf",model_name="m"} 5',
+        'custom_metric{path="a,}b\\"c"} 7 1700000000000',
+        "process_cpu_seconds_total 12.5",
+        "",
+    ])
+
+
+@pytest_asyncio.fixture
+async def exporter():
+    state = {"step": 0}
+
+    async def metrics(request):
+        state["step"] += 1
+        return web.Response(text=exposition(state["step"]))
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    server = TestServer(app)
+    await server.start_server()
+    yield server
+    await server.close()
+
+
+def test_parse_sample():
+    assert parse_sample('custom_metric{path="a,}b\\"c",x="2"} 7 1700000000000') == (
+        "custom_metric", {"path": 'a,}b\\"c', "x": "2"}, 7.0
+    )
+    assert parse_sample("up +Inf")[2] == float("inf")
+    assert parse_sample("# TYPE up gauge") is None
+
+
+@pytest.mark.asyncio
+async def test_scrape_selects_and_sums_series(exporter):
+    scraper = ServerMetricsScraper(str(exporter.make_url("/metrics")), extra_series=["custom_metric"])
+    async with aiohttp.ClientSession() as session:
+        values = await scraper.scrape(session)
+    assert values == {
+        "requests_running": 2.0,
+        "requests_waiting": 2.0,
+        "kv_cache_usage": 0.1,
+        "prefix_cache_queries": 100.0,
+        "prefix_cache_hits": 25.0,
+        "custom_metric": 7.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_summary_and_buckets_from_scrapes(exporter):
+    scraper = ServerMetricsScraper(str(exporter.make_url("/metrics")))
+    async with aiohttp.ClientSession() as session:
+        # Scrapes at 0.5 s, 1.5 s, 2.5 s and 3.5 s into a run starting at t=100
+        for t in (100.5, 101.5, 102.5, 103.5):
+            scraper.samples.append((t, await scraper.scrape(session)))
+
+    summary = scraper.summary(100.0, 104.0)
+    assert summary["sample_count"] == 4
+    series = summary["series"]
+    assert series["requests_running"] == {"mean": 3.5, "max": 5.0, "last": 5.0}
+    assert series["prefix_cache_queries"] == {"increase": 300.0}
+    assert series["prefix_cache_hits"] == {"increase": 75.0}
+    assert series["prefix_cache_hit_rate"] == {"mean": 0.25}
+    assert [s["t"] for s in summary["samples"]] == [0.5, 1.5, 2.5, 3.5]
+    assert scraper.summary(101.0, 103.0)["series"]["prefix_cache_queries"] == {"increase": 100.0}
+
+    buckets = scraper.buckets(100.0, 1.0, 5)
+    assert [b["server_requests_running"] for b in buckets] == [2.0, 3.0, 4.0, 5.0, None]
+    # Counters become rates per second; the first scrape has nothing to difference against
+    assert [b["server_prefix_cache_queries"] for b in buckets] == [None, 100.0, 100.0, 100.0, None]
+
+
+@pytest.mark.asyncio
+async def test_missing_endpoint_stops_the_scraper(exporter):
+    scraper = ServerMetricsScraper(str(exporter.make_url("/not-metrics")), interval=0.01)
+    scraper.start()
+    await asyncio.wait_for(scraper._task, 5)
+    assert scraper.errors == 1
+    assert scraper.scrapes == 0
+    assert "404" in scraper.last_error
+    await scraper.stop()
+
+
+@pytest.mark.asyncio
+async def test_background_scrapes_until_stopped(exporter):
+    scraper = ServerMetricsScraper(str(exporter.make_url("/metrics")), interval=0.01)
+    scraper.start()
+    while scraper.scrapes < 3:
+        await asyncio.sleep(0.01)
+    await scraper.stop()
+    scrapes = scraper.scrapes
+    await asyncio.sleep(0.05)
+    assert scraper.scrapes == scrapes
+    assert [values["requests_waiting"] for _, values in scraper.samples[:3]] == [2.0, 4.0, 6.0]
@@ -0,0 +1,73 @@
+# tests/test_telemetry_codec.py
+import json
+import pytest
+from app.utils.telemetry_codec import (
+    ENTRY, FRAME_DELTA, FRAME_KEYFRAME, HEADER, WIDE_ENTRY, DeltaEncoder, TelemetrySubscription, decode_frame,
+)
+
+
+def decode(encoder: DeltaEncoder, metrics):
+    frames = encoder.encode(metrics)
+    schema = next((json.loads(f) for f in frames if isinstance(f, str)), None)
+    return schema, decode_frame(frames[-1]), frames[-1]
+
+
+def test_large_counters_round_trip_exactly():
+    encoder = DeltaEncoder()
+    schema, (frame_type, _, entries), frame = decode(encoder, {
+        "total_tokens": 123_456_789, "network": {"rx_bytes": 9_876_543_210}, "gpu_util": 37.5,
+    })
+    assert frame_type == FRAME_KEYFRAME
+    values = {schema["fields"][i]: v for i, v in entries}
+    assert values == {"total_tokens": 123_456_789, "network.rx_bytes": 9_876_543_210, "gpu_util": 37.5}
+    # Two wide entries and one float32 entry
+    assert len(frame) == HEADER.size + 2 * WIDE_ENTRY.size + ENTRY.size
+
+
+def test_delta_carries_small_steps_of_large_counters():
+    encoder = DeltaEncoder()
+    schema, _, _ = decode(encoder, {"total_tokens": 50_000_000, "gpu_util": 37.5})
+    _, (frame_type, _, entries), _ = decode(encoder, {"total_tokens": 50_000_001, "gpu_util": 37.5})
+    assert frame_type == FRAME_DELTA
+    assert [(schema["fields"][i], v) for i, v in entries] == [("total_tokens", 50_000_001)]
+
+
+def test_delta_skips_changes_below_float32_precision():
+    encoder = DeltaEncoder()
+    decode(encoder, {"power_draw": 250.0})
+    _, (_, _, entries), _ = decode(encoder, {"power_draw": 250.0 + 1e-9})
+    assert entries == []
+
+
+@pytest.mark.parametrize("value", [2 ** 24, -(2 ** 24), 3.0e9 + 0.5])
+def test_other_values_stay_float32(value):
+    encoder = DeltaEncoder()
+    _, (_, _, entries), frame = decode(encoder, {"v": value})
+    assert len(frame) == HEADER.size + ENTRY.size
+    assert entries[0][1] == pytest.approx(value, rel=1e-7)
+
+
+class FakeWebSocket:
+    """Replays ASGI receive messages, like starlette's WebSocket.receive."""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+
+    async def receive(self):
+        if not self.messages:
+            raise RuntimeError('Cannot call "receive" once a disconnect message has been received.')
+        return self.messages.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_listen_ignores_binary_and_invalid_frames_and_ends_on_disconnect():
+    subscription = TelemetrySubscription()
+    websocket = FakeWebSocket([
+        {"type": "websocket.receive", "bytes": b"\x01\x00"},
+        {"type": "websocket.receive", "text": "not json"},
+        {"type": "websocket.receive", "text": json.dumps({"type": "subscribe", "encoding": "binary", "rate_ms": 1000})},
+        {"type": "websocket.disconnect", "code": 1000},
+    ])
+    await subscription.listen(websocket)
+    assert subscription.encoding == "binary"
+    assert subscription.interval_ms == 1000
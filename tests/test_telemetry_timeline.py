@@ -0,0 +1,37 @@
+# tests/test_telemetry_timeline.py
+from app.services.telemetry_timeline import RequestEvent, TelemetryTimeline
+
+
+class CountingSink:
+    """Stands in for RunJournal and counts how often the events are read back."""
+
+    def __init__(self, events):
+        self.events = events
+        self.reads = 0
+
+    @property
+    def count(self):
+        return len(self.events)
+
+    def flush(self):
+        pass
+
+    def iter_events(self, origin=0.0):
+        self.reads += 1
+        return iter(self.events)
+
+
+def test_buckets_read_the_sink_once():
+    sink = CountingSink([
+        RequestEvent(0.0, 0.0, 0.5, 2.0, 30, "ok"),
+        RequestEvent(1.0, 1.0, None, 1.5, 0, "error"),
+    ])
+    buckets = TelemetryTimeline(origin=0.0, sink=sink).buckets(1.0)
+
+    assert sink.reads == 1
+    assert [b["t"] for b in buckets] == [0.0, 1.0]
+    assert [b["completed_requests"] for b in buckets] == [0, 1]
+    assert [b["failed_requests"] for b in buckets] == [0, 1]
+    # 30 tokens spread over 0.5 s to 2.0 s: a third in the first bucket
+    assert [b["tokens_per_second"] for b in buckets] == [10.0, 20.0]
+    assert [b["in_flight"] for b in buckets] == [1.0, 1.5]